@@ -0,0 +1,115 @@
+"""Mevcut astroloji okumalarının doğum haritalarını efemeris motoruyla yeniden hesaplar.
+
+Eski okumalardaki haritalar tarih/saatten türetilmiş yaklaşık değerlerdir; bu script doğum yerini
+API ile aynı kuralla çözer (okumada kayıtlı koordinat/saat farkı > gazetteer > varsayılan) ve her batch'i tek bir vektörel compute_charts çağrısıyla hesaplayıp dokümanları günceller.
+
+Kullanım:
+    python backfill_birth_charts.py                    # tüm astroloji okumaları
+    python backfill_birth_charts.py --dry-run          # sadece kaç okuma etkileneceğini göster
+    python backfill_birth_charts.py --batch-size 5000
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from ephemeris import EphemerisTable, chart_to_dict, compute_charts, julian_day
+from gazetteer import BirthLocationResolver, open_gazetteer
+
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+ASTROLOGY_HOUSE_SYSTEM = os.environ.get('ASTROLOGY_HOUSE_SYSTEM', 'placidus')
+GAZETTEER_DIR = Path(os.environ.get('GAZETTEER_DIR', ROOT_DIR / 'data' / 'gazetteer'))
+EPHEMERIS_TABLE_DIR = Path(os.environ.get('EPHEMERIS_TABLE_DIR', ROOT_DIR / 'data' / 'ephemeris'))
+
+gazetteer = open_gazetteer(GAZETTEER_DIR, ROOT_DIR / 'data' / 'seed_places.tsv')
+birth_location_resolver = BirthLocationResolver.from_env(gazetteer)
+# Tablo varsa aralıktaki batch'ler seri değerlendirmesi yerine tablodan okunur
+ephemeris_table = EphemerisTable.open(EPHEMERIS_TABLE_DIR) if (EPHEMERIS_TABLE_DIR / EphemerisTable.DATA_FILE).exists() else None
+
+
+def birth_moment(reading: dict):
+    """(Jülyen günü UT, konum) - kullanıcının verdiği konum korunur, gazetteer tahminiyle ezilmez"""
+    time_parts = reading["birth_time"].split(":")
+    local_time = datetime.strptime(reading["birth_date"], "%Y-%m-%d").replace(
+        hour=int(time_parts[0]), minute=int(time_parts[1]) if len(time_parts) > 1 else 0
+    )
+    location = birth_location_resolver.resolve(
+        reading.get("birth_place"), local_time, reading.get("latitude"), reading.get("longitude"), reading.get("utc_offset")
+    )
+    hour = local_time.hour + local_time.minute / 60.0 - location["utc_offset"]
+    return julian_day(local_time.year, local_time.month, local_time.day, hour), location
+
+
+async def flush(db, batch: list) -> int:
+    charts = compute_charts(
+        [jd for _, jd, _ in batch],
+        [location["latitude"] for _, _, location in batch],
+        [location["longitude"] for _, _, location in batch],
+        ASTROLOGY_HOUSE_SYSTEM,
+        table=ephemeris_table
+    )
+    operations = []
+    for index, (reading_id, _, location) in enumerate(batch):
+        chart = chart_to_dict(charts, index)
+        chart["location"] = location
+        operations.append(UpdateOne(
+            {"id": reading_id},
+            {"$set": {
+                "birth_chart": chart,
+                "planets": chart["planets"],
+                "zodiac_sign": chart["planets"]["sun"]["sign"]
+            }}
+        ))
+    result = await db.astrology_readings.bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+async def main(args):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        query = {"birth_date": {"$exists": True}, "birth_time": {"$exists": True}}
+        total = await db.astrology_readings.count_documents(query)
+        logging.info(f"astrology_readings: {total} readings with birth data")
+        if args.dry_run or total == 0:
+            return
+
+        updated = 0
+        skipped = 0
+        batch = []
+        # Kullanıcının verdiği konum alanları da çekilir ki yeniden hesaplama onları korusun
+        projection = {"_id": 0, "id": 1, "birth_date": 1, "birth_time": 1, "birth_place": 1,
+                      "latitude": 1, "longitude": 1, "utc_offset": 1}
+        async for reading in db.astrology_readings.find(query, projection):
+            try:
+                batch.append((reading["id"], *birth_moment(reading)))
+            except (KeyError, ValueError) as e:
+                skipped += 1
+                logging.warning(f"Skipping reading {reading.get('id')}: {str(e)}")
+                continue
+            if len(batch) >= args.batch_size:
+                updated += await flush(db, batch)
+                batch = []
+        if batch:
+            updated += await flush(db, batch)
+        result = {"readings": total, "updated": updated, "skipped": skipped}
+        logging.info(f"Result: {result}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Recompute birth charts of existing astrology readings")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(main(parser.parse_args()))
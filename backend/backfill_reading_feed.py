@@ -0,0 +1,83 @@
+"""Mevcut okumalar için reading_feed kayıtlarını geriye dönük oluşturur.
+
+Kullanım:
+    python backfill_reading_feed.py                 # tüm okuma koleksiyonları
+    python backfill_reading_feed.py --dry-run       # sadece kaç okuma etkileneceğini göster
+    python backfill_reading_feed.py --type tarot --batch-size 500
+"""
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from reading_feed import feed_summary
+
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+READING_TYPES = ["coffee", "tarot", "palm", "astrology", "falname"]
+FEED_SUMMARY_CHARS = int(os.environ.get('FEED_SUMMARY_CHARS', 160))
+
+
+async def backfill_type(db, reading_type: str, batch_size: int, dry_run: bool) -> dict:
+    collection = db[f"{reading_type}_readings"]
+    query = {"user_id": {"$exists": True}}
+    total = await collection.count_documents(query)
+    logging.info(f"{reading_type}: {total} readings with a user")
+    if dry_run or total == 0:
+        return {"type": reading_type, "readings": total, "inserted": 0}
+
+    inserted = 0
+    operations = []
+    projection = {"_id": 0, "id": 1, "user_id": 1, "session_id": 1, "timestamp": 1, "interpretation": 1}
+    async for reading in collection.find(query, projection):
+        # reading_id tekil: script tekrar çalışırsa mevcut kayıtlar değişmez
+        operations.append(UpdateOne(
+            {"reading_id": reading["id"]},
+            {"$setOnInsert": {
+                "user_id": reading["user_id"],
+                "type": reading_type,
+                "reading_id": reading["id"],
+                "session_id": reading["session_id"],
+                "timestamp": reading["timestamp"],
+                "summary": feed_summary(reading.get("interpretation", ""), FEED_SUMMARY_CHARS)
+            }},
+            upsert=True
+        ))
+        if len(operations) >= batch_size:
+            result = await db.reading_feed.bulk_write(operations, ordered=False)
+            inserted += result.upserted_count
+            operations = []
+
+    if operations:
+        result = await db.reading_feed.bulk_write(operations, ordered=False)
+        inserted += result.upserted_count
+
+    return {"type": reading_type, "readings": total, "inserted": inserted}
+
+
+async def main(args):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        reading_types = [args.type] if args.type else READING_TYPES
+        for reading_type in reading_types:
+            result = await backfill_type(db, reading_type, args.batch_size, args.dry_run)
+            logging.info(f"Result: {result}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Create reading_feed entries for existing readings")
+    parser.add_argument("--type", choices=READING_TYPES, help="Only backfill this reading type")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(main(parser.parse_args()))
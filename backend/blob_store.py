@@ -0,0 +1,132 @@
+"""İçerik adresli blob depolama - okuma resimleri MongoDB dokümanları yerine burada tutulur"""
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class BlobRef(BaseModel):
+    """Dokümanlarda saklanan blob referansı"""
+    hash: str  # sha256 hex
+    size: int
+
+
+class BlobNotFoundError(Exception):
+    pass
+
+
+class BlobStore(ABC):
+    """Blob depolama arayüzü - anahtar içeriğin sha256 özetidir"""
+    @abstractmethod
+    async def put(self, data: bytes, digest: Optional[str] = None) -> BlobRef:
+        ...
+
+    @abstractmethod
+    async def get(self, digest: str) -> bytes:
+        ...
+
+    @abstractmethod
+    async def exists(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, digest: str):
+        ...
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+
+class LocalBlobStore(BlobStore):
+    """Yerel dosya sistemi: <root>/ab/cd/<sha256>"""
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def _write(self, data: bytes, digest: str) -> None:
+        path = self.path_for(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Yarım yazılmış dosya görünmesin diye geçici dosyaya yazıp rename et
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    async def put(self, data: bytes, digest: Optional[str] = None) -> BlobRef:
+        digest = digest or self.digest(data)
+        await asyncio.to_thread(self._write, data, digest)
+        return BlobRef(hash=digest, size=len(data))
+
+    async def get(self, digest: str) -> bytes:
+        path = self.path_for(digest)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            raise BlobNotFoundError(digest)
+
+    async def exists(self, digest: str) -> bool:
+        return self.path_for(digest).exists()
+
+    async def delete(self, digest: str):
+        path = self.path_for(digest)
+        if path.exists():
+            await asyncio.to_thread(path.unlink)
+
+
+class GridFSBlobStore(BlobStore):
+    """MongoDB GridFS - birden fazla sunucu aynı blob'lara erişecekse"""
+    def __init__(self, db, bucket_name: str = "blobs"):
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+        self.files = db[f"{bucket_name}.files"]
+
+    async def put(self, data: bytes, digest: Optional[str] = None) -> BlobRef:
+        digest = digest or self.digest(data)
+        if not await self.exists(digest):
+            await self.bucket.upload_from_stream(digest, data)
+        return BlobRef(hash=digest, size=len(data))
+
+    async def get(self, digest: str) -> bytes:
+        doc = await self.files.find_one({"filename": digest}, {"_id": 1})
+        if not doc:
+            raise BlobNotFoundError(digest)
+        stream = await self.bucket.open_download_stream(doc["_id"])
+        return await stream.read()
+
+    async def exists(self, digest: str) -> bool:
+        return await self.files.find_one({"filename": digest}, {"_id": 1}) is not None
+
+    async def delete(self, digest: str):
+        async for doc in self.files.find({"filename": digest}, {"_id": 1}):
+            await self.bucket.delete(doc["_id"])
+
+
+def blob_store_from_env(db, default_root: Path) -> BlobStore:
+    """BLOB_STORE_BACKEND (local|gridfs) ve BLOB_STORE_PATH ortam değişkenlerine göre blob store oluştur"""
+    backend = os.environ.get("BLOB_STORE_BACKEND", "local").lower()
+    if backend == "gridfs":
+        bucket_name = os.environ.get("BLOB_STORE_BUCKET", "blobs")
+        logging.info(f"Using GridFS blob store (bucket={bucket_name})")
+        return GridFSBlobStore(db, bucket_name=bucket_name)
+    if backend != "local":
+        raise ValueError(f"Unknown BLOB_STORE_BACKEND: {backend}")
+    root = Path(os.environ.get("BLOB_STORE_PATH", str(default_root)))
+    logging.info(f"Using local blob store at {root}")
+    return LocalBlobStore(root)
@@ -0,0 +1,56 @@
+"""Efemeris motorunu bir tarih aralığı için günlük olarak değerlendirip belleğe eşlenen tabloya yazar.
+
+Kullanım:
+    python build_ephemeris_table.py                                  # 1940-01-01 .. 2031-01-01
+    python build_ephemeris_table.py --start 1900-01-01 --end 2050-01-01
+    python build_ephemeris_table.py --output /srv/falim/ephemeris
+
+Tablo varsayılan olarak data/ephemeris altına yazılır; uygulama açılışta buradan okur (EPHEMERIS_TABLE_DIR).
+Aralık dışındaki tarihler çalışırken serilerle hesaplanır.
+"""
+import argparse
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from ephemeris import BODIES, EphemerisTable, body_longitudes, build_table, julian_day, save_table
+
+
+ROOT_DIR = Path(__file__).parent
+
+
+def to_jd(text: str) -> float:
+    date_obj = datetime.strptime(text, "%Y-%m-%d")
+    return float(julian_day(date_obj.year, date_obj.month, date_obj.day))
+
+
+def main(args):
+    start_jd, end_jd = to_jd(args.start), to_jd(args.end)
+    started_at = time.perf_counter()
+    data = build_table(start_jd, end_jd)
+    save_table(data, start_jd, 1.0, args.output)
+    logging.info(
+        f"Wrote {len(data)} days x {len(BODIES)} bodies ({data.nbytes / 1e6:.1f} MB) to {args.output} "
+        f"in {time.perf_counter() - started_at:.1f}s"
+    )
+
+    # Ara değer hatasını rastgele anlarda doğrudan seri hesabıyla karşılaştır
+    table = EphemerisTable.open(args.output)
+    moments = np.random.default_rng(0).uniform(start_jd, table.end_jd, args.check_samples)
+    interpolated, _ = table.positions(moments)
+    error = np.abs(np.remainder(interpolated - body_longitudes(moments) + 180.0, 360.0) - 180.0) * 3600.0
+    worst = {body: round(float(value), 3) for body, value in zip(BODIES, error.max(axis=0))}
+    logging.info(f"Max interpolation error (arcsec) over {args.check_samples} samples: {worst}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Precompute the daily ephemeris table used for birth charts")
+    parser.add_argument("--start", default="1940-01-01")
+    parser.add_argument("--end", default="2031-01-01")
+    parser.add_argument("--output", type=Path, default=ROOT_DIR / "data" / "ephemeris")
+    parser.add_argument("--check-samples", type=int, default=10000)
+    main(parser.parse_args())
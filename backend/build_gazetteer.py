@@ -0,0 +1,64 @@
+"""GeoNames şehir listesinden bellek eşlemeli gazetteer indeksini oluşturur.
+
+Kullanım:
+    python build_gazetteer.py --download                         # cities500.zip'i GeoNames'ten indir ve derle
+    python build_gazetteer.py cities500.txt                      # indirilmiş dosyadan derle (.txt veya .zip)
+    python build_gazetteer.py cities500.zip --max-alternates 20  # yer başına alternatif ad sayısını sınırla
+    python build_gazetteer.py data/seed_places.tsv --output /tmp/gazetteer
+
+İndeks varsayılan olarak data/gazetteer altına yazılır; uygulama açılışta buradan okur (GAZETTEER_DIR).
+"""
+import argparse
+import io
+import logging
+import time
+import urllib.request
+import zipfile
+from pathlib import Path
+
+from gazetteer import build_index, read_geonames, save_index
+
+
+ROOT_DIR = Path(__file__).parent
+GEONAMES_URL = "https://download.geonames.org/export/dump/cities500.zip"
+
+
+def read_source(path: Path, max_alternates):
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            member = next(name for name in archive.namelist() if name.endswith(".txt"))
+            with archive.open(member) as raw:
+                return read_geonames(io.TextIOWrapper(raw, encoding="utf-8"), max_alternates)
+    with open(path, encoding="utf-8") as source:
+        return read_geonames(source, max_alternates)
+
+
+def main(args):
+    source = args.source
+    if args.download:
+        source = args.output.parent / "cities500.zip"
+        source.parent.mkdir(parents=True, exist_ok=True)
+        logging.info(f"Downloading {GEONAMES_URL}")
+        urllib.request.urlretrieve(GEONAMES_URL, source)
+    if source is None:
+        raise SystemExit("Give a GeoNames file or use --download")
+
+    started_at = time.perf_counter()
+    rows = read_source(Path(source), args.max_alternates)
+    logging.info(f"Read {len(rows)} places from {source}")
+    index = build_index(rows)
+    save_index(index, args.output)
+    logging.info(
+        f"Wrote {len(index['places'])} places, {len(index['key_places'])} names, "
+        f"{len(index['timezones'])} time zones to {args.output} in {time.perf_counter() - started_at:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Build the offline gazetteer index from GeoNames data")
+    parser.add_argument("source", nargs="?", type=Path, help="cities500.txt / .zip or another GeoNames-format file")
+    parser.add_argument("--output", type=Path, default=ROOT_DIR / "data" / "gazetteer")
+    parser.add_argument("--download", action="store_true", help="Download cities500.zip from GeoNames first")
+    parser.add_argument("--max-alternates", type=int, default=None)
+    main(parser.parse_args())
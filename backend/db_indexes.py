@@ -0,0 +1,151 @@
+"""MongoDB index tanımları - sorgu kalıplarının ihtiyaç duyduğu indexler uygulama açılışında oluşturulur"""
+import logging
+from typing import Dict, List, NamedTuple, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+
+class IndexSpec(NamedTuple):
+    name: str
+    keys: List[Tuple[str, int]]
+    options: dict = {}
+
+
+READING_COLLECTIONS = [
+    "coffee_readings",
+    "tarot_readings",
+    "palm_readings",
+    "astrology_readings",
+    "falname_readings",
+]
+
+
+def _reading_indexes() -> List[IndexSpec]:
+    return [
+        # /X-reading/{session_id} geçmiş listesi: session + kullanıcı, (timestamp, id) keyset sayfalama
+        IndexSpec(
+            "session_user_timestamp_id",
+            [("session_id", ASCENDING), ("user_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)],
+        ),
+        # /X-reading/{session_id}/{reading_id} tekil okuma ve dedup'tan gelen id + user_id aramaları
+        IndexSpec("id", [("id", ASCENDING)], {"unique": True}),
+    ]
+
+
+def _job_queue_indexes() -> List[IndexSpec]:
+    return [
+        IndexSpec("id", [("id", ASCENDING)], {"unique": True}),
+        # Worker'ın iş üstlenme sorgusu: tür + durum, en eski önce
+        IndexSpec("type_status_available", [("type", ASCENDING), ("status", ASCENDING), ("available_at", ASCENDING)]),
+        # Biten işler saklama süresi sonunda silinir
+        IndexSpec("expires_at_ttl", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ]
+
+
+def build_indexes(image_dedup_window_hours: int = 24) -> Dict[str, List[IndexSpec]]:
+    """Koleksiyon başına index tanımları - TTL süreleri ayarlardan türetilenler parametre alır"""
+    return {
+        "users": [
+            IndexSpec("email", [("email", ASCENDING)], {"unique": True}),
+            IndexSpec("id", [("id", ASCENDING)], {"unique": True}),
+            # Sadece doğrulanmamış kullanıcılarda token bulunur
+            IndexSpec("verification_token", [("verification_token", ASCENDING)], {"sparse": True}),
+        ],
+        **{collection: _reading_indexes() for collection in READING_COLLECTIONS},
+        "reading_feed": [
+            # /me/readings: kullanıcının zaman çizelgesi, (timestamp, reading_id) keyset sayfalama
+            IndexSpec("user_timestamp_reading", [("user_id", ASCENDING), ("timestamp", DESCENDING), ("reading_id", DESCENDING)]),
+            # type filtresi (tek tür) için
+            IndexSpec(
+                "user_type_timestamp_reading",
+                [("user_id", ASCENDING), ("type", ASCENDING), ("timestamp", DESCENDING), ("reading_id", DESCENDING)],
+            ),
+            # Geriye dönük doldurma tekrar çalıştırıldığında çift kayıt olmasın
+            IndexSpec("reading_id", [("reading_id", ASCENDING)], {"unique": True}),
+        ],
+        "reading_jobs": _job_queue_indexes(),
+        "email_outbox": _job_queue_indexes(),
+        "daily_horoscopes": [
+            # Burç + tarih + dil tekil; {date, language} sorguları bu index'in önekini kullanır
+            IndexSpec(
+                "date_language_sign",
+                [("date", ASCENDING), ("language", ASCENDING), ("zodiac_sign", ASCENDING)],
+                {"unique": True},
+            ),
+            # Burç geçmişi: {zodiac_sign, language} en yeni önce
+            IndexSpec("sign_language_timestamp", [("zodiac_sign", ASCENDING), ("language", ASCENDING), ("timestamp", DESCENDING)]),
+        ],
+        "tarot_interpretation_cache": [
+            IndexSpec("key", [("key", ASCENDING)], {"unique": True}),
+            # Süresi dolan yorumları Mongo kendisi silsin
+            IndexSpec("expires_at_ttl", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+        ],
+        "generation_leases": [
+            # Sahibi ölen lease'ler süre dolunca temizlenir (acquire zaten süresi dolanı devralır)
+            IndexSpec("expires_at_ttl", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+        ],
+        "scheduler_leases": [
+            IndexSpec("expires_at_ttl", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+        ],
+        "image_fingerprints": [
+            IndexSpec("user_type_created", [("user_id", ASCENDING), ("reading_type", ASCENDING), ("created_at", DESCENDING)]),
+            # Dedup penceresinin dışına düşen parmak izleri artık eşleşmez; Mongo kendisi silsin.
+            # Pencere değişirse eski index collMod ile güncellenmeli (aynı isimle farklı seçenek hata verir)
+            IndexSpec(
+                "created_at_ttl",
+                [("created_at", ASCENDING)],
+                {"expireAfterSeconds": image_dedup_window_hours * 3600},
+            ),
+        ],
+    }
+
+
+INDEXES: Dict[str, List[IndexSpec]] = build_indexes()
+
+
+async def ensure_indexes(db, indexes: Dict[str, List[IndexSpec]] = INDEXES) -> dict:
+    """Tanımlı indexleri oluştur - zaten varsa create_index bir şey yapmaz (idempotent)"""
+    created = 0
+    failed = []
+    for collection_name, specs in indexes.items():
+        collection = db[collection_name]
+        for spec in specs:
+            try:
+                await collection.create_index(spec.keys, name=spec.name, **spec.options)
+                created += 1
+            except OperationFailure as e:
+                # Aynı isimde farklı tanımlı index veya tekil index'i bozan mevcut veri - açılışı durdurma
+                failed.append(f"{collection_name}.{spec.name}")
+                logging.error(f"Index {collection_name}.{spec.name} could not be ensured: {str(e)}")
+    logging.info(f"Ensured {created} MongoDB indexes ({len(failed)} failed)")
+    return {"ensured": created, "failed": failed}
+
+
+async def index_report(db, indexes: Dict[str, List[IndexSpec]] = INDEXES) -> dict:
+    """Eksik, tanımsız ve (son restarttan beri) hiç kullanılmamış indexleri raporla"""
+    report = {}
+    for collection_name, specs in indexes.items():
+        collection = db[collection_name]
+        declared = {spec.name for spec in specs}
+        existing = set()
+        async for index in collection.list_indexes():
+            existing.add(index["name"])
+
+        usage = {}
+        try:
+            async for stat in collection.aggregate([{"$indexStats": {}}]):
+                usage[stat["name"]] = {
+                    "ops": stat["accesses"]["ops"],
+                    "since": stat["accesses"]["since"],
+                }
+        except OperationFailure as e:
+            logging.warning(f"$indexStats unavailable for {collection_name}: {str(e)}")
+
+        report[collection_name] = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared - {"_id_"}),
+            "unused": sorted(name for name, stat in usage.items() if name != "_id_" and stat["ops"] == 0),
+            "usage": usage,
+        }
+    return report
@@ -0,0 +1,104 @@
+"""Yerelleştirilmiş email şablonları - açılışta bir kez yüklenip dil başına derlenir.
+
+templates/email/<isim>.html ortak HTML iskeletidir, templates/email/<dil>.json o dilin metinlerini tutar.
+Derleme sırasında metinler ve dil iskelete yerleştirilir; gönderim anında sadece mesaja özel
+değişkenler (ör. doğrulama linki) eklenir.
+"""
+import html
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+# Şablon başına gönderim anında doldurulan değişkenler
+TEMPLATE_VARIABLES: Dict[str, Tuple[str, ...]] = {
+    "verification": ("verification_url",),
+    "horoscope_ready": ("action_url",),
+}
+
+
+class CompiledTemplate(NamedTuple):
+    subject: str
+    # Sabit metin parçaları ve değişken adları sırayla: ["<html>...", "verification_url", "...</html>"]
+    # Çift indeksler sabit metin, tek indeksler değişken adıdır
+    segments: List[str]
+
+    def render(self, variables: Dict[str, str]) -> str:
+        parts = list(self.segments)
+        for index in range(1, len(parts), 2):
+            parts[index] = html.escape(variables[parts[index]], quote=True)
+        return "".join(parts)
+
+
+class EmailTemplateRegistry:
+    def __init__(self, template_dir: Path, languages: List[str], default_language: str = "tr"):
+        self.template_dir = Path(template_dir)
+        self.default_language = default_language
+        self.templates: Dict[Tuple[str, str], CompiledTemplate] = {}
+        self.rendered = 0
+        for language in dict.fromkeys([default_language, *languages]):
+            self._load_language(language)
+        logging.info(f"Compiled {len(self.templates)} email templates for {sorted({lang for _, lang in self.templates})}")
+
+    def _load_language(self, language: str):
+        strings_path = self.template_dir / f"{language}.json"
+        if not strings_path.exists():
+            # Metni olmayan dil varsayılan dile düşer
+            logging.warning(f"No email strings for language {language}, falling back to {self.default_language}")
+            return
+        strings = json.loads(strings_path.read_text(encoding="utf-8"))
+        for name, variables in TEMPLATE_VARIABLES.items():
+            layout = (self.template_dir / f"{name}.html").read_text(encoding="utf-8")
+            self.templates[(name, language)] = self._compile(name, language, layout, strings[name], variables)
+
+    @staticmethod
+    def _compile(name: str, language: str, layout: str, strings: Dict[str, str], variables: Tuple[str, ...]) -> CompiledTemplate:
+        static = {key: html.escape(value, quote=True) for key, value in strings.items() if key != "subject"}
+        static["lang"] = language
+        segments = [""]
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(layout):
+            key = match.group(1)
+            segments[-1] += layout[position:match.start()]
+            position = match.end()
+            if key in variables:
+                segments.extend([key, ""])
+            elif key in static:
+                segments[-1] += static[key]
+            else:
+                # Eksik çeviri açılışta fark edilsin, ilk gönderimde değil
+                raise ValueError(f"Email template {name} ({language}) has no value for {{{{{key}}}}}")
+        segments[-1] += layout[position:]
+        return CompiledTemplate(subject=strings["subject"], segments=segments)
+
+    def get(self, name: str, language: str) -> CompiledTemplate:
+        template = self.templates.get((name, language))
+        if template is None:
+            template = self.templates[(name, self.default_language)]
+        return template
+
+    def render(self, name: str, language: str, recipient: str, variables: Dict[str, str]) -> dict:
+        """Tek alıcı için outbox mesajı: {"to", "subject", "html"}"""
+        template = self.get(name, language)
+        self.rendered += 1
+        return {"to": recipient, "subject": template.subject, "html": template.render(variables)}
+
+    def render_batch(self, name: str, language: str, recipients: List[Tuple[str, Dict[str, str]]]) -> List[dict]:
+        """Aynı şablon ve dil için çok alıcılı render - şablon bir kez çözülür"""
+        template = self.get(name, language)
+        self.rendered += len(recipients)
+        return [
+            {"to": recipient, "subject": template.subject, "html": template.render(variables)}
+            for recipient, variables in recipients
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "templates": len(self.templates),
+            "languages": sorted({language for _, language in self.templates}),
+            "rendered": self.rendered,
+        }
@@ -0,0 +1,105 @@
+"""Email gönderim taşıyıcıları - outbox worker'ı mesajları bunlardan biriyle iletir.
+
+SendGridTransport üretimde kullanılır. SmtpTransport (MailHog/smtp4dev gibi yerel sunucular) ve
+MemoryTransport (gönderilenleri listede tutar) geliştirme ve testler içindir.
+"""
+import asyncio
+import logging
+import smtplib
+from abc import ABC, abstractmethod
+from email.message import EmailMessage
+from typing import List, Optional
+
+import httpx
+
+
+SENDGRID_API_URL = "https://api.sendgrid.com/v3/mail/send"
+
+
+class EmailDeliveryError(Exception):
+    """Mesaj iletilemediğinde fırlatılır"""
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        """Ağ hataları, 429 ve 5xx geçicidir; diğer 4xx'ler (geçersiz adres, yetki) tekrar denenmez"""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+class EmailTransport(ABC):
+    """Mesaj: {"to", "subject", "html"} - gönderen adresi taşıyıcıda ayarlıdır"""
+    @abstractmethod
+    async def send(self, message: dict):
+        ...
+
+    async def aclose(self):
+        pass
+
+
+class SendGridTransport(EmailTransport):
+    """SendGrid v3 API'sine paylaşılan, bağlantı havuzlu httpx istemcisiyle gönderir"""
+    def __init__(self, api_key: str, sender_email: str, api_url: str = SENDGRID_API_URL, timeout: float = 10.0):
+        self.sender_email = sender_email
+        # api_url yerel bir HTTP taklit sunucusuna yönlendirilebilir
+        self.api_url = api_url
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            headers={"Authorization": f"Bearer {api_key}"},
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+
+    async def send(self, message: dict):
+        body = {
+            "personalizations": [{"to": [{"email": message["to"]}]}],
+            "from": {"email": self.sender_email},
+            "subject": message["subject"],
+            "content": [{"type": "text/html", "value": message["html"]}],
+        }
+        try:
+            response = await self.client.post(self.api_url, json=body)
+        except httpx.HTTPError as e:
+            raise EmailDeliveryError(f"SendGrid request failed: {str(e)}")
+        if response.status_code >= 300:
+            raise EmailDeliveryError(f"SendGrid returned {response.status_code}: {response.text[:200]}", response.status_code)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class SmtpTransport(EmailTransport):
+    """Yerel SMTP sunucusuna gönderir (geliştirme/test) - smtplib bloklayıcı olduğu için thread'de çalışır"""
+    def __init__(self, host: str, port: int, sender_email: str, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender_email = sender_email
+        self.timeout = timeout
+
+    def _send_sync(self, message: dict):
+        email = EmailMessage()
+        email["From"] = self.sender_email
+        email["To"] = message["to"]
+        email["Subject"] = message["subject"]
+        email.set_content(message["html"], subtype="html")
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(email)
+
+    async def send(self, message: dict):
+        try:
+            await asyncio.to_thread(self._send_sync, message)
+        except smtplib.SMTPResponseException as e:
+            # SMTP 4xx geçici, 5xx kalıcı hatadır - HTTP tarafındaki retryable kuralına eşle
+            raise EmailDeliveryError(f"SMTP error {e.smtp_code}: {e.smtp_error!r}", 500 if e.smtp_code < 500 else 400)
+        except (smtplib.SMTPException, OSError) as e:
+            raise EmailDeliveryError(f"SMTP delivery failed: {str(e)}")
+
+
+class MemoryTransport(EmailTransport):
+    """Mesajları göndermeden listede tutar - testlerde outbox'ın ne gönderdiğini incelemek için"""
+    def __init__(self):
+        self.sent: List[dict] = []
+
+    async def send(self, message: dict):
+        logging.info(f"Email captured for {message['to']}: {message['subject']}")
+        self.sent.append(dict(message))
@@ -0,0 +1,402 @@
+"""Çevrimdışı yer adı çözümleme (gazetteer) ve tarihsel UTC farkı.
+
+Kaynak GeoNames biçimindeki TSV dosyasıdır (cities500.txt veya paketteki küçük seed dosyası).
+build_gazetteer.py bu dosyayı numpy dizilerinden oluşan kompakt bir indekse çevirir; indeks
+np.load(mmap_mode="r") ile belleğe eşlenir, süreçler arasında sayfa önbelleği paylaşılır.
+
+İndeks:
+- places.npy: yer kayıtları (enlem, boylam, nüfus, ülke, admin1, saat dilimi sırası)
+- display_blob.npy / display_offsets.npy: yerlerin görünen adları (UTF-8)
+- key_blob.npy / key_offsets.npy / key_places.npy: normalize edilmiş adlar, sıralı (önek araması için ikili arama)
+- key_trigrams.npy: her adın farklı trigram sayısı (bulanık aramada Dice paydası)
+- trigram_offsets.npy / trigram_postings.npy: trigram -> ad sırası listesi (CSR), bulanık arama için
+- timezones.json: saat dilimi adları
+"""
+import bisect
+import json
+import logging
+import os
+import re
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+
+PLACE_DTYPE = np.dtype([
+    ("latitude", "f4"),
+    ("longitude", "f4"),
+    ("population", "u4"),
+    ("timezone", "u2"),
+    ("country", "S2"),
+    ("admin1", "S20"),
+])
+INDEX_FILES = ["places", "display_blob", "display_offsets", "key_blob", "key_offsets", "key_places",
+               "key_trigrams", "trigram_offsets", "trigram_postings"]
+
+# Trigram alfabesi: boşluk, a-z, 0-9 -> 37 tabanında kod
+_ALPHABET = {char: code for code, char in enumerate(" abcdefghijklmnopqrstuvwxyz0123456789")}
+TRIGRAM_SPACE = len(_ALPHABET) ** 3
+
+# NFKD ile ayrışmayan harfler
+_TRANSLITERATION = str.maketrans({
+    "ı": "i", "İ": "i", "ß": "ss", "ø": "o", "Ø": "o", "æ": "ae", "Æ": "ae",
+    "œ": "oe", "Œ": "oe", "ł": "l", "Ł": "l", "đ": "d", "Đ": "d", "þ": "th", "Þ": "th",
+})
+
+# Çok yaygın trigramların (ör. "an ") listeleri bulanık aramada atlanır
+MAX_POSTINGS_PER_TRIGRAM = 50000
+PREFIX_SCAN_LIMIT = 500
+
+
+def normalize_name(text: str) -> str:
+    """Aramada kullanılan biçim: küçük harf, aksansız, sadece a-z0-9 ve tek boşluk"""
+    text = unicodedata.normalize("NFKD", text.translate(_TRANSLITERATION))
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold()
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def trigram_codes(key: str) -> np.ndarray:
+    padded = f" {key} "
+    codes = {
+        (_ALPHABET[padded[i]] * 37 + _ALPHABET[padded[i + 1]]) * 37 + _ALPHABET[padded[i + 2]]
+        for i in range(len(padded) - 2)
+    }
+    return np.fromiter(codes, dtype=np.uint32, count=len(codes))
+
+
+class Place(NamedTuple):
+    name: str
+    latitude: float
+    longitude: float
+    country: str
+    admin1: str
+    timezone: str
+    population: int
+
+
+def read_geonames(lines: Iterable[str], max_alternates: Optional[int] = None) -> List[dict]:
+    """GeoNames ana tablo satırlarını (19 sütun, tab ayrımlı) oku; # ile başlayan satırlar yorumdur"""
+    rows = []
+    for line in lines:
+        if not line.strip() or line.startswith("#"):
+            continue
+        fields = line.rstrip("\n").split("\t")
+        alternates = [name for name in fields[3].split(",") if name]
+        if max_alternates is not None:
+            alternates = alternates[:max_alternates]
+        rows.append({
+            "name": fields[1],
+            "names": [fields[1], fields[2], *alternates],
+            "latitude": float(fields[4]),
+            "longitude": float(fields[5]),
+            "country": fields[8],
+            "admin1": fields[10],
+            "population": int(fields[14] or 0),
+            "timezone": fields[17],
+        })
+    return rows
+
+
+def build_index(rows: List[dict]) -> Dict[str, object]:
+    """Okunan satırlardan indeks dizilerini oluştur (build_gazetteer.py bunları diske yazar)"""
+    timezones = sorted({row["timezone"] for row in rows if row["timezone"]})
+    timezone_ids = {name: index + 1 for index, name in enumerate(timezones)}  # 0 = bilinmiyor
+
+    places = np.zeros(len(rows), dtype=PLACE_DTYPE)
+    display = []
+    entries = set()
+    for place_id, row in enumerate(rows):
+        places[place_id] = (
+            row["latitude"], row["longitude"], min(row["population"], 2 ** 32 - 1),
+            timezone_ids.get(row["timezone"], 0), row["country"].encode("ascii", "ignore"),
+            row["admin1"].encode("ascii", "ignore")[:20],
+        )
+        display.append(row["name"].encode("utf-8"))
+        for name in row["names"]:
+            key = normalize_name(name)
+            if key:
+                entries.add((key, place_id))
+
+    # Aynı ad için kalabalık yer önce gelsin
+    sorted_entries = sorted(entries, key=lambda entry: (entry[0], -int(places[entry[1]]["population"])))
+    keys = [key.encode("ascii") for key, _ in sorted_entries]
+
+    postings_by_code: Dict[int, List[int]] = {}
+    key_trigrams = np.zeros(len(sorted_entries), dtype=np.uint16)
+    for key_id, (key, _) in enumerate(sorted_entries):
+        codes = trigram_codes(key)
+        key_trigrams[key_id] = len(codes)
+        for code in codes.tolist():
+            postings_by_code.setdefault(code, []).append(key_id)
+    trigram_counts = np.zeros(TRIGRAM_SPACE, dtype=np.uint32)
+    for code, postings in postings_by_code.items():
+        trigram_counts[code] = len(postings)
+    trigram_offsets = np.zeros(TRIGRAM_SPACE + 1, dtype=np.uint32)
+    np.cumsum(trigram_counts, out=trigram_offsets[1:])
+    trigram_postings = np.zeros(int(trigram_offsets[-1]), dtype=np.uint32)
+    for code, postings in postings_by_code.items():
+        trigram_postings[trigram_offsets[code]:trigram_offsets[code + 1]] = postings
+
+    return {
+        "places": places,
+        "display_blob": np.frombuffer(b"".join(display), dtype=np.uint8),
+        "display_offsets": _offsets(display),
+        "key_blob": np.frombuffer(b"".join(keys), dtype=np.uint8),
+        "key_offsets": _offsets(keys),
+        "key_places": np.array([place_id for _, place_id in sorted_entries], dtype=np.uint32),
+        "key_trigrams": key_trigrams,
+        "trigram_offsets": trigram_offsets,
+        "trigram_postings": trigram_postings,
+        "timezones": timezones,
+    }
+
+
+def _offsets(chunks: List[bytes]) -> np.ndarray:
+    offsets = np.zeros(len(chunks) + 1, dtype=np.uint64)
+    np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+    return offsets
+
+
+def save_index(index: Dict[str, object], directory: Path):
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in INDEX_FILES:
+        np.save(directory / f"{name}.npy", index[name])
+    (directory / "timezones.json").write_text(json.dumps(index["timezones"]), encoding="utf-8")
+
+
+class Gazetteer:
+    def __init__(self, index: Dict[str, object]):
+        self.places = index["places"]
+        self.display_blob = index["display_blob"]
+        self.display_offsets = index["display_offsets"]
+        self.key_blob = index["key_blob"]
+        self.key_offsets = index["key_offsets"]
+        self.key_places = index["key_places"]
+        self.key_trigrams = index["key_trigrams"]
+        self.trigram_offsets = index["trigram_offsets"]
+        self.trigram_postings = index["trigram_postings"]
+        self.timezones = [""] + list(index["timezones"])
+        self.lookups = 0
+        self.misses = 0
+        self.fuzzy_lookups = 0
+
+    @classmethod
+    def open(cls, directory: Path) -> "Gazetteer":
+        """Diskteki indeksi belleğe eşleyerek aç"""
+        index = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in INDEX_FILES}
+        index["timezones"] = json.loads((directory / "timezones.json").read_text(encoding="utf-8"))
+        return cls(index)
+
+    @classmethod
+    def from_geonames_file(cls, path: Path) -> "Gazetteer":
+        """İndeks dosyası yoksa TSV'den bellekte kur (seed gibi küçük dosyalar için)"""
+        with open(path, encoding="utf-8") as source:
+            return cls(build_index(read_geonames(source)))
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def _key(self, key_id: int) -> str:
+        return self.key_blob[int(self.key_offsets[key_id]):int(self.key_offsets[key_id + 1])].tobytes().decode("ascii")
+
+    def _place(self, place_id: int) -> Place:
+        record = self.places[place_id]
+        name = self.display_blob[int(self.display_offsets[place_id]):int(self.display_offsets[place_id + 1])]
+        return Place(
+            name=name.tobytes().decode("utf-8"),
+            latitude=round(float(record["latitude"]), 5),
+            longitude=round(float(record["longitude"]), 5),
+            country=record["country"].decode("ascii"),
+            admin1=record["admin1"].decode("ascii"),
+            timezone=self.timezones[int(record["timezone"])],
+            population=int(record["population"]),
+        )
+
+    def _lower_bound(self, key: str) -> int:
+        # Değişken uzunluklu anahtarlar üzerinde ikili arama (bellek eşlemeli blob'dan okunur)
+        keys = _KeyView(self)
+        return bisect.bisect_left(keys, key)
+
+    def _exact(self, key: str) -> List[int]:
+        place_ids = []
+        key_id = self._lower_bound(key)
+        while key_id < len(self.key_places) and self._key(key_id) == key:
+            place_ids.append(int(self.key_places[key_id]))
+            key_id += 1
+        return place_ids
+
+    def _prefix(self, prefix: str, limit: int = PREFIX_SCAN_LIMIT) -> List[int]:
+        place_ids = []
+        key_id = self._lower_bound(prefix)
+        while key_id < len(self.key_places) and len(place_ids) < limit and self._key(key_id).startswith(prefix):
+            place_ids.append(int(self.key_places[key_id]))
+            key_id += 1
+        return place_ids
+
+    def _fuzzy(self, key: str, min_similarity: float = 0.5) -> List[int]:
+        query_codes = trigram_codes(key)
+        lists = []
+        for code in query_codes.tolist():
+            start, end = int(self.trigram_offsets[code]), int(self.trigram_offsets[code + 1])
+            if 0 < end - start <= MAX_POSTINGS_PER_TRIGRAM:
+                lists.append(self.trigram_postings[start:end])
+        if not lists:
+            return []
+        key_ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+        # Dice benzerliği; iki taraf da farklı trigram kümeleriyle sayılır (tekrarlı trigramlı adlar cezalanmaz)
+        key_counts = self.key_trigrams[key_ids].astype(np.float64)
+        similarity = 2.0 * shared / (len(query_codes) + key_counts)
+        good = similarity >= min_similarity
+        if not good.any():
+            return []
+        best = similarity[good].max()
+        # En iyi skora yakın adaylar; aralarındaki seçimi nüfus yapar
+        chosen = key_ids[good][similarity[good] >= best - 0.05]
+        return [int(self.key_places[key_id]) for key_id in chosen.tolist()]
+
+    def _candidates(self, key: str) -> List[int]:
+        place_ids = self._exact(key)
+        if not place_ids and len(key) >= 3:
+            place_ids = self._prefix(key)
+        if not place_ids and len(key) >= 3:
+            self.fuzzy_lookups += 1
+            place_ids = self._fuzzy(key)
+        return place_ids
+
+    def _rank(self, place_ids: List[int], qualifiers: List[str]) -> List[int]:
+        """Nitelikler (ülke kodu veya üst yer adı, ör. "Kadıköy, İstanbul") uyan adayları öne al, sonra nüfus"""
+        place_ids = list(dict.fromkeys(place_ids))
+        preferred_countries, preferred_regions = set(), set()
+        for qualifier in qualifiers:
+            if len(qualifier) == 2:
+                preferred_countries.add(qualifier.upper().encode("ascii"))
+                continue
+            parent_ids = self._candidates(qualifier)
+            if parent_ids:
+                parent = self.places[max(parent_ids, key=lambda place_id: int(self.places[place_id]["population"]))]
+                preferred_countries.add(parent["country"])
+                preferred_regions.add((parent["country"], parent["admin1"]))
+
+        def score(place_id: int):
+            record = self.places[place_id]
+            return (
+                (record["country"], record["admin1"]) in preferred_regions,
+                record["country"] in preferred_countries,
+                int(record["population"]),
+            )
+
+        return sorted(place_ids, key=score, reverse=True)
+
+    def lookup(self, query: str) -> Optional[Place]:
+        """Serbest metin yer adını en olası yere çöz: tam ad, önek, sonra trigram benzerliği"""
+        self.lookups += 1
+        parts = [normalize_name(part) for part in query.split(",")]
+        parts = [part for part in parts if part]
+        if not parts:
+            self.misses += 1
+            return None
+        place_ids = self._candidates(parts[0])
+        if not place_ids:
+            self.misses += 1
+            return None
+        return self._place(self._rank(place_ids, parts[1:])[0])
+
+    def search(self, prefix: str, limit: int = 10) -> List[Place]:
+        """Otomatik tamamlama: ada göre önek araması, kalabalık yerler önce"""
+        key = normalize_name(prefix)
+        if len(key) < 2:
+            return []
+        place_ids = list(dict.fromkeys(self._prefix(key)))
+        place_ids.sort(key=lambda place_id: int(self.places[place_id]["population"]), reverse=True)
+        return [self._place(place_id) for place_id in place_ids[:limit]]
+
+    def stats(self) -> dict:
+        return {
+            "places": len(self.places),
+            "names": len(self.key_places),
+            "lookups": self.lookups,
+            "misses": self.misses,
+            "fuzzy_lookups": self.fuzzy_lookups,
+        }
+
+
+class _KeyView:
+    """bisect için anahtar dizisi görünümü - anahtarlar sadece karşılaştırılırken okunur"""
+    def __init__(self, gazetteer: Gazetteer):
+        self.gazetteer = gazetteer
+
+    def __len__(self) -> int:
+        return len(self.gazetteer.key_places)
+
+    def __getitem__(self, key_id: int) -> str:
+        return self.gazetteer._key(key_id)
+
+
+def utc_offset_hours(timezone: str, local_time: datetime) -> Optional[float]:
+    """Saat diliminin verilen yerel andaki UTC farkı (tzdata geçmişiyle: yaz saati ve eski kurallar dahil)"""
+    try:
+        zone = ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+    # Geri alınan saatte iki kez yaşanan anlar için ilk (yaz saati) yorum kullanılır
+    return local_time.replace(tzinfo=zone, fold=0).utcoffset().total_seconds() / 3600.0
+
+
+def open_gazetteer(index_dir: Path, seed_path: Optional[Path] = None) -> Optional["Gazetteer"]:
+    """Derlenmiş indeks varsa belleğe eşle, yoksa seed dosyasından bellekte kur"""
+    if all((index_dir / f"{name}.npy").exists() for name in INDEX_FILES):
+        gazetteer = Gazetteer.open(index_dir)
+        logging.info(f"Gazetteer index mapped from {index_dir}: {len(gazetteer)} places")
+        return gazetteer
+    if (index_dir / "places.npy").exists():
+        logging.warning(f"Gazetteer index in {index_dir} is from an older build (missing files); rebuild it with build_gazetteer.py")
+    if seed_path is not None and seed_path.exists():
+        gazetteer = Gazetteer.from_geonames_file(seed_path)
+        logging.warning(f"Gazetteer index not found in {index_dir}; using {len(gazetteer)} seed places (run build_gazetteer.py)")
+        return gazetteer
+    logging.warning("No gazetteer available; birth places will not be resolved")
+    return None
+
+
+class BirthLocationResolver:
+    """Doğum koordinatı ve o andaki UTC farkı: verilen değerler > gazetteer > varsayılan konum
+
+    API ve backfill script'leri aynı kuralı kullansın diye tek yerde tutulur.
+    """
+    def __init__(self, gazetteer: Optional[Gazetteer], default_latitude: float, default_longitude: float,
+                 default_utc_offset: float):
+        self.gazetteer = gazetteer
+        self.default_latitude = default_latitude
+        self.default_longitude = default_longitude
+        self.default_utc_offset = default_utc_offset
+
+    @classmethod
+    def from_env(cls, gazetteer: Optional[Gazetteer]) -> "BirthLocationResolver":
+        """DEFAULT_BIRTH_LATITUDE/LONGITUDE/UTC_OFFSET ortam değişkenleri (varsayılan İstanbul)"""
+        return cls(
+            gazetteer,
+            float(os.environ.get("DEFAULT_BIRTH_LATITUDE", 41.0082)),
+            float(os.environ.get("DEFAULT_BIRTH_LONGITUDE", 28.9784)),
+            float(os.environ.get("DEFAULT_BIRTH_UTC_OFFSET", 3.0)),
+        )
+
+    def resolve(self, birth_place: Optional[str], local_time: datetime, latitude: Optional[float] = None,
+                longitude: Optional[float] = None, utc_offset: Optional[float] = None) -> dict:
+        place = None
+        if (latitude is None or longitude is None or utc_offset is None) and self.gazetteer is not None and birth_place:
+            place = self.gazetteer.lookup(birth_place)
+        if latitude is None or longitude is None:
+            latitude, longitude = (place.latitude, place.longitude) if place else (self.default_latitude, self.default_longitude)
+        if utc_offset is None and place is not None and place.timezone:
+            # tzdata geçmişi: o tarihteki yaz saati ve saat dilimi değişiklikleri dahil
+            utc_offset = utc_offset_hours(place.timezone, local_time)
+        if utc_offset is None:
+            utc_offset = self.default_utc_offset
+        location = {"latitude": latitude, "longitude": longitude, "utc_offset": utc_offset}
+        if place is not None:
+            location.update({"place": place.name, "country": place.country, "timezone": place.timezone})
+        return location
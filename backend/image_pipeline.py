@@ -0,0 +1,125 @@
+"""Gemini vision çağrılarından önce resim ön işleme (EXIF yönü, küçültme, yeniden sıkıştırma)"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+
+class ProcessedImage(NamedTuple):
+    data: bytes
+    dhash: Optional[int]  # 64 bit fark hash'i (algısal tekrar tespiti için)
+
+
+def dhash(img: Image.Image, hash_size: int = 8) -> int:
+    """Fark hash'i: komşu piksellerin parlaklık farkından 64 bitlik algısal parmak izi"""
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def normalize_image(data: bytes, max_edge: int, quality: int) -> Tuple[bytes, int]:
+    """Resmi düzelt, küçült ve metadata'sız JPEG olarak yeniden kodla; dHash'ini de hesapla (process havuzunda çalışır)"""
+    with Image.open(BytesIO(data)) as img:
+        # JPEG'lerde decoder'ın doğrudan küçük ölçekte açmasını iste (çok daha hızlı)
+        img.draft("RGB", (max_edge, max_edge))
+        img = ImageOps.exif_transpose(img)
+
+        if img.mode in ("RGBA", "LA", "P"):
+            rgba = img.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.split()[-1])
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        out = BytesIO()
+        # exif/icc parametresi verilmediği için metadata kopyalanmaz
+        img.save(out, format="JPEG", quality=quality, optimize=True)
+        return out.getvalue(), dhash(img)
+
+
+class ImagePipeline:
+    """Resim ön işlemeyi event loop dışında, bir process havuzunda çalıştırır"""
+    def __init__(self, max_edge: int = 1536, quality: int = 85, max_workers: int = 2, enabled: bool = True):
+        self.max_edge = max_edge
+        self.quality = quality
+        self.max_workers = max_workers
+        self.enabled = enabled
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.total_ms = 0.0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Havuz ilk kullanımda oluşturulur (import sırasında process açılmasın)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    async def process(self, data: bytes) -> ProcessedImage:
+        """Çözülmüş resim baytlarını alır, Gemini'ye gönderilecek baytları ve dHash'i döndürür
+
+        Base64 çözümü ve doğrulaması çağıran tarafta (decode_image_base64) bir kez yapılır.
+        """
+        if not self.enabled:
+            return ProcessedImage(data, None)
+
+        started_at = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            result, fingerprint = await loop.run_in_executor(
+                self.executor, normalize_image, data, self.max_edge, self.quality
+            )
+        except Exception as e:
+            # Bozuk/desteklenmeyen resimde orijinali gönder, Gemini karar versin
+            self.failed += 1
+            logging.warning(f"Image preprocessing failed, sending original: {str(e)}")
+            return ProcessedImage(data, None)
+
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        self.processed += 1
+        self.bytes_in += len(data)
+        self.bytes_out += len(result)
+        self.total_ms += elapsed_ms
+        logging.info(f"Image preprocessed: {len(data)} -> {len(result)} bytes in {elapsed_ms:.0f} ms")
+        return ProcessedImage(result, fingerprint)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_edge": self.max_edge,
+            "quality": self.quality,
+            "processed": self.processed,
+            "failed": self.failed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "reduction_ratio": round(1 - self.bytes_out / self.bytes_in, 3) if self.bytes_in else 0.0,
+            "avg_ms": round(self.total_ms / self.processed, 2) if self.processed else 0.0,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
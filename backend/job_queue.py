@@ -0,0 +1,277 @@
+"""MongoDB tabanlı iş kuyruğu - yavaş AI okumaları HTTP isteğinin dışında, async worker'larda çalışır.
+
+Worker bir işi görünmezlik süresi (lease) ile üstlenir ve çalışırken lease'i yeniler.
+Worker çökerse lease dolar ve iş başka bir worker tarafından tekrar alınır.
+"""
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+
+JobHandler = Callable[[dict], Awaitable[dict]]
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class JobQueue:
+    def __init__(
+        self,
+        collection,
+        concurrency: Dict[str, int],
+        visibility_timeout: float = 120,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+        retention_hours: int = 24,
+        on_complete: Optional[Callable[[dict], Awaitable[None]]] = None,
+        is_retryable: Callable[[Exception], bool] = lambda e: True,
+    ):
+        self.collection = collection
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retention_hours = retention_hours
+        self.on_complete = on_complete
+        self.is_retryable = is_retryable
+        self.worker_id = str(uuid.uuid4())
+        self.handlers: Dict[str, JobHandler] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._workers: List[asyncio.Task] = []
+        self.running: Dict[str, int] = {}
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.worker_errors = 0
+
+    def register(self, job_type: str, handler: JobHandler):
+        self.handlers[job_type] = handler
+
+    async def enqueue(self, job_type: str, user_id: str, payload: dict, callback_url: Optional[str] = None) -> dict:
+        if job_type not in self.handlers:
+            raise ValueError(f"No handler registered for job type {job_type}")
+        now = datetime.utcnow()
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "user_id": user_id,
+            "payload": payload,
+            "callback_url": callback_url,
+            "status": "queued",
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "available_at": now,
+            "lease_expires_at": None,
+        }
+        await self.collection.insert_one(dict(job))
+        # Bu süreçteki worker'lar yoklama aralığını beklemeden başlasın
+        wakeup = self._wakeups.get(job_type)
+        if wakeup is not None:
+            wakeup.set()
+        return job
+
+    async def enqueue_many(self, job_type: str, items: List[Tuple[str, dict]]) -> int:
+        """(user_id, payload) çiftlerini tek insert_many ile kuyruğa ekle"""
+        if job_type not in self.handlers:
+            raise ValueError(f"No handler registered for job type {job_type}")
+        if not items:
+            return 0
+        now = datetime.utcnow()
+        jobs = [
+            {
+                "id": str(uuid.uuid4()),
+                "type": job_type,
+                "user_id": user_id,
+                "payload": payload,
+                "callback_url": None,
+                "status": "queued",
+                "attempts": 0,
+                "result": None,
+                "error": None,
+                "created_at": now,
+                "updated_at": now,
+                "available_at": now,
+                "lease_expires_at": None,
+            }
+            for user_id, payload in items
+        ]
+        await self.collection.insert_many(jobs, ordered=False)
+        wakeup = self._wakeups.get(job_type)
+        if wakeup is not None:
+            wakeup.set()
+        return len(jobs)
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0, "payload": 0})
+
+    def start(self):
+        if self._workers:
+            return
+        for job_type in self.handlers:
+            self._wakeups[job_type] = asyncio.Event()
+            self.running[job_type] = 0
+            for _ in range(self.concurrency.get(job_type, 1)):
+                self._workers.append(asyncio.create_task(self._worker(job_type)))
+        logging.info(f"Job queue started: {self.concurrency}")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        # İptal edilen işlerin lease'i dolunca başka worker tekrar alır
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _claim(self, job_type: str) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {
+                "type": job_type,
+                "$or": [
+                    {"status": "queued", "available_at": {"$lte": now}},
+                    # Lease'i dolmuş çalışan iş: worker çökmüş
+                    {"status": "running", "lease_expires_at": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": self.worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.visibility_timeout),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _worker(self, job_type: str):
+        wakeup = self._wakeups[job_type]
+        while True:
+            try:
+                job = await self._claim(job_type)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Job claim error ({job_type}): {str(e)}")
+                job = None
+
+            if job is None:
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.running[job_type] += 1
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # _finish/_fail içindeki geçici veritabanı hataları worker'ı öldürmesin; iş lease dolunca tekrar alınır
+                self.worker_errors += 1
+                logging.error(f"Job worker error ({job_type}) on job {job['id']}: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+            finally:
+                self.running[job_type] -= 1
+
+    async def _heartbeat(self, job_id: str):
+        # Uzun süren işte lease'i yenile ki başka worker işi devralmasın
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await self.collection.update_one(
+                    {"id": job_id, "worker_id": self.worker_id, "status": "running"},
+                    {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.visibility_timeout)}},
+                )
+            except Exception as e:
+                # Tek bir yenileme hatası işi durdurmasın; sonraki turda tekrar denenir
+                logging.warning(f"Job lease renewal failed for {job_id}: {str(e)}")
+
+    @staticmethod
+    async def _stop_heartbeat(heartbeat: asyncio.Task):
+        heartbeat.cancel()
+        # asyncio.wait görevin hatasını fırlatmaz; worker'ın kendi iptali ise yutulmadan yayılır
+        await asyncio.wait([heartbeat])
+        if not heartbeat.cancelled() and heartbeat.exception() is not None:
+            logging.error(f"Job heartbeat error: {str(heartbeat.exception())}")
+
+    async def _run(self, job: dict):
+        if job["attempts"] > self.max_attempts:
+            # Son denemeler worker çökmesiyle bitti (lease doldu) - zehirli işi tekrar çalıştırma
+            logging.error(f"Job {job['id']} abandoned after {job['attempts'] - 1} attempts")
+            await self._finish(job, {"status": "failed", "error": job.get("error") or "İş tamamlanamadı"})
+            self.failed += 1
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            result = await self.handlers[job["type"]](job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._fail(job, str(getattr(e, "detail", None) or e), self.is_retryable(e))
+            return
+        finally:
+            await self._stop_heartbeat(heartbeat)
+
+        await self._finish(job, {"status": "succeeded", "result": result, "error": None})
+        self.succeeded += 1
+
+    async def _fail(self, job: dict, error: str, retryable: bool = True):
+        if retryable and job["attempts"] < self.max_attempts:
+            # Jitter'lı üstel bekleme ile tekrar kuyruğa al
+            delay = random.uniform(0, min(60, 2 ** job["attempts"]))
+            self.retried += 1
+            logging.warning(f"Job {job['id']} failed (attempt {job['attempts']}), retrying in {delay:.1f}s: {error}")
+            await self.collection.update_one(
+                {"id": job["id"], "worker_id": self.worker_id},
+                {"$set": {
+                    "status": "queued",
+                    "error": error,
+                    "available_at": datetime.utcnow() + timedelta(seconds=delay),
+                    "lease_expires_at": None,
+                    "updated_at": datetime.utcnow(),
+                }},
+            )
+            return
+        logging.error(f"Job {job['id']} failed permanently after {job['attempts']} attempts: {error}")
+        await self._finish(job, {"status": "failed", "error": error})
+        self.failed += 1
+
+    async def _finish(self, job: dict, fields: dict):
+        now = datetime.utcnow()
+        fields = {
+            **fields,
+            "lease_expires_at": None,
+            "updated_at": now,
+            "finished_at": now,
+            # Biten işler saklama süresi sonunda TTL index ile silinir
+            "expires_at": now + timedelta(hours=self.retention_hours),
+        }
+        await self.collection.update_one({"id": job["id"], "worker_id": self.worker_id}, {"$set": fields})
+        if self.on_complete is not None:
+            try:
+                await self.on_complete({**job, **fields})
+            except Exception as e:
+                logging.error(f"Job completion hook error for {job['id']}: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "running": dict(self.running),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "worker_errors": self.worker_errors,
+        }
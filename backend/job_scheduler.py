@@ -0,0 +1,250 @@
+"""Uygulamanın event loop'u içinde çalışan cron zamanlayıcı.
+
+Son çalışma durumu MongoDB'de tutulur; yeniden başlatmada kaçırılan çalıştırma bir kez telafi edilir.
+Birden fazla worker varsa Mongo lease ile tek lider seçilir ve işler sadece onda çalışır.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from pymongo.errors import DuplicateKeyError
+
+from single_flight import MongoLease
+
+
+class CronExpression:
+    """Beş alanlı cron ifadesi (dakika saat gün ay haftanın-günü), UTC.
+
+    Desteklenen sözdizimi: `*`, `5`, `1-5`, `*/15`, `0-30/10`, `1,15,30`. Haftanın günü 0-6 (0 = Pazar, 7 de Pazar).
+    """
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = [
+            self._parse_field(field, low, high, is_weekday=(index == 4))
+            for index, (field, (low, high)) in enumerate(zip(fields, self.FIELD_RANGES))
+        ]
+        # Standart cron: gün ve haftanın günü ikisi de kısıtlıysa biri tutması yeterli
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int, is_weekday: bool = False) -> Set[int]:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"Invalid cron step: {field!r}")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_text, end_text = part.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field out of range: {field!r}")
+            values.update(range(start, end + 1, step))
+        if is_weekday:
+            # 7 de Pazar
+            values = {value % 7 for value in values}
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.isoweekday() % 7) in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """`after`dan sonraki ilk eşleşen dakika"""
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # En kötü durumda (ör. 29 Şubat) birkaç yıl ileri bakılır
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+    def last_at_or_before(self, moment: datetime, since: datetime) -> Optional[datetime]:
+        """`since`dan sonra, `moment`a kadar olan en son eşleşme (kaçırılan çalıştırmalar için)"""
+        latest = None
+        candidate = self.next_after(since)
+        while candidate <= moment:
+            latest = candidate
+            candidate = self.next_after(candidate)
+        return latest
+
+
+class ScheduledJob:
+    def __init__(self, name: str, cron: str, func: Callable[[], Awaitable[None]], catch_up: bool = True):
+        self.name = name
+        self.cron = CronExpression(cron)
+        self.func = func
+        self.catch_up = catch_up
+        self.task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+
+
+class JobScheduler:
+    """Lider seçimli, Mongo'da durum tutan asyncio cron zamanlayıcı"""
+    LEADER_KEY = "scheduler:leader"
+
+    def __init__(self, state_collection, lease: MongoLease, tick_seconds: float = 30):
+        self.state = state_collection
+        self.lease = lease
+        self.tick_seconds = tick_seconds
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    def add_job(self, name: str, cron: str, func: Callable[[], Awaitable[None]], catch_up: bool = True):
+        self.jobs[name] = ScheduledJob(name, cron, func, catch_up)
+        logging.info(f"Scheduled job {name} with cron '{cron}' (UTC)")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for job in self.jobs.values():
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+        if self.is_leader:
+            try:
+                await self.lease.release(self.LEADER_KEY)
+            except Exception as e:
+                logging.error(f"Scheduler leadership release error: {str(e)}")
+            self.is_leader = False
+
+    async def _run_loop(self):
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Scheduler tick error: {str(e)}")
+            await asyncio.sleep(self.tick_seconds)
+
+    async def tick(self):
+        """Liderliği al/yenile; liderse zamanı gelen işleri başlat"""
+        was_leader = self.is_leader
+        self.is_leader = await self.lease.acquire(self.LEADER_KEY)
+        if self.is_leader != was_leader:
+            logging.info(f"Scheduler leadership {'acquired' if self.is_leader else 'lost'}")
+        if not self.is_leader:
+            return
+
+        now = datetime.utcnow()
+        for job in self.jobs.values():
+            if job.task is not None and not job.task.done():
+                continue
+            scheduled_for = await self._claim_due_run(job, now)
+            if scheduled_for is not None:
+                job.task = asyncio.create_task(self._execute(job, scheduled_for))
+
+    async def _claim_due_run(self, job: ScheduledJob, now: datetime) -> Optional[datetime]:
+        """Zamanı gelmiş çalıştırmayı atomik olarak üstlen - aynı çalıştırma iki kez başlamaz"""
+        state = await self.state.find_one({"_id": job.name})
+        if state is None:
+            # İlk kayıt: geçmişi telafi etme, bir sonraki eşleşmeden başla
+            try:
+                await self.state.insert_one({"_id": job.name, "last_scheduled_for": now, "cron": job.cron.expression})
+            except DuplicateKeyError:
+                pass
+            return None
+
+        last_scheduled_for = state["last_scheduled_for"]
+        due = job.cron.last_at_or_before(now, last_scheduled_for)
+        if due is None:
+            return None
+
+        missed = due != job.cron.next_after(last_scheduled_for)
+        if missed and not job.catch_up:
+            # Kaçırılanları atla, sadece durumu ilerlet
+            await self.state.update_one({"_id": job.name}, {"$set": {"last_scheduled_for": due}})
+            return None
+
+        result = await self.state.update_one(
+            {"_id": job.name, "last_scheduled_for": last_scheduled_for},
+            {"$set": {"last_scheduled_for": due, "last_started_at": now, "last_status": "running"}}
+        )
+        if result.modified_count != 1:
+            return None
+        if missed:
+            logging.info(f"Catching up missed run of {job.name} scheduled for {due}")
+        return due
+
+    async def _execute(self, job: ScheduledJob, scheduled_for: datetime):
+        started_at = time.perf_counter()
+        status, error = "success", None
+        logging.info(f"Running scheduled job {job.name} ({scheduled_for})")
+        try:
+            await job.func()
+            job.runs += 1
+        except asyncio.CancelledError:
+            status, error = "cancelled", None
+            raise
+        except Exception as e:
+            job.failures += 1
+            status, error = "failed", str(e)
+            logging.error(f"Scheduled job {job.name} failed: {str(e)}")
+        finally:
+            duration = round(time.perf_counter() - started_at, 2)
+            try:
+                await self.state.update_one(
+                    {"_id": job.name},
+                    {"$set": {
+                        "last_status": status,
+                        "last_error": error,
+                        "last_finished_at": datetime.utcnow(),
+                        "last_duration_seconds": duration
+                    }}
+                )
+            except Exception as e:
+                logging.error(f"Scheduler state update error for {job.name}: {str(e)}")
+
+    def stats(self) -> dict:
+        now = datetime.utcnow()
+        jobs: List[dict] = []
+        for job in self.jobs.values():
+            jobs.append({
+                "name": job.name,
+                "cron": job.cron.expression,
+                "next_run": job.cron.next_after(now).isoformat(),
+                "running": job.task is not None and not job.task.done(),
+                "runs": job.runs,
+                "failures": job.failures,
+            })
+        return {"running": self._task is not None, "is_leader": self.is_leader, "jobs": jobs}
@@ -0,0 +1,256 @@
+"""Paylaşılan Gemini istemcisi - tüm AI servisleri bu gateway üzerinden çağrı yapar"""
+import asyncio
+import base64
+import json
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+import httpx
+
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+
+class LlmGatewayError(Exception):
+    """Gemini API çağrısı başarısız olduğunda fırlatılır"""
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        """Ağ hataları, 429 ve 5xx geçicidir; diğer 4xx'ler tekrar denenmez"""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def detect_image_mime_type(image: Union[str, bytes]) -> str:
+    """Resim verisinin ilk baytlarından (veya base64 karakterlerinden) resim tipini tahmin et"""
+    if isinstance(image, bytes):
+        if image.startswith(b"\xff\xd8\xff"):
+            return "image/jpeg"
+        if image.startswith(b"\x89PNG"):
+            return "image/png"
+        if image.startswith(b"RIFF") and image[8:12] == b"WEBP":
+            return "image/webp"
+        if image.startswith(b"GIF8"):
+            return "image/gif"
+        return "image/jpeg"
+
+    signatures = {
+        "/9j/": "image/jpeg",
+        "iVBOR": "image/png",
+        "UklGR": "image/webp",
+        "R0lGO": "image/gif",
+    }
+    for prefix, mime_type in signatures.items():
+        if image.startswith(prefix):
+            return mime_type
+    return "image/jpeg"
+
+
+def image_part(image: Union[str, bytes]) -> dict:
+    """Resmi Gemini inline_data parçasına çevir - ham baytlar base64'e sadece burada kodlanır"""
+    data = base64.b64encode(image).decode("ascii") if isinstance(image, bytes) else image
+    return {
+        "inline_data": {
+            "mime_type": detect_image_mime_type(image),
+            "data": data,
+        }
+    }
+
+
+class GeminiModel:
+    """Tek bir model için yeniden kullanılan istemci (endpoint'ler ve sistem promptları önbellekte)"""
+    def __init__(self, gateway: "LlmGateway", model_name: str):
+        self.gateway = gateway
+        self.model_name = model_name
+        self.generate_url = f"{gateway.base_url}/models/{model_name}:generateContent"
+        self.stream_url = f"{gateway.base_url}/models/{model_name}:streamGenerateContent?alt=sse"
+        self._system_instructions: Dict[str, dict] = {}
+
+    def _system_instruction(self, system_message: str) -> dict:
+        # Aynı sistem promptu her çağrıda yeniden kurulmasın
+        instruction = self._system_instructions.get(system_message)
+        if instruction is None:
+            instruction = {"parts": [{"text": system_message}]}
+            self._system_instructions[system_message] = instruction
+        return instruction
+
+    def build_payload(
+        self,
+        system_message: str,
+        text: str,
+        images: Optional[List[Union[str, bytes]]] = None,
+        response_mime_type: Optional[str] = None,
+    ) -> dict:
+        parts = [{"text": text}]
+        for image in images or []:
+            parts.append(image_part(image))
+
+        payload = {
+            "systemInstruction": self._system_instruction(system_message),
+            "contents": [{"role": "user", "parts": parts}],
+        }
+        if response_mime_type:
+            payload["generationConfig"] = {"responseMimeType": response_mime_type}
+        return payload
+
+    async def generate(self, system_message: str, text: str, images: Optional[List[Union[str, bytes]]] = None,
+                       response_mime_type: Optional[str] = None) -> str:
+        payload = self.build_payload(system_message, text, images, response_mime_type)
+        return await self.gateway.generate(self, payload)
+
+    def stream(self, system_message: str, text: str, images: Optional[List[Union[str, bytes]]] = None) -> AsyncIterator[str]:
+        payload = self.build_payload(system_message, text, images)
+        return self.gateway.stream(self, payload)
+
+
+class LlmGateway:
+    """Keep-alive bağlantı havuzu ve eşzamanlılık limiti olan Gemini gateway'i"""
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = GEMINI_API_BASE,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        timeout_seconds: float = 60.0,
+    ):
+        if not api_key:
+            raise ValueError("Gemini API key not found in environment variables")
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.timeout = httpx.Timeout(timeout_seconds, connect=10.0)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._models: Dict[str, GeminiModel] = {}
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_latency_ms = 0.0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # İstemci event loop içinde ilk kullanımda oluşturulur ve sonra hep aynısı kullanılır
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={"x-goog-api-key": self.api_key, "Content-Type": "application/json"},
+                limits=self.limits,
+                timeout=self.timeout,
+            )
+        return self._client
+
+    def model(self, model_name: str = DEFAULT_MODEL) -> GeminiModel:
+        """Model başına tek bir istemci nesnesi döndür"""
+        model = self._models.get(model_name)
+        if model is None:
+            model = GeminiModel(self, model_name)
+            self._models[model_name] = model
+        return model
+
+    async def _acquire(self):
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def _release(self, started_at: float, success: bool):
+        self.in_flight -= 1
+        self._semaphore.release()
+        if success:
+            self.completed += 1
+            self.total_latency_ms += (time.perf_counter() - started_at) * 1000
+        else:
+            self.failed += 1
+
+    @staticmethod
+    def _extract_text(data: dict) -> str:
+        candidates = data.get("candidates") or []
+        if not candidates:
+            feedback = data.get("promptFeedback", {})
+            raise LlmGatewayError(f"Gemini returned no candidates: {feedback}")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    async def generate(self, model: GeminiModel, payload: dict) -> str:
+        """Tek seferlik generateContent çağrısı"""
+        await self._acquire()
+        started_at = time.perf_counter()
+        success = False
+        try:
+            response = await self.client.post(model.generate_url, json=payload)
+            if response.status_code != 200:
+                raise LlmGatewayError(
+                    f"Gemini API error {response.status_code}: {response.text[:500]}",
+                    status_code=response.status_code,
+                )
+            text = self._extract_text(response.json())
+            success = True
+            return text
+        except httpx.HTTPError as e:
+            raise LlmGatewayError(f"Gemini request failed: {str(e)}") from e
+        finally:
+            self._release(started_at, success)
+
+    async def stream(self, model: GeminiModel, payload: dict) -> AsyncIterator[str]:
+        """streamGenerateContent (SSE) çağrısı - metin parçalarını geldikçe döndür"""
+        await self._acquire()
+        started_at = time.perf_counter()
+        success = False
+        try:
+            async with self.client.stream("POST", model.stream_url, json=payload) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    raise LlmGatewayError(
+                        f"Gemini API error {response.status_code}: {body[:500].decode('utf-8', 'replace')}",
+                        status_code=response.status_code,
+                    )
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if not data:
+                        # Boş "data:" satırı (keep-alive) veri taşımaz
+                        continue
+                    try:
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError as e:
+                        # Yarıda kesilmiş/bozuk parça: ağ hatası gibi tekrar denenebilir say
+                        raise LlmGatewayError(f"Gemini stream returned malformed data: {data[:200]}") from e
+                    if not isinstance(chunk, dict):
+                        raise LlmGatewayError(f"Gemini stream returned unexpected data: {data[:200]}")
+                    text = self._extract_text(chunk) if chunk.get("candidates") else ""
+                    if text:
+                        yield text
+            success = True
+        except httpx.HTTPError as e:
+            raise LlmGatewayError(f"Gemini stream failed: {str(e)}") from e
+        finally:
+            self._release(started_at, success)
+
+    def stats(self) -> dict:
+        return {
+            "models": list(self._models.keys()),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_latency_ms": round(self.total_latency_ms / max(self.completed, 1), 2),
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logging.info("LLM gateway connection pool closed")
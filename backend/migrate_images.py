@@ -0,0 +1,87 @@
+"""Mevcut kahve/el falı dokümanlarındaki image_base64 alanlarını blob store'a taşır.
+
+Kullanım:
+    python migrate_images.py                # tüm koleksiyonları taşı
+    python migrate_images.py --dry-run      # sadece kaç doküman etkileneceğini göster
+    python migrate_images.py --collection coffee_readings --batch-size 50
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from blob_store import blob_store_from_env
+
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+COLLECTIONS = ["coffee_readings", "palm_readings"]
+
+
+async def migrate_collection(db, store, collection_name: str, batch_size: int, dry_run: bool) -> dict:
+    collection = db[collection_name]
+    query = {"image_base64": {"$exists": True}}
+    total = await collection.count_documents(query)
+    logging.info(f"{collection_name}: {total} documents with inline images")
+    if dry_run or total == 0:
+        return {"collection": collection_name, "pending": total, "migrated": 0, "failed": 0}
+
+    migrated = 0
+    failed = 0
+    bytes_moved = 0
+    while True:
+        # Her turda sadece bir batch'in resmini belleğe al
+        batch = await collection.find(query, {"_id": 1, "image_base64": 1}).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        for doc in batch:
+            try:
+                data = base64.b64decode(doc["image_base64"])
+                ref = await store.put(data)
+                await collection.update_one(
+                    {"_id": doc["_id"]},
+                    {"$set": {"image_hash": ref.hash, "image_size": ref.size}, "$unset": {"image_base64": ""}}
+                )
+                migrated += 1
+                bytes_moved += ref.size
+            except Exception as e:
+                failed += 1
+                logging.error(f"{collection_name} {doc['_id']}: migration failed: {str(e)}")
+                # Bozuk veriyi tekrar tekrar denememek için işaretle
+                await collection.update_one(
+                    {"_id": doc["_id"]},
+                    {"$rename": {"image_base64": "image_base64_unmigrated"}}
+                )
+
+        logging.info(f"{collection_name}: {migrated}/{total} migrated ({bytes_moved / 1024 / 1024:.1f} MB)")
+
+    return {"collection": collection_name, "pending": total, "migrated": migrated, "failed": failed}
+
+
+async def main(args):
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    store = blob_store_from_env(db, default_root=ROOT_DIR / 'blobs')
+    try:
+        collections = [args.collection] if args.collection else COLLECTIONS
+        for collection_name in collections:
+            result = await migrate_collection(db, store, collection_name, args.batch_size, args.dry_run)
+            logging.info(f"Result: {result}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Move inline reading images into the blob store")
+    parser.add_argument("--collection", choices=COLLECTIONS, help="Only migrate this collection")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(main(parser.parse_args()))
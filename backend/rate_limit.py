@@ -0,0 +1,98 @@
+"""Toplu AI çağrıları için token bucket hız sınırlayıcı, eşzamanlılık limiti ve jitter'lı tekrar deneme"""
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Saniyede `rate` token dolan, en fazla `burst` token biriktiren kova"""
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """Bir token alınana kadar bekle - bekleyenler kilit sayesinde sırayla geçer"""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class RateLimitedRunner:
+    """Coroutine'leri token bucket + semaphore altında, geçici hatalarda tekrar deneyerek çalıştırır"""
+    def __init__(
+        self,
+        rate: float,
+        max_in_flight: int,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        is_retryable: Callable[[Exception], bool] = lambda e: True,
+    ):
+        self.bucket = TokenBucket(rate)
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.is_retryable = is_retryable
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: 0 ile üstel sınır arasında rastgele bekleme (aynı anda tekrar denemeyi önler)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def run(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                await self.bucket.acquire()
+                self.in_flight += 1
+                try:
+                    result = await func(*args, **kwargs)
+                    self.completed += 1
+                    return result
+                except Exception as e:
+                    if attempt >= self.max_retries or not self.is_retryable(e):
+                        self.failed += 1
+                        raise
+                    error = e
+                finally:
+                    self.in_flight -= 1
+
+            # Beklerken slot tutma, başka işler ilerlesin
+            delay = self.backoff(attempt)
+            attempt += 1
+            self.retried += 1
+            logging.warning(f"Retrying in {delay:.1f}s (attempt {attempt}/{self.max_retries}): {str(error)}")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.bucket.rate,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
@@ -0,0 +1,9 @@
+"""reading_feed koleksiyonu yardımcıları - API ve backfill script'i özetleri aynı kuralla üretir"""
+
+
+def feed_summary(text: str, max_chars: int) -> str:
+    """Yorumun ilk cümlelerinden kısa bir özet (zaman çizelgesi kartı için)"""
+    text = " ".join((text or "").split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + "…"
@@ -1,27 +1,46 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Depends, BackgroundTasks, Request, Query, Header
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional
 import uuid
 from datetime import datetime, timedelta
 import base64
-from emergentintegrations.llm.chat import LlmChat, UserMessage, ImageContent
+import json
+import hashlib
+import hmac
 import asyncio
 import random
 import bcrypt
 import jwt
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-import schedule
+import httpx
+from urllib.parse import quote, urlparse
 import time
 import threading
+from llm_gateway import LlmGateway, LlmGatewayError, DEFAULT_MODEL
+from rate_limit import RateLimitedRunner
+from single_flight import DistributedSingleFlight, MongoLease, SingleFlightTimeout
+from job_scheduler import JobScheduler
+from job_queue import JobQueue, TERMINAL_STATUSES
+from ephemeris import HOUSE_SYSTEMS, EphemerisTable, chart_to_dict, compute_charts, julian_day
+from gazetteer import BirthLocationResolver, open_gazetteer
+from reading_feed import feed_summary
+from email_templates import EmailTemplateRegistry
+from email_transport import EmailTransport, MemoryTransport, SendGridTransport, SmtpTransport, SENDGRID_API_URL
+from blob_store import BlobRef, blob_store_from_env
+from image_pipeline import ImagePipeline, hamming_distance
+from db_indexes import build_indexes, ensure_indexes, index_report
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 
 
 ROOT_DIR = Path(__file__).parent
@@ -32,6 +51,9 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Okuma resimleri için blob store (local veya gridfs)
+blob_store = blob_store_from_env(db, default_root=ROOT_DIR / 'blobs')
+
 # Create the main app without a prefix
 app = FastAPI(title="✨ falım API ✨", description="🔮 Mistik AI ile fal okuma uygulaması 🌙")
 
@@ -42,10 +64,132 @@ api_router = APIRouter(prefix="/api")
 JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
 JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRE_MINUTES', 1440))
+# Admin/operasyon endpoint'leri için X-Admin-Key değeri (boşsa bu endpoint'ler kapalı)
+ADMIN_API_KEY = os.environ.get('ADMIN_API_KEY')
+
+# LLM Configuration
+GEMINI_MODEL = os.environ.get('GEMINI_MODEL', DEFAULT_MODEL)
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 16))
+LLM_MAX_CONNECTIONS = int(os.environ.get('LLM_MAX_CONNECTIONS', 32))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get('LLM_MAX_KEEPALIVE_CONNECTIONS', 16))
+LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', 60))
+
+# Daily Horoscope Generation Configuration
+HOROSCOPE_REQUESTS_PER_SECOND = float(os.environ.get('HOROSCOPE_REQUESTS_PER_SECOND', 2))
+HOROSCOPE_MAX_IN_FLIGHT = int(os.environ.get('HOROSCOPE_MAX_IN_FLIGHT', 4))
+HOROSCOPE_MAX_RETRIES = int(os.environ.get('HOROSCOPE_MAX_RETRIES', 3))
+HOROSCOPE_RETRY_BASE_SECONDS = float(os.environ.get('HOROSCOPE_RETRY_BASE_SECONDS', 1.0))
+# İstek yolundaki (cache miss) üretim ayrı kovadan harcar; scheduler'ın toplu işi arkasında sıra beklemez
+HOROSCOPE_INTERACTIVE_REQUESTS_PER_SECOND = float(os.environ.get('HOROSCOPE_INTERACTIVE_REQUESTS_PER_SECOND', 1))
+HOROSCOPE_INTERACTIVE_MAX_IN_FLIGHT = int(os.environ.get('HOROSCOPE_INTERACTIVE_MAX_IN_FLIGHT', 2))
+# Bir dilin 12 burcunu tek JSON çağrısında üret; doğrulanamayanlar burç başına çağrıya düşer
+HOROSCOPE_BATCH_ENABLED = os.environ.get('HOROSCOPE_BATCH_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+HOROSCOPE_BATCH_MIN_WORDS = int(os.environ.get('HOROSCOPE_BATCH_MIN_WORDS', 20))
+HOROSCOPE_BATCH_MAX_WORDS = int(os.environ.get('HOROSCOPE_BATCH_MAX_WORDS', 200))
+# Eksik yorum üretiminde worker'lar arası birleştirme (Mongo lease)
+HOROSCOPE_DISTRIBUTED_SINGLE_FLIGHT = os.environ.get('HOROSCOPE_DISTRIBUTED_SINGLE_FLIGHT', 'true').lower() in ('1', 'true', 'yes')
+HOROSCOPE_LEASE_SECONDS = int(os.environ.get('HOROSCOPE_LEASE_SECONDS', 60))
+# Başka worker'ın üretimini en fazla bu kadar bekle, sonra 503 dön (lease üretim boyunca yenilenir)
+HOROSCOPE_WAIT_TIMEOUT_SECONDS = float(os.environ.get('HOROSCOPE_WAIT_TIMEOUT_SECONDS', 180))
+# Scheduler Configuration (cron ifadeleri UTC)
+SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+HOROSCOPE_CRON = os.environ.get('HOROSCOPE_CRON', '0 6 * * *')
+# Ertesi günün yorumlarını sakin saatlerde önceden üret (boş bırakılırsa kapalı)
+HOROSCOPE_LOOKAHEAD_CRON = os.environ.get('HOROSCOPE_LOOKAHEAD_CRON', '0 20 * * *')
+HOROSCOPE_LANGUAGES = [lang.strip() for lang in os.environ.get('HOROSCOPE_LANGUAGES', 'tr,en,de,fr,es').split(',') if lang.strip()]
+SCHEDULER_TICK_SECONDS = float(os.environ.get('SCHEDULER_TICK_SECONDS', 30))
+SCHEDULER_LEASE_SECONDS = int(os.environ.get('SCHEDULER_LEASE_SECONDS', 90))
+# Günün yorumları için istemci/CDN önbellek süresi (gün sonunu geçmez)
+HOROSCOPE_CACHE_MAX_AGE_SECONDS = int(os.environ.get('HOROSCOPE_CACHE_MAX_AGE_SECONDS', 3600))
+
+# Upload Configuration
+MAX_IMAGE_UPLOAD_BYTES = int(os.environ.get('MAX_IMAGE_UPLOAD_BYTES', 10 * 1024 * 1024))
+# Multipart sınırları ve form alanları için Content-Length payı
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+
+# History Pagination Configuration
+HISTORY_PAGE_SIZE = int(os.environ.get('HISTORY_PAGE_SIZE', 20))
+HISTORY_MAX_PAGE_SIZE = int(os.environ.get('HISTORY_MAX_PAGE_SIZE', 100))
+FEED_SUMMARY_CHARS = int(os.environ.get('FEED_SUMMARY_CHARS', 160))
+
+# Birth Chart Configuration
+ASTROLOGY_HOUSE_SYSTEM = os.environ.get('ASTROLOGY_HOUSE_SYSTEM', 'placidus')
+if ASTROLOGY_HOUSE_SYSTEM not in HOUSE_SYSTEMS:
+    raise ValueError(f"ASTROLOGY_HOUSE_SYSTEM must be one of {HOUSE_SYSTEMS}")
+# Önceden hesaplanmış günlük efemeris tablosu (build_ephemeris_table.py); yoksa seriler hesaplanır
+EPHEMERIS_TABLE_DIR = Path(os.environ.get('EPHEMERIS_TABLE_DIR', ROOT_DIR / 'data' / 'ephemeris'))
+# Çevrimdışı yer adı indeksi (build_gazetteer.py ile oluşturulur); yoksa seed listesi kullanılır
+GAZETTEER_DIR = Path(os.environ.get('GAZETTEER_DIR', ROOT_DIR / 'data' / 'gazetteer'))
+GAZETTEER_SEED = ROOT_DIR / 'data' / 'seed_places.tsv'
+# Doğum yeri çözülemezse ve koordinat/saat farkı verilmezse kullanılan konum:
+# DEFAULT_BIRTH_LATITUDE/LONGITUDE/UTC_OFFSET, BirthLocationResolver.from_env okur (varsayılan İstanbul)
+
+# Reading Job Queue Configuration
+JOB_QUEUE_ENABLED = os.environ.get('JOB_QUEUE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Tür başına eşzamanlı worker sayısı, ör. "coffee=4,palm=4,astrology=8"
+JOB_CONCURRENCY = {
+    job_type.strip(): int(count)
+    for job_type, count in (
+        item.split("=", 1) for item in os.environ.get('JOB_CONCURRENCY', 'coffee=4,palm=4,astrology=4').split(",") if "=" in item
+    )
+}
+JOB_VISIBILITY_TIMEOUT_SECONDS = float(os.environ.get('JOB_VISIBILITY_TIMEOUT_SECONDS', 120))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+JOB_RETENTION_HOURS = int(os.environ.get('JOB_RETENTION_HOURS', 24))
+JOB_EVENTS_POLL_SECONDS = float(os.environ.get('JOB_EVENTS_POLL_SECONDS', 1.0))
+# Webhook gönderilebilecek hostlar (boşsa callback_url kabul edilmez)
+JOB_WEBHOOK_ALLOWED_HOSTS = [host.strip().lower() for host in os.environ.get('JOB_WEBHOOK_ALLOWED_HOSTS', '').split(',') if host.strip()]
+
+# Image Preprocessing Configuration
+IMAGE_PIPELINE_ENABLED = os.environ.get('IMAGE_PIPELINE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+IMAGE_MAX_EDGE = int(os.environ.get('IMAGE_MAX_EDGE', 1536))
+IMAGE_JPEG_QUALITY = int(os.environ.get('IMAGE_JPEG_QUALITY', 85))
+IMAGE_PIPELINE_WORKERS = int(os.environ.get('IMAGE_PIPELINE_WORKERS', 2))
+
+# Image Deduplication Configuration
+IMAGE_DEDUP_ENABLED = os.environ.get('IMAGE_DEDUP_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+IMAGE_DEDUP_MAX_DISTANCE = int(os.environ.get('IMAGE_DEDUP_MAX_DISTANCE', 10))  # 64 bit dHash üzerinde Hamming mesafesi
+IMAGE_DEDUP_WINDOW_HOURS = int(os.environ.get('IMAGE_DEDUP_WINDOW_HOURS', 24))
+IMAGE_DEDUP_MAX_CANDIDATES = int(os.environ.get('IMAGE_DEDUP_MAX_CANDIDATES', 50))
+# Parmak izi TTL index'i dedup penceresinden türetilir
+MONGO_INDEXES = build_indexes(image_dedup_window_hours=IMAGE_DEDUP_WINDOW_HOURS)
+
+# Tarot Interpretation Cache Configuration
+TAROT_CACHE_ENABLED = os.environ.get('TAROT_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+TAROT_CACHE_TTL_SECONDS = int(os.environ.get('TAROT_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+TAROT_CACHE_MAX_ENTRIES = int(os.environ.get('TAROT_CACHE_MAX_ENTRIES', 5000))
+# Aynı yayılım için saklanacak farklı yorum sayısı (çeşitlilik havuzu)
+TAROT_CACHE_VARIANTS = int(os.environ.get('TAROT_CACHE_VARIANTS', 3))
+# Prompt değiştiğinde eski yorumların kullanılmaması için artırılmalı
+TAROT_PROMPT_VERSION = os.environ.get('TAROT_PROMPT_VERSION', '1')
+
+# Auth Cache Configuration
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', 60))
+USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', 10000))
+# True ise korumalı endpoint'ler imzalı JWT'deki sub/email/is_verified alanlarına güvenir
+AUTH_CLAIMS_ONLY = os.environ.get('AUTH_CLAIMS_ONLY', 'false').lower() in ('1', 'true', 'yes')
+
+# Bcrypt Configuration
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+BCRYPT_MAX_WORKERS = int(os.environ.get('BCRYPT_MAX_WORKERS', 4))
+BCRYPT_MAX_PENDING = int(os.environ.get('BCRYPT_MAX_PENDING', 64))
 
 # SendGrid Configuration
 SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY')
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL')
+SENDGRID_API_URL = os.environ.get('SENDGRID_API_URL', SENDGRID_API_URL)
+
+# Email Outbox Configuration
+# sendgrid (üretim), smtp (MailHog gibi yerel sunucu) veya memory (gönderilenleri bellekte tutar)
+EMAIL_TRANSPORT = os.environ.get('EMAIL_TRANSPORT', 'sendgrid').lower()
+SMTP_HOST = os.environ.get('SMTP_HOST', 'localhost')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', 1025))
+EMAIL_CONCURRENCY = int(os.environ.get('EMAIL_CONCURRENCY', 4))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', 6))
+EMAIL_RETENTION_HOURS = int(os.environ.get('EMAIL_RETENTION_HOURS', 72))
+# Email'lerdeki linklerin kökü (frontend adresi)
+APP_BASE_URL = os.environ.get('APP_BASE_URL', 'http://localhost:3000').rstrip('/')
+EMAIL_TEMPLATE_DIR = ROOT_DIR / 'templates' / 'email'
 
 # Security
 security = HTTPBearer()
@@ -60,6 +204,7 @@ class User(BaseModel):
     terms_accepted: bool = False
     terms_accepted_at: Optional[datetime] = None
     favorite_zodiac_sign: Optional[str] = None  # Favorite zodiac for daily horoscope
+    language: str = "tr"  # Email dili
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -67,6 +212,7 @@ class UserRegister(BaseModel):
     email: EmailStr
     password: str
     accept_terms: bool
+    language: str = "tr"
 
 class UserLogin(BaseModel):
     email: EmailStr
@@ -88,84 +234,189 @@ class Token(BaseModel):
 class VerifyEmail(BaseModel):
     token: str
 
+# Gazetteer (doğum yeri -> koordinat ve saat dilimi, ağ çağrısı yapmadan)
+gazetteer = open_gazetteer(GAZETTEER_DIR, GAZETTEER_SEED)
+birth_location_resolver = BirthLocationResolver.from_env(gazetteer)
+
+def open_ephemeris_table() -> Optional[EphemerisTable]:
+    if not (EPHEMERIS_TABLE_DIR / EphemerisTable.DATA_FILE).exists():
+        logging.warning(f"Ephemeris table not found in {EPHEMERIS_TABLE_DIR}; birth charts will evaluate series (run build_ephemeris_table.py)")
+        return None
+    table = EphemerisTable.open(EPHEMERIS_TABLE_DIR)
+    logging.info(f"Ephemeris table mapped from {EPHEMERIS_TABLE_DIR}: JD {table.start_jd}-{table.end_jd}")
+    return table
+
+ephemeris_table = open_ephemeris_table()
+
 # Email Service Classes
 class EmailService:
-    def __init__(self):
-        self.api_key = SENDGRID_API_KEY
-        self.sender_email = SENDER_EMAIL
-        if not self.api_key or not self.sender_email:
-            raise ValueError("SendGrid API key or sender email not configured")
+    """Emailler önce outbox koleksiyonuna yazılır, gönderim arka plandaki email worker'ında yapılır"""
+    def __init__(self, outbox: JobQueue, templates: EmailTemplateRegistry):
+        self.outbox = outbox
+        self.templates = templates
+    
+    def build_verification_email(self, recipient_email: str, verification_token: str, language: str = "tr") -> dict:
+        """Doğrulama mailini derlenmiş şablondan oluştur - sadece link mesaja özeldir"""
+        verification_url = f"{APP_BASE_URL}/verify-email?token={quote(verification_token)}"
+        return self.templates.render("verification", language, recipient_email, {"verification_url": verification_url})
+    
+    async def send_verification_email(self, user_id: str, recipient_email: str, verification_token: str, language: str = "tr"):
+        """Email doğrulama mailini outbox'a ekle - istek SendGrid'i beklemez"""
+        await self.outbox.enqueue("email", user_id, self.build_verification_email(recipient_email, verification_token, language))
+    
+    async def send_horoscope_ready_emails(self, users: List[dict], language: str = "tr") -> int:
+        """Günlük burç bildirimini aynı dildeki kullanıcılara toplu olarak outbox'a ekle"""
+        action_url = f"{APP_BASE_URL}/horoscope"
+        messages = self.templates.render_batch(
+            "horoscope_ready", language, [(user["email"], {"action_url": action_url}) for user in users]
+        )
+        return await self.outbox.enqueue_many("email", [(user["id"], message) for user, message in zip(users, messages)])
+
+email_templates = EmailTemplateRegistry(EMAIL_TEMPLATE_DIR, HOROSCOPE_LANGUAGES)
+
+def create_email_transport() -> EmailTransport:
+    if EMAIL_TRANSPORT == "memory":
+        return MemoryTransport()
+    if not SENDER_EMAIL:
+        raise ValueError("Sender email not configured")
+    if EMAIL_TRANSPORT == "smtp":
+        return SmtpTransport(SMTP_HOST, SMTP_PORT, SENDER_EMAIL)
+    if not SENDGRID_API_KEY:
+        raise ValueError("SendGrid API key not configured")
+    return SendGridTransport(SENDGRID_API_KEY, SENDER_EMAIL, SENDGRID_API_URL)
+
+email_transport = create_email_transport()
+
+async def deliver_email(job: dict) -> dict:
+    message = job["payload"]
+    await email_transport.send(message)
+    logging.info(f"Email delivered to {message['to']} (attempt {job['attempts']})")
+    return {}
+
+email_outbox = JobQueue(
+    db.email_outbox,
+    concurrency={"email": EMAIL_CONCURRENCY},
+    visibility_timeout=60,
+    max_attempts=EMAIL_MAX_ATTEMPTS,
+    retention_hours=EMAIL_RETENTION_HOURS,
+    # Geçersiz adres gibi kalıcı hatalar tekrar denenmez
+    is_retryable=lambda e: getattr(e, "retryable", True)
+)
+email_outbox.register("email", deliver_email)
+
+# Password Hashing Service
+class PasswordHasher:
+    """bcrypt işlemlerini event loop dışında, sınırlı bir thread havuzunda çalıştırır"""
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, max_workers: int = BCRYPT_MAX_WORKERS, max_pending: int = BCRYPT_MAX_PENDING):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        # bcrypt C tarafında GIL'i bıraktığı için thread havuzu yeterli
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.total_wait_ms = 0.0
+        self.total_run_ms = 0.0
     
-    async def send_verification_email(self, recipient_email: str, verification_token: str):
-        """Email doğrulama maili gönder"""
+    def _execute(self, fn, submitted_at: float, *args):
+        """Worker thread içinde çalışır; bekleme ve çalışma sürelerini ölçer"""
+        started_at = time.perf_counter()
+        with self._lock:
+            self.running += 1
+            self.total_wait_ms += (started_at - submitted_at) * 1000
         try:
-            verification_url = f"http://localhost:3000/verify-email?token={verification_token}"
-            
-            subject = "✨ falım ✨ - Email Adresinizi Doğrulayın"
-            
-            html_content = f"""
-            <html>
-                <body style="font-family: -apple-system, BlinkMacSystemFont, 'SF Pro Display', sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <div style="text-align: center; margin-bottom: 30px;">
-                        <h1 style="color: #AF52DE; font-size: 32px; margin: 0; text-shadow: 0 0 10px rgba(175, 82, 222, 0.3);">🔮 ✨ falım ✨ 🔮</h1>
-                        <p style="color: #6B7280; font-size: 16px; margin: 10px 0;">🌙 Mistik dünyaya hoş geldiniz ⭐</p>
-                    </div>
-                    
-                    <div style="background: linear-gradient(135deg, #AF52DE, #007AFF); padding: 30px; border-radius: 16px; color: white; text-align: center; margin-bottom: 30px;">
-                        <h2 style="margin: 0 0 15px 0; font-size: 24px;">Email Adresinizi Doğrulayın</h2>
-                        <p style="margin: 0; font-size: 16px; opacity: 0.9;">Hesabınızı aktifleştirmek için aşağıdaki butona tıklayın</p>
-                    </div>
-                    
-                    <div style="text-align: center; margin-bottom: 30px;">
-                        <a href="{verification_url}" 
-                           style="display: inline-block; background: #007AFF; color: white; text-decoration: none; padding: 15px 30px; border-radius: 12px; font-weight: 600; font-size: 16px;">
-                            Email Adresimi Doğrula
-                        </a>
-                    </div>
-                    
-                    <div style="background: #F9FAFB; padding: 20px; border-radius: 12px; margin-bottom: 20px;">
-                        <p style="margin: 0; color: #6B7280; font-size: 14px;">
-                            <strong>Not:</strong> Bu link güvenlik nedeniyle 24 saat sonra geçersiz hale gelecektir.
-                        </p>
-                    </div>
-                    
-                    <div style="text-align: center; color: #9CA3AF; font-size: 12px;">
-                        <p>Bu email ✨ falım ✨ tarafından gönderilmiştir.</p>
-                        <p>Link çalışmıyorsa şu adresi kopyalayın: {verification_url}</p>
-                    </div>
-                </body>
-            </html>
-            """
-            
-            message = Mail(
-                from_email=self.sender_email,
-                to_emails=recipient_email,
-                subject=subject,
-                html_content=html_content
-            )
-            
-            sg = SendGridAPIClient(self.api_key)
-            response = sg.send(message)
-            
-            return response.status_code == 202
-            
-        except Exception as e:
-            logging.error(f"Email sending error: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Email gönderme hatası: {str(e)}")
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.total_run_ms += (time.perf_counter() - started_at) * 1000
+    
+    async def _submit(self, fn, *args):
+        """İşi havuza gönder, kuyruk doluysa 503 dön"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Sunucu şu anda çok yoğun, lütfen tekrar deneyin")
+            self.pending += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.pending - self.running)
+        
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._execute, fn, time.perf_counter(), *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+    
+    async def hash(self, password: str) -> str:
+        """Parolayı yapılandırılmış maliyet faktörü ile hash'le"""
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = await self._submit(bcrypt.hashpw, password.encode('utf-8'), salt)
+        return hashed.decode('utf-8')
+    
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Parolayı hash ile karşılaştır"""
+        return await self._submit(bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
+    
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Hash farklı bir maliyet faktörüyle üretildiyse True döner ($2b$<rounds>$...)"""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+    
+    def stats(self) -> dict:
+        """Kuyruk derinliği ve süre metrikleri"""
+        with self._lock:
+            finished = max(self.completed, 1)
+            return {
+                "rounds": self.rounds,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "running": self.running,
+                "queue_depth": self.pending - self.running,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait_ms / finished, 2),
+                "avg_run_ms": round(self.total_run_ms / finished, 2)
+            }
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
 
 # Authentication Service
 class AuthService:
     def __init__(self):
-        self.email_service = EmailService()
+        self.email_service = EmailService(email_outbox, email_templates)
+        self.password_hasher = PasswordHasher()
     
-    def hash_password(self, password: str) -> str:
+    async def hash_password(self, password: str) -> str:
         """Parolayı hash'le"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        return await self.password_hasher.hash(password)
     
-    def verify_password(self, password: str, hashed_password: str) -> bool:
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
         """Parola doğrula"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+        return await self.password_hasher.verify(password, hashed_password)
+    
+    async def rehash_password_if_needed(self, user_id: str, password: str, hashed_password: str):
+        """Eski maliyet faktörüyle saklanan hash'i girişte yenile"""
+        if not self.password_hasher.needs_rehash(hashed_password):
+            return
+        try:
+            new_hash = await self.password_hasher.hash(password)
+            await db.users.update_one(
+                {"id": user_id, "hashed_password": hashed_password},
+                {"$set": {"hashed_password": new_hash, "updated_at": datetime.utcnow()}}
+            )
+            user_cache.invalidate(user_id)
+        except Exception as e:
+            logging.error(f"Password rehash error for {user_id}: {str(e)}")
     
     def create_access_token(self, data: dict) -> str:
         """JWT token oluştur"""
@@ -188,12 +439,81 @@ class AuthService:
         """Email doğrulama token'ı oluştur"""
         return str(uuid.uuid4())
 
+# User Cache
+class UserCache:
+    """Kullanıcı id'sine göre çözülmüş User nesneleri için TTL + LRU önbellek"""
+    def __init__(self, ttl_seconds: float = USER_CACHE_TTL_SECONDS, max_size: int = USER_CACHE_MAX_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()  # user_id -> (expires_at, User)
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, user_id: str) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+    
+    def set(self, user: User):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+    
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
 # Initialize services
 auth_service = AuthService()
+user_cache = UserCache()
 
-# Authentication dependency
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Mevcut kullanıcıyı al"""
+async def load_user(user_id: str) -> Optional[User]:
+    """Kullanıcıyı önce önbellekten, yoksa veritabanından al"""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    
+    user_doc = await db.users.find_one({"id": user_id})
+    if not user_doc:
+        return None
+    
+    user = User(**user_doc)
+    user_cache.set(user)
+    return user
+
+def user_from_claims(payload: dict) -> Optional[User]:
+    """İmzalı JWT claim'lerinden veritabanına gitmeden User oluştur"""
+    if "email" not in payload or "is_verified" not in payload:
+        # Eski token'larda is_verified yok, veritabanına düş
+        return None
+    return User(
+        id=payload["sub"],
+        email=payload["email"],
+        hashed_password="",
+        is_verified=bool(payload["is_verified"])
+    )
+
+async def _resolve_user(credentials: HTTPAuthorizationCredentials, allow_claims: bool) -> User:
     try:
         token = credentials.credentials
         payload = auth_service.verify_token(token)
@@ -202,15 +522,37 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         if not user_id:
             raise HTTPException(status_code=401, detail="Geçersiz token")
         
-        # Kullanıcıyı veritabanından al
-        user = await db.users.find_one({"id": user_id})
+        if allow_claims and AUTH_CLAIMS_ONLY:
+            user = user_cache.get(user_id) or user_from_claims(payload)
+            if user is not None:
+                return user
+        
+        # Kullanıcıyı önbellekten veya veritabanından al
+        user = await load_user(user_id)
         if not user:
             raise HTTPException(status_code=401, detail="Kullanıcı bulunamadı")
         
-        return User(**user)
+        return user
     except Exception as e:
         raise HTTPException(status_code=401, detail="Kimlik doğrulama hatası")
 
+# Authentication dependency
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Mevcut kullanıcıyı al"""
+    return await _resolve_user(credentials, allow_claims=True)
+
+async def get_current_user_full(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Mevcut kullanıcıyı tüm profil alanlarıyla al (claim modunu kullanmaz)"""
+    return await _resolve_user(credentials, allow_claims=False)
+
+# Admin dependency - operasyon endpoint'leri ADMIN_API_KEY ile korunur
+async def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """X-Admin-Key başlığını ADMIN_API_KEY ile karşılaştır; anahtar ayarlı değilse admin endpoint'leri kapalıdır"""
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin erişimi yapılandırılmamış")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key.encode(), ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=403, detail="Admin yetkisi gerekli")
+
 # Optional authentication dependency
 async def get_current_user_optional(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Opsiyonel kullanıcı (token yoksa None döner)"""
@@ -245,7 +587,8 @@ class CoffeeReadingResponse(BaseModel):
 class CoffeeReading(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     session_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    image_base64: str
+    image_hash: Optional[str] = None  # blob store'daki resmin sha256 özeti
+    image_size: Optional[int] = None
     symbols_found: List[str] = []
     interpretation: str
     confidence_score: Optional[float] = None
@@ -300,7 +643,8 @@ class PalmReadingResponse(BaseModel):
 class PalmReading(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     session_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    image_base64: str
+    image_hash: Optional[str] = None  # blob store'daki resmin sha256 özeti
+    image_size: Optional[int] = None
     hand_type: str
     lines_found: List[str] = []
     interpretation: str
@@ -312,6 +656,9 @@ class AstrologyReadingCreate(BaseModel):
     birth_date: str  # YYYY-MM-DD format
     birth_time: str  # HH:MM format
     birth_place: str
+    latitude: Optional[float] = Field(None, ge=-90, le=90)  # Kuzey pozitif
+    longitude: Optional[float] = Field(None, ge=-180, le=180)  # Doğu pozitif
+    utc_offset: Optional[float] = Field(None, ge=-14, le=14)  # Doğum anındaki saat farkı (saat)
     session_id: Optional[str] = None
 
 class AstrologyReadingResponse(BaseModel):
@@ -326,6 +673,15 @@ class AstrologyReadingResponse(BaseModel):
     interpretation: str
     timestamp: datetime
 
+class PlaceResponse(BaseModel):
+    name: str
+    latitude: float
+    longitude: float
+    country: str
+    admin1: str
+    timezone: str
+    population: int
+
 class AstrologyReading(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     session_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -335,6 +691,10 @@ class AstrologyReading(BaseModel):
     zodiac_sign: str
     planets: dict = {}
     birth_chart: dict = {}
+    # Kullanıcının verdiği konum (yoksa None) - yeniden hesaplamada gazetteer tahmininin önüne geçer
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    utc_offset: Optional[float] = None
     interpretation: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
@@ -361,6 +721,33 @@ class DailyHoroscope(BaseModel):
     language: str = "tr"
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+# Reading Feed Models
+READING_TYPES = ["coffee", "tarot", "palm", "astrology", "falname"]
+
+class ReadingFeedItem(BaseModel):
+    type: str
+    reading_id: str
+    session_id: str
+    timestamp: datetime
+    summary: str
+
+# Reading Job Models
+class ReadingJobAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+class ReadingJobResponse(BaseModel):
+    id: str
+    type: str
+    status: str  # queued, running, succeeded, failed
+    attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
 # User Profile Update Models (for favorite zodiac)
 class UserProfileUpdate(BaseModel):
     favorite_zodiac_sign: Optional[str] = None
@@ -458,27 +845,139 @@ class CoffeeReadingResponse(BaseModel):
 class CoffeeReading(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     session_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    image_base64: str
+    image_hash: Optional[str] = None  # blob store'daki resmin sha256 özeti
+    image_size: Optional[int] = None
     symbols_found: List[str] = []
     interpretation: str
     confidence_score: Optional[float] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+# Paylaşılan LLM gateway (keep-alive bağlantı havuzu + eşzamanlılık limiti)
+llm_gateway = LlmGateway(
+    api_key=os.environ.get('GEMINI_API_KEY'),
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    max_connections=LLM_MAX_CONNECTIONS,
+    max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+    timeout_seconds=LLM_TIMEOUT_SECONDS
+)
+
+# Toplu burç yorumu üretimi için hız sınırı (token bucket + eşzamanlılık + tekrar deneme)
+horoscope_runner = RateLimitedRunner(
+    rate=HOROSCOPE_REQUESTS_PER_SECOND,
+    max_in_flight=HOROSCOPE_MAX_IN_FLIGHT,
+    max_retries=HOROSCOPE_MAX_RETRIES,
+    base_delay=HOROSCOPE_RETRY_BASE_SECONDS,
+    is_retryable=lambda e: not isinstance(e, LlmGatewayError) or e.retryable
+)
+
+# Kullanıcı isteği sırasında eksik yorum üretimi için ayrı kova - toplu üretim bunu tüketemez
+horoscope_interactive_runner = RateLimitedRunner(
+    rate=HOROSCOPE_INTERACTIVE_REQUESTS_PER_SECOND,
+    max_in_flight=HOROSCOPE_INTERACTIVE_MAX_IN_FLIGHT,
+    max_retries=HOROSCOPE_MAX_RETRIES,
+    base_delay=HOROSCOPE_RETRY_BASE_SECONDS,
+    is_retryable=lambda e: not isinstance(e, LlmGatewayError) or e.retryable
+)
+
+# Vision çağrıları öncesi resim ön işleme
+image_pipeline = ImagePipeline(
+    max_edge=IMAGE_MAX_EDGE,
+    quality=IMAGE_JPEG_QUALITY,
+    max_workers=IMAGE_PIPELINE_WORKERS,
+    enabled=IMAGE_PIPELINE_ENABLED
+)
+
+# Image Deduplication Index
+class ImageDedupIndex:
+    """Kullanıcı başına son yüklenen resimlerin dHash'leri - neredeyse aynı resimde önceki analizi kullan"""
+    def __init__(self, max_distance: int = IMAGE_DEDUP_MAX_DISTANCE, window_hours: int = IMAGE_DEDUP_WINDOW_HOURS,
+                 max_candidates: int = IMAGE_DEDUP_MAX_CANDIDATES, enabled: bool = IMAGE_DEDUP_ENABLED):
+        self.max_distance = max_distance
+        self.window_hours = window_hours
+        self.max_candidates = max_candidates
+        self.enabled = enabled
+        self.lookups = 0
+        self.hits = 0
+        self.misses = 0
+        # En yakın adayın mesafe dağılımı - eşik ayarı için
+        self.nearest_distances = {}
+    
+    async def find_prior_analysis(self, user_id: str, reading_type: str, fingerprint: Optional[int],
+                                  collection: str, fields: List[str]) -> Optional[dict]:
+        """Pencere içinde eşik altında bir resim varsa o okumanın analiz alanlarını döndür"""
+        if not self.enabled or fingerprint is None:
+            return None
+        
+        self.lookups += 1
+        try:
+            since = datetime.utcnow() - timedelta(hours=self.window_hours)
+            candidates = await db.image_fingerprints.find(
+                {"user_id": user_id, "reading_type": reading_type, "created_at": {"$gte": since}},
+                {"_id": 0, "dhash": 1, "reading_id": 1}
+            ).sort("created_at", -1).limit(self.max_candidates).to_list(self.max_candidates)
+            
+            best = None
+            best_distance = None
+            for candidate in candidates:
+                distance = hamming_distance(fingerprint, int(candidate["dhash"], 16))
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = candidate, distance
+            
+            if best_distance is not None:
+                self.nearest_distances[best_distance] = self.nearest_distances.get(best_distance, 0) + 1
+            
+            if best is not None and best_distance <= self.max_distance:
+                projection = {"_id": 0, **{field: 1 for field in fields}}
+                prior = await db[collection].find_one({"id": best["reading_id"], "user_id": user_id}, projection)
+                if prior:
+                    self.hits += 1
+                    logging.info(f"Duplicate {reading_type} image for {user_id} (distance {best_distance}), reusing {best['reading_id']}")
+                    prior["reused_from"] = best["reading_id"]
+                    return prior
+        except Exception as e:
+            logging.error(f"Image dedup lookup error: {str(e)}")
+        
+        self.misses += 1
+        return None
+    
+    async def add(self, user_id: str, reading_type: str, fingerprint: Optional[int], reading_id: str):
+        """Yeni okumanın resim parmak izini indekse ekle"""
+        if not self.enabled or fingerprint is None:
+            return
+        try:
+            await db.image_fingerprints.insert_one({
+                "user_id": user_id,
+                "reading_type": reading_type,
+                "dhash": f"{fingerprint:016x}",
+                "reading_id": reading_id,
+                "created_at": datetime.utcnow()
+            })
+        except Exception as e:
+            logging.error(f"Image dedup index error: {str(e)}")
+    
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_distance": self.max_distance,
+            "window_hours": self.window_hours,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "nearest_distances": dict(sorted(self.nearest_distances.items()))
+        }
+
+image_dedup = ImageDedupIndex()
+
 # AI Analysis Service
 class CoffeeAnalysisService:
     def __init__(self):
-        self.gemini_api_key = os.environ.get('GEMINI_API_KEY')
-        if not self.gemini_api_key:
-            raise ValueError("Gemini API key not found in environment variables")
+        self.llm = llm_gateway.model(GEMINI_MODEL)
     
-    async def analyze_coffee_grounds(self, image_base64: str, session_id: str) -> dict:
-        """Gemini Vision API kullanarak kahve telvesinanaliz et"""
-        try:
-            # LlmChat instance oluştur - Gemini için
-            chat = LlmChat(
-                api_key=self.gemini_api_key,
-                session_id=session_id,
-                system_message="""Sen deneyimli bir kahve falcısısın. Kahve fincanındaki telveler şekillerin ve desenlerin analiz ederek fal okuyorsun.
+    def _build_prompt(self) -> tuple:
+        """Kahve falı için sistem ve kullanıcı mesajını hazırla"""
+        # Sistem promptu
+        system_message = """Sen deneyimli bir kahve falcısısın. Kahve fincanındaki telveler şekillerin ve desenlerin analiz ederek fal okuyorsun.
 
 Kahve falı kuralları:
 - Fincanın farklı bölgeleri farklı anlamlar taşır (kenar: gelecek, orta: şimdiki zaman, dip: geçmiş)
@@ -491,35 +990,60 @@ Kahve falı kuralları:
 1. Gözlemlenen semboller/şekiller (liste halinde)
 2. Genel yorum ve yorumlama (2-3 paragraf)
 3. Öneriler ve tavsiyeler"""
-            ).with_model("gemini", "gemini-2.0-flash")
+        
+        # Kullanıcı mesajı
+        user_message = "Bu kahve fincanındaki telveler analiz et ve detaylı bir fal yorumu yap. Şekilleri tanımla ve anlamlarını açıkla."
+        
+        return system_message, user_message
+    
+    async def analyze_coffee_grounds(self, image: bytes, session_id: str, user_id: Optional[str] = None) -> dict:
+        """Gemini Vision API kullanarak kahve telvesinanaliz et"""
+        try:
+            system_message, user_message = self._build_prompt()
             
-            # Resim içeriği oluştur
-            image_content = ImageContent(image_base64=image_base64)
+            # Resmi küçült/normalize et (process havuzunda)
+            processed = await image_pipeline.process(image)
             
-            # Mesaj gönder
-            user_message = UserMessage(
-                text="Bu kahve fincanındaki telveler analiz et ve detaylı bir fal yorumu yap. Şekilleri tanımla ve anlamlarını açıkla.",
-                file_contents=[image_content]
-            )
+            # Aynı fincan tekrar gönderildiyse önceki analizi kullan
+            if user_id:
+                prior = await image_dedup.find_prior_analysis(
+                    user_id, "coffee", processed.dhash, "coffee_readings",
+                    ["symbols_found", "interpretation", "confidence_score"]
+                )
+                if prior:
+                    return prior
             
             # AI'dan cevap al
-            response = await chat.send_message(user_message)
+            response = await self.llm.generate(system_message, user_message, images=[processed.data])
             
-            # Response'u parse et
-            symbols = self._extract_symbols(response)
-            interpretation = response
-            confidence_score = 0.85  # Placeholder confidence score
-            
-            return {
-                "symbols_found": symbols,
-                "interpretation": interpretation,
-                "confidence_score": confidence_score
-            }
+            analysis = self.build_analysis(response)
+            analysis["image_fingerprint"] = processed.dhash
+            return analysis
             
         except Exception as e:
             logging.error(f"Coffee analysis error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"AI analizi sırasında hata oluştu: {str(e)}")
     
+    async def stream_coffee_grounds(self, image: bytes) -> AsyncIterator[str]:
+        """Kahve falı yorumunu parça parça (token akışı) üret"""
+        system_message, user_message = self._build_prompt()
+        processed = await image_pipeline.process(image)
+        async for chunk in self.llm.stream(system_message, user_message, images=[processed.data]):
+            yield chunk
+    
+    def build_analysis(self, response: str) -> dict:
+        """AI cevabını analiz sonucuna dönüştür"""
+        # Response'u parse et
+        symbols = self._extract_symbols(response)
+        interpretation = response
+        confidence_score = 0.85  # Placeholder confidence score
+        
+        return {
+            "symbols_found": symbols,
+            "interpretation": interpretation,
+            "confidence_score": confidence_score
+        }
+    
     def _extract_symbols(self, ai_response: str) -> List[str]:
         """AI cevabından sembolleri çıkar"""
         symbols = []
@@ -540,37 +1064,139 @@ Kahve falı kuralları:
             
         return symbols[:10]  # Max 10 symbol
 
+# Tarot Interpretation Cache
+class TarotInterpretationCache:
+    """Deterministik tarot yayılımları için içerik adresli yorum önbelleği (bellek LRU + MongoDB)"""
+    def __init__(self, ttl_seconds: int = TAROT_CACHE_TTL_SECONDS, max_entries: int = TAROT_CACHE_MAX_ENTRIES,
+                 variants: int = TAROT_CACHE_VARIANTS, prompt_version: str = TAROT_PROMPT_VERSION,
+                 enabled: bool = TAROT_CACHE_ENABLED):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.variants = max(variants, 1)
+        self.prompt_version = prompt_version
+        self.enabled = enabled
+        self._memory = OrderedDict()  # key -> (expires_at, [yorumlar])
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+    
+    def make_key(self, cards_drawn: List[dict], spread_type: str, language: str) -> str:
+        """Yayılım tipi, sıralı kart id'leri, ters/düz durumları, dil ve prompt versiyonundan anahtar üret"""
+        cards = ",".join(
+            f"{card_data['card']['id']}{'r' if card_data['reversed'] else 'u'}" for card_data in cards_drawn
+        )
+        raw = f"{self.prompt_version}|{spread_type}|{language}|{cards}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def _remember(self, key: str, variants: List[str], expires_at: datetime):
+        self._memory[key] = (expires_at, variants)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Havuz doluysa rastgele bir yorum döndür, değilse None (yeni varyant üretilsin)"""
+        if not self.enabled:
+            return None
+        
+        now = datetime.utcnow()
+        entry = self._memory.get(key)
+        if entry is not None and entry[0] > now and len(entry[1]) >= self.variants:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return random.choice(entry[1])
+        
+        # Yerel havuz eksikse ortak dokümana bak: diğer worker'ların eklediği varyantlar orada
+        try:
+            doc = await db.tarot_interpretation_cache.find_one(
+                {"key": key, "expires_at": {"$gt": now}},
+                {"_id": 0, "variants": 1, "expires_at": 1}
+            )
+        except Exception as e:
+            logging.error(f"Tarot cache lookup error: {str(e)}")
+            doc = None
+        
+        if doc:
+            variants = doc.get("variants", [])
+            self._remember(key, variants, doc["expires_at"])
+            if len(variants) >= self.variants:
+                self.db_hits += 1
+                return random.choice(variants)
+        
+        self.misses += 1
+        return None
+    
+    async def put(self, key: str, interpretation: str, cards_drawn: List[dict], spread_type: str, language: str):
+        """Yeni yorumu varyant havuzuna ekle"""
+        if not self.enabled or not interpretation:
+            return
+        
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        try:
+            # Güncel havuz dokümandan döner; bellek tüm worker'ların varyantlarını görür
+            doc = await db.tarot_interpretation_cache.find_one_and_update(
+                {"key": key},
+                {
+                    "$push": {"variants": {"$each": [interpretation], "$slice": -self.variants}},
+                    "$set": {"expires_at": expires_at},
+                    "$setOnInsert": {
+                        "spread_type": spread_type,
+                        "language": language,
+                        "prompt_version": self.prompt_version,
+                        "cards": [
+                            {"id": card_data["card"]["id"], "reversed": card_data["reversed"]}
+                            for card_data in cards_drawn
+                        ],
+                        "created_at": datetime.utcnow()
+                    }
+                },
+                upsert=True,
+                projection={"_id": 0, "variants": 1, "expires_at": 1},
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            logging.error(f"Tarot cache store error: {str(e)}")
+            return
+        self._remember(key, doc["variants"], doc["expires_at"])
+    
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "variants": self.variants,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else 0.0
+        }
+
 # Tarot Analysis Service
 class TarotAnalysisService:
     def __init__(self):
-        self.gemini_api_key = os.environ.get('GEMINI_API_KEY')
-        if not self.gemini_api_key:
-            raise ValueError("Gemini API key not found in environment variables")
+        self.llm = llm_gateway.model(GEMINI_MODEL)
+        self.cache = TarotInterpretationCache()
     
-    async def interpret_tarot_spread(self, cards_drawn: List[dict], spread_type: str, session_id: str) -> str:
-        """Tarot kartlarını yorumla"""
-        try:
-            # Cards bilgisini hazırla
-            cards_info = ""
-            positions = {
-                "three_card": ["Geçmiş", "Şimdi", "Gelecek"]
-            }
-            
-            for i, card_data in enumerate(cards_drawn):
-                card = card_data["card"]
-                position = positions[spread_type][i] if i < len(positions[spread_type]) else f"Pozisyon {i+1}"
-                reversed = card_data["reversed"]
-                
-                cards_info += f"\n{position}: {card['name_tr']} ({card['name']})"
-                cards_info += f"\nDurum: {'Ters' if reversed else 'Düz'}"
-                cards_info += f"\nAnlamı: {card['meaning_reversed'] if reversed else card['meaning_upright']}"
-                cards_info += f"\nAçıklama: {card['description']}\n"
+    def _build_prompt(self, cards_drawn: List[dict], spread_type: str) -> tuple:
+        """Tarot yorumu için sistem ve kullanıcı mesajını hazırla"""
+        # Cards bilgisini hazırla
+        cards_info = ""
+        positions = {
+            "three_card": ["Geçmiş", "Şimdi", "Gelecek"]
+        }
+        
+        for i, card_data in enumerate(cards_drawn):
+            card = card_data["card"]
+            position = positions[spread_type][i] if i < len(positions[spread_type]) else f"Pozisyon {i+1}"
+            reversed = card_data["reversed"]
             
-            # LlmChat instance oluştur
-            chat = LlmChat(
-                api_key=self.gemini_api_key,
-                session_id=session_id,
-                system_message="""Sen deneyimli bir tarot okuyucususun. Çekilen kartları analiz ederek kapsamlı ve anlam dolu yorumlar yapıyorsun.
+            cards_info += f"\n{position}: {card['name_tr']} ({card['name']})"
+            cards_info += f"\nDurum: {'Ters' if reversed else 'Düz'}"
+            cards_info += f"\nAnlamı: {card['meaning_reversed'] if reversed else card['meaning_upright']}"
+            cards_info += f"\nAçıklama: {card['description']}\n"
+        
+        # Sistem promptu
+        system_message = """Sen deneyimli bir tarot okuyucususun. Çekilen kartları analiz ederek kapsamlı ve anlam dolu yorumlar yapıyorsun.
 
 Tarot okuma kuralları:
 - Her kartın pozisyondaki özel anlamını değerlendir
@@ -584,36 +1210,56 @@ Tarot okuma kuralları:
 1. Kart analizi (her kart için ayrı değerlendirme)
 2. Genel mesaj ve hikaye
 3. Pratik öneriler ve tavsiyeleri"""
-            ).with_model("gemini", "gemini-2.0-flash")
+        
+        # Kullanıcı mesajı
+        user_message = f"Bu tarot kartlarını {spread_type} yayılımı için yorumla:\n{cards_info}\n\nDetaylı bir tarot yorumu ve rehberlik yap."
+        
+        return system_message, user_message
+    
+    async def interpret_tarot_spread(self, cards_drawn: List[dict], spread_type: str, session_id: str, language: str = "tr") -> str:
+        """Tarot kartlarını yorumla"""
+        try:
+            # Aynı yayılım daha önce yorumlandıysa önbellekten dön
+            cache_key = self.cache.make_key(cards_drawn, spread_type, language)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
             
-            # Mesaj gönder
-            user_message = UserMessage(
-                text=f"Bu tarot kartlarını {spread_type} yayılımı için yorumla:\n{cards_info}\n\nDetaylı bir tarot yorumu ve rehberlik yap."
-            )
+            system_message, user_message = self._build_prompt(cards_drawn, spread_type)
             
             # AI'dan cevap al
-            response = await chat.send_message(user_message)
+            response = await self.llm.generate(system_message, user_message)
+            await self.cache.put(cache_key, response, cards_drawn, spread_type, language)
             return response
             
         except Exception as e:
             logging.error(f"Tarot analysis error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Tarot analizi sırasında hata oluştu: {str(e)}")
+    
+    async def stream_tarot_spread(self, cards_drawn: List[dict], spread_type: str, language: str = "tr") -> AsyncIterator[str]:
+        """Tarot yorumunu parça parça (token akışı) üret"""
+        cache_key = self.cache.make_key(cards_drawn, spread_type, language)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        system_message, user_message = self._build_prompt(cards_drawn, spread_type)
+        parts = []
+        async for chunk in self.llm.stream(system_message, user_message):
+            parts.append(chunk)
+            yield chunk
+        await self.cache.put(cache_key, "".join(parts), cards_drawn, spread_type, language)
 
 # Palm Analysis Service
 class PalmAnalysisService:
     def __init__(self):
-        self.gemini_api_key = os.environ.get('GEMINI_API_KEY')
-        if not self.gemini_api_key:
-            raise ValueError("Gemini API key not found in environment variables")
+        self.llm = llm_gateway.model(GEMINI_MODEL)
     
-    async def analyze_palm_lines(self, image_base64: str, hand_type: str, session_id: str) -> dict:
-        """Gemini Vision API kullanarak el çizgilerini analiz et"""
-        try:
-            # LlmChat instance oluştur - Gemini için
-            chat = LlmChat(
-                api_key=self.gemini_api_key,
-                session_id=session_id,
-                system_message=f"""Sen deneyimli bir el falcısısın. {hand_type} el fotoğrafındaki çizgileri analiz ederek fal okuyorsun.
+    def _build_prompt(self, hand_type: str) -> tuple:
+        """El falı için sistem ve kullanıcı mesajını hazırla"""
+        # Sistem promptu
+        system_message = f"""Sen deneyimli bir el falcısısın. {hand_type} el fotoğrafındaki çizgileri analiz ederek fal okuyorsun.
 
 El falı kuralları:
 - Ana çizgileri tanımla: yaşam çizgisi, kalp çizgisi, kafa çizgisi, kader çizgisi
@@ -627,35 +1273,60 @@ El falı kuralları:
 2. Her çizginin anlamı ve yorumu
 3. Genel kişilik analizi
 4. Gelecekle ilgili öngörüler"""
-            ).with_model("gemini", "gemini-2.0-flash")
+        
+        # Kullanıcı mesajı
+        user_message = f"Bu {hand_type} el fotoğrafındaki çizgileri analiz et ve detaylı bir el falı yorumu yap. Ana çizgileri tanımla ve anlamlarını açıkla."
+        
+        return system_message, user_message
+    
+    async def analyze_palm_lines(self, image: bytes, hand_type: str, session_id: str, user_id: Optional[str] = None) -> dict:
+        """Gemini Vision API kullanarak el çizgilerini analiz et"""
+        try:
+            system_message, user_message = self._build_prompt(hand_type)
             
-            # Resim içeriği oluştur
-            image_content = ImageContent(image_base64=image_base64)
+            # Resmi küçült/normalize et (process havuzunda)
+            processed = await image_pipeline.process(image)
             
-            # Mesaj gönder
-            user_message = UserMessage(
-                text=f"Bu {hand_type} el fotoğrafındaki çizgileri analiz et ve detaylı bir el falı yorumu yap. Ana çizgileri tanımla ve anlamlarını açıkla.",
-                file_contents=[image_content]
-            )
+            # Aynı el fotoğrafı tekrar gönderildiyse önceki analizi kullan
+            if user_id:
+                prior = await image_dedup.find_prior_analysis(
+                    user_id, f"palm_{hand_type}", processed.dhash, "palm_readings",
+                    ["lines_found", "interpretation", "confidence_score"]
+                )
+                if prior:
+                    return prior
             
             # AI'dan cevap al
-            response = await chat.send_message(user_message)
+            response = await self.llm.generate(system_message, user_message, images=[processed.data])
             
-            # Response'u parse et
-            lines = self._extract_lines(response)
-            interpretation = response
-            confidence_score = 0.80  # Placeholder confidence score
-            
-            return {
-                "lines_found": lines,
-                "interpretation": interpretation,
-                "confidence_score": confidence_score
-            }
+            analysis = self.build_analysis(response)
+            analysis["image_fingerprint"] = processed.dhash
+            return analysis
             
         except Exception as e:
             logging.error(f"Palm analysis error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"El falı analizi sırasında hata oluştu: {str(e)}")
     
+    async def stream_palm_lines(self, image: bytes, hand_type: str) -> AsyncIterator[str]:
+        """El falı yorumunu parça parça (token akışı) üret"""
+        system_message, user_message = self._build_prompt(hand_type)
+        processed = await image_pipeline.process(image)
+        async for chunk in self.llm.stream(system_message, user_message, images=[processed.data]):
+            yield chunk
+    
+    def build_analysis(self, response: str) -> dict:
+        """AI cevabını analiz sonucuna dönüştür"""
+        # Response'u parse et
+        lines = self._extract_lines(response)
+        interpretation = response
+        confidence_score = 0.80  # Placeholder confidence score
+        
+        return {
+            "lines_found": lines,
+            "interpretation": interpretation,
+            "confidence_score": confidence_score
+        }
+    
     def _extract_lines(self, ai_response: str) -> List[str]:
         """AI cevabından çizgileri çıkar"""
         lines = []
@@ -673,10 +1344,17 @@ El falı kuralları:
 
 # Astrology Analysis Service
 class AstrologyAnalysisService:
+    # Günlük yorumların yazılacağı diller
+    HOROSCOPE_LANGUAGE_NAMES = {
+        "tr": "Türkçe",
+        "en": "İngilizce", 
+        "de": "Almanca",
+        "fr": "Fransızca",
+        "es": "İspanyolca"
+    }
+    
     def __init__(self):
-        self.gemini_api_key = os.environ.get('GEMINI_API_KEY')
-        if not self.gemini_api_key:
-            raise ValueError("Gemini API key not found in environment variables")
+        self.llm = llm_gateway.model(GEMINI_MODEL)
     
     def calculate_zodiac_sign(self, birth_date: str) -> str:
         """Doğum tarihinden burç hesapla"""
@@ -713,102 +1391,67 @@ class AstrologyAnalysisService:
         except:
             return "unknown"
     
-    def calculate_birth_chart(self, birth_date: str, birth_time: str, birth_place: str) -> dict:
-        """Doğum haritası hesapla (basitleştirilmiş)"""
-        import random
-        from datetime import datetime
-        
-        try:
-            date_obj = datetime.strptime(birth_date, "%Y-%m-%d")
-            time_parts = birth_time.split(":")
-            hour = int(time_parts[0])
-            minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-            
-            # Basit hesaplamalar (gerçek astroloji hesaplamaları çok karmaşık)
-            # Bu örnek amaçlı basitleştirilmiş versiyonudur
-            
-            # 12 astroloji evi
-            houses = {}
-            house_names = [
-                "Kişilik", "Mal Varlığı", "İletişim", "Aile", "Yaratıcılık", "Sağlık",
-                "İlişkiler", "Dönüşüm", "Felsefe", "Kariyer", "Dostluk", "Spiritüalite"
-            ]
-            
-            for i in range(12):
-                # Her ev için burç hesapla (basitleştirilmiş)
-                house_sign_index = (date_obj.month + hour + i) % 12
-                house_signs = ["aries", "taurus", "gemini", "cancer", "leo", "virgo", 
-                              "libra", "scorpio", "sagittarius", "capricorn", "aquarius", "pisces"]
-                
-                houses[f"house_{i+1}"] = {
-                    "name": house_names[i],
-                    "sign": house_signs[house_sign_index],
-                    "degree": (date_obj.day + minute + i * 30) % 360
-                }
-            
-            # Gezegenler (basitleştirilmiş pozisyonlar)
-            planets = {
-                "sun": {
-                    "sign": self.calculate_zodiac_sign(birth_date),
-                    "degree": (date_obj.day * 12 + hour) % 360,
-                    "house": ((date_obj.day + hour) % 12) + 1
-                },
-                "moon": {
-                    "sign": house_signs[(date_obj.day + hour + 2) % 12],
-                    "degree": (date_obj.day * 13 + minute) % 360,
-                    "house": ((date_obj.day + hour + 2) % 12) + 1
-                },
-                "mercury": {
-                    "sign": house_signs[(date_obj.month + hour) % 12],
-                    "degree": (date_obj.month * 30 + hour * 15) % 360,
-                    "house": ((date_obj.month + hour) % 12) + 1
-                },
-                "venus": {
-                    "sign": house_signs[(date_obj.month + date_obj.day) % 12],
-                    "degree": (date_obj.month * 25 + date_obj.day * 5) % 360,
-                    "house": ((date_obj.month + date_obj.day) % 12) + 1
-                },
-                "mars": {
-                    "sign": house_signs[(date_obj.day + minute) % 12],
-                    "degree": (date_obj.day * 18 + minute * 6) % 360,
-                    "house": ((date_obj.day + minute) % 12) + 1
-                },
-                "jupiter": {
-                    "sign": house_signs[(date_obj.year % 12)],
-                    "degree": (date_obj.year % 360),
-                    "house": ((date_obj.year % 12)) + 1
-                }
-            }
-            
-            return {
-                "houses": houses,
-                "planets": planets,
-                "ascendant": {
-                    "sign": house_signs[(hour + minute // 60) % 12],
-                    "degree": (hour * 15 + minute // 4) % 360
-                },
-                "midheaven": {
-                    "sign": house_signs[(hour + 6) % 12],
-                    "degree": (hour * 15 + 90) % 360
-                }
-            }
-            
-        except Exception as e:
-            logging.error(f"Birth chart calculation error: {e}")
-            return {}
+    def calculate_birth_charts(self, births: List[dict]) -> List[dict]:
+        """Doğum haritalarını tek vektörel efemeris çağrısıyla hesapla
+        
+        Her eleman: birth_date (YYYY-MM-DD), birth_time (HH:MM), isteğe bağlı birth_place, latitude, longitude, utc_offset.
+        Tarihi/saati okunamayan eleman için boş dict döner.
+        """
+        valid, jd_ut, locations = [], [], []
+        for index, birth in enumerate(births):
+            try:
+                time_parts = birth["birth_time"].split(":")
+                local_time = datetime.strptime(birth["birth_date"], "%Y-%m-%d").replace(
+                    hour=int(time_parts[0]), minute=int(time_parts[1]) if len(time_parts) > 1 else 0
+                )
+            except (KeyError, ValueError) as e:
+                logging.error(f"Birth chart input error: {e}")
+                continue
+            location = birth_location_resolver.resolve(
+                birth.get("birth_place"), local_time, birth.get("latitude"), birth.get("longitude"), birth.get("utc_offset")
+            )
+            # Yerel saat -> UT; gün taşması Jülyen gününde kendiliğinden çözülür
+            hour = local_time.hour + local_time.minute / 60.0 - location["utc_offset"]
+            valid.append(index)
+            jd_ut.append(julian_day(local_time.year, local_time.month, local_time.day, hour))
+            locations.append(location)
+        
+        charts: List[dict] = [{} for _ in births]
+        if not valid:
+            return charts
+        batch = compute_charts(
+            jd_ut,
+            [location["latitude"] for location in locations],
+            [location["longitude"] for location in locations],
+            ASTROLOGY_HOUSE_SYSTEM,
+            table=ephemeris_table
+        )
+        for position, index in enumerate(valid):
+            charts[index] = chart_to_dict(batch, position)
+            charts[index]["location"] = locations[position]
+        return charts
     
-    async def generate_astrology_reading(self, birth_info: dict, session_id: str) -> str:
-        """Astroloji okuma oluştur"""
-        try:
-            zodiac_sign = birth_info["zodiac_sign"]
-            zodiac_info = ZODIAC_SIGNS.get(zodiac_sign, {})
-            birth_chart = birth_info.get("birth_chart", {})
-            
-            # LlmChat instance oluştur
-            chat = LlmChat(
-                api_key=self.gemini_api_key,
-                session_id=session_id,
-                system_message="""Sen deneyimli bir astrologsun. Doğum bilgileri ve doğum haritası verilen kişi için kapsamlı astroloji yorumu yapıyorsun.
+    def calculate_birth_chart(self, birth_date: str, birth_time: str, birth_place: str,
+                              latitude: Optional[float] = None, longitude: Optional[float] = None,
+                              utc_offset: Optional[float] = None) -> dict:
+        """Doğum haritası hesapla - gezegen konumları ve ev başlangıçları efemeris motorundan"""
+        return self.calculate_birth_charts([{
+            "birth_date": birth_date,
+            "birth_time": birth_time,
+            "birth_place": birth_place,
+            "latitude": latitude,
+            "longitude": longitude,
+            "utc_offset": utc_offset
+        }])[0]
+    
+    def _build_reading_prompt(self, birth_info: dict) -> tuple:
+        """Astroloji yorumu için sistem ve kullanıcı mesajını hazırla"""
+        zodiac_sign = birth_info["zodiac_sign"]
+        zodiac_info = ZODIAC_SIGNS.get(zodiac_sign, {})
+        birth_chart = birth_info.get("birth_chart", {})
+        
+        # Sistem promptu
+        system_message = """Sen deneyimli bir astrologsun. Doğum bilgileri ve doğum haritası verilen kişi için kapsamlı astroloji yorumu yapıyorsun.
 
 Astroloji kuralları:
 - Burç özelliklerini detaylı analiz et
@@ -827,27 +1470,32 @@ Astroloji kuralları:
 5. Dikkat edilmesi gereken alanlar
 6. Gelecek döneme dair öngörüler
 7. Öneriler ve tavsiyeler"""
-            ).with_model("gemini", "gemini-2.0-flash")
-            
-            # Chart bilgilerini hazırla
-            chart_info = ""
-            if birth_chart.get("planets"):
-                chart_info += "\nGezegen Konumları:\n"
-                for planet, info in birth_chart["planets"].items():
-                    planet_tr = {
-                        "sun": "Güneş", "moon": "Ay", "mercury": "Merkür", 
-                        "venus": "Venüs", "mars": "Mars", "jupiter": "Jüpiter"
-                    }.get(planet, planet)
-                    sign_name = ZODIAC_SIGNS.get(info["sign"], {}).get("name", info["sign"])
-                    chart_info += f"- {planet_tr}: {sign_name} burcunda, {info['house']}. evde\n"
-            
-            if birth_chart.get("ascendant"):
-                asc_sign = ZODIAC_SIGNS.get(birth_chart["ascendant"]["sign"], {}).get("name", "Bilinmiyor")
-                chart_info += f"\nYükselen: {asc_sign}"
-            
-            # Mesaj gönder
-            user_message = UserMessage(
-                text=f"""Doğum bilgileri:
+        
+        # Chart bilgilerini hazırla
+        chart_info = ""
+        if birth_chart.get("planets"):
+            chart_info += "\nGezegen Konumları:\n"
+            for planet, info in birth_chart["planets"].items():
+                planet_tr = {
+                    "sun": "Güneş", "moon": "Ay", "mercury": "Merkür", 
+                    "venus": "Venüs", "mars": "Mars", "jupiter": "Jüpiter",
+                    "saturn": "Satürn", "uranus": "Uranüs", "neptune": "Neptün",
+                    "pluto": "Plüton", "north_node": "Kuzey Ay Düğümü"
+                }.get(planet, planet)
+                sign_name = ZODIAC_SIGNS.get(info["sign"], {}).get("name", info["sign"])
+                retrograde = " (retro)" if info.get("retrograde") else ""
+                chart_info += f"- {planet_tr}: {sign_name} burcunda {int(info.get('degree', 0))}°, {info['house']}. evde{retrograde}\n"
+        
+        if birth_chart.get("ascendant"):
+            asc_sign = ZODIAC_SIGNS.get(birth_chart["ascendant"]["sign"], {}).get("name", "Bilinmiyor")
+            chart_info += f"\nYükselen: {asc_sign}"
+        
+        if birth_chart.get("midheaven"):
+            mc_sign = ZODIAC_SIGNS.get(birth_chart["midheaven"]["sign"], {}).get("name", "Bilinmiyor")
+            chart_info += f"\nOrta Gökyüzü (MC): {mc_sign}"
+        
+        # Kullanıcı mesajı
+        user_message = f"""Doğum bilgileri:
 - Doğum Tarihi: {birth_info['birth_date']}
 - Doğum Saati: {birth_info['birth_time']}
 - Doğum Yeri: {birth_info['birth_place']}
@@ -858,111 +1506,200 @@ Astroloji kuralları:
 {chart_info}
 
 Bu kapsamlı doğum haritası bilgilerine göre detaylı astroloji yorumu ve kişilik analizi yap."""
-            )
+        
+        return system_message, user_message
+    
+    async def generate_astrology_reading(self, birth_info: dict, session_id: str) -> str:
+        """Astroloji okuma oluştur"""
+        try:
+            system_message, user_message = self._build_reading_prompt(birth_info)
             
             # AI'dan cevap al
-            response = await chat.send_message(user_message)
+            response = await self.llm.generate(system_message, user_message)
             return response
             
         except Exception as e:
             logging.error(f"Astrology analysis error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Astroloji analizi sırasında hata oluştu: {str(e)}")
+    
+    def stream_astrology_reading(self, birth_info: dict) -> AsyncIterator[str]:
+        """Astroloji yorumunu parça parça (token akışı) üret"""
+        system_message, user_message = self._build_reading_prompt(birth_info)
+        return self.llm.stream(system_message, user_message)
 
-    async def generate_daily_horoscope(self, zodiac_sign: str, date: str, language: str = "tr") -> str:
-        """Günlük burç yorumu oluştur"""
-        try:
-            zodiac_info = ZODIAC_SIGNS.get(zodiac_sign, {})
-            session_id = f"daily_horoscope_{zodiac_sign}_{date}"
-            
-            # Dil seçimini kontrol et
-            language_prompts = {
-                "tr": "Türkçe",
-                "en": "İngilizce", 
-                "de": "Almanca",
-                "fr": "Fransızca",
-                "es": "İspanyolca"
-            }
-            target_language = language_prompts.get(language, "Türkçe")
-            
-            # LlmChat instance oluştur
-            chat = LlmChat(
-                api_key=self.gemini_api_key,
-                session_id=session_id,
-                system_message=f"""Sen deneyimli bir astrologsun. {target_language} dilinde günlük burç yorumları yazıyorsun.
+    def _build_daily_horoscope_prompt(self, zodiac_sign: str, date: str, language: str) -> tuple:
+        """Günlük burç yorumu için sistem ve kullanıcı mesajlarını oluştur"""
+        zodiac_info = ZODIAC_SIGNS.get(zodiac_sign, {})
+        
+        # Dil seçimini kontrol et
+        target_language = self.HOROSCOPE_LANGUAGE_NAMES.get(language, "Türkçe")
+        
+        # Sistem promptu
+        system_message = f"""Sen deneyimli bir astrologsun. {target_language} dilinde günlük burç yorumları yazıyorsun.
 
-Günlük burç yorumu kuralları:
+{self._daily_horoscope_rules(target_language)}
+
+Çıktı: Sadece burç yorumu paragrafını yaz, başlık veya ekstra açıklama ekleme."""
+        
+        # Kullanıcı mesajı
+        user_message = f"{zodiac_info.get('name', zodiac_sign)} burcu için {date} tarihine özel günlük burç yorumu yaz. Element: {zodiac_info.get('element', '')}, Yöneten Gezegen: {zodiac_info.get('ruling_planet', '')}. Bugün için özel motivasyon ve rehberlik içeren bir yorum hazırla."
+        
+        return system_message, user_message
+    
+    @staticmethod
+    def _daily_horoscope_rules(target_language: str) -> str:
+        return f"""Günlük burç yorumu kuralları:
 - Kısa bir paragraf (50-80 kelime) olmalı
 - Pozitif ve motive edici olmalı
 - Bugüne özel tavsiyeler içermeli
 - Aşk, kariyer, sağlık konularından birini vurgula
 - {target_language} dilinde doğal ve akıcı olmalı
 - Genel geçer ifadeler kullanma, spesifik ol
-- Umut verici ve ilham dolu bir ton kullan
+- Umut verici ve ilham dolu bir ton kullan"""
+    
+    def _build_daily_horoscope_batch_prompt(self, zodiac_signs: List[str], date: str, language: str) -> tuple:
+        """Birden fazla burcun günlük yorumu için tek JSON çağrısının mesajlarını oluştur"""
+        target_language = self.HOROSCOPE_LANGUAGE_NAMES.get(language, "Türkçe")
+        
+        system_message = f"""Sen deneyimli bir astrologsun. {target_language} dilinde günlük burç yorumları yazıyorsun.
 
-Çıktı: Sadece burç yorumu paragrafını yaz, başlık veya ekstra açıklama ekleme."""
-            ).with_model("gemini", "gemini-2.0-flash")
-            
-            # Mesaj gönder
-            user_message = UserMessage(
-                text=f"{zodiac_info.get('name', zodiac_sign)} burcu için {date} tarihine özel günlük burç yorumu yaz. Element: {zodiac_info.get('element', '')}, Yöneten Gezegen: {zodiac_info.get('ruling_planet', '')}. Bugün için özel motivasyon ve rehberlik içeren bir yorum hazırla."
-            )
-            
-            # AI'dan cevap al
-            response = await chat.send_message(user_message)
-            return response.strip()
-            
-        except Exception as e:
-            logging.error(f"Daily horoscope generation error: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Günlük burç yorumu oluşturma hatası: {str(e)}")
+{self._daily_horoscope_rules(target_language)}
+- Her burcun yorumu diğerlerinden farklı olmalı, aynı cümleleri tekrarlama
 
-    async def generate_all_daily_horoscopes(self, date: str, language: str = "tr") -> List[dict]:
-        """Tüm burçlar için günlük yorumlar oluştur"""
-        horoscopes = []
-        
-        for zodiac_key, zodiac_data in ZODIAC_SIGNS.items():
-            try:
-                content = await self.generate_daily_horoscope(zodiac_key, date, language)
-                horoscope = {
-                    "zodiac_sign": zodiac_key,
-                    "date": date,
-                    "content": content,
-                    "language": language,
-                    "zodiac_name": zodiac_data.get("name", zodiac_key)
-                }
-                horoscopes.append(horoscope)
-                
-                # Rate limiting için kısa bekleme
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logging.error(f"Error generating horoscope for {zodiac_key}: {str(e)}")
-                # Hata durumunda varsayılan mesaj
-                horoscope = {
-                    "zodiac_sign": zodiac_key,
-                    "date": date,
-                    "content": f"Bugün {zodiac_data.get('name', zodiac_key)} burcu için özel bir gün. Enerjinizi doğru kanalize edin.",
-                    "language": language,
-                    "zodiac_name": zodiac_data.get("name", zodiac_key)
-                }
-                horoscopes.append(horoscope)
+Çıktı: Sadece JSON nesnesi döndür. Anahtarlar verilen burç kodları, değerler o burcun yorum paragrafı olsun."""
         
-        return horoscopes
+        sign_lines = "\n".join(
+            f"- {sign}: {ZODIAC_SIGNS[sign]['name']} (Element: {ZODIAC_SIGNS[sign]['element']}, "
+            f"Yöneten Gezegen: {ZODIAC_SIGNS[sign]['ruling_planet']})"
+            for sign in zodiac_signs
+        )
+        user_message = f"""{date} tarihi için aşağıdaki burçların her birine özel günlük burç yorumu yaz. Bugün için özel motivasyon ve rehberlik içersin.
+
+{sign_lines}
+
+JSON formatı: {{"{zodiac_signs[0]}": "yorum", ...}}"""
+        
+        return system_message, user_message
+    
+    @staticmethod
+    def _validate_horoscope_content(content) -> Optional[str]:
+        """Toplu yanıttaki tek yorumu doğrula - kullanılamazsa None"""
+        if not isinstance(content, str):
+            return None
+        content = content.strip()
+        word_count = len(content.split())
+        if word_count < HOROSCOPE_BATCH_MIN_WORDS or word_count > HOROSCOPE_BATCH_MAX_WORDS:
+            return None
+        return content
+    
+    async def _generate_daily_horoscope_batch(self, date: str, language: str, zodiac_signs: List[str]) -> Dict[str, str]:
+        """Tek çağrıda tüm burçlar - sadece doğrulamadan geçen yorumlar döner"""
+        system_message, user_message = self._build_daily_horoscope_batch_prompt(zodiac_signs, date, language)
+        response = await self.llm.generate(system_message, user_message, response_mime_type="application/json")
+        
+        try:
+            data = json.loads(response)
+        except json.JSONDecodeError as e:
+            logging.warning(f"Batch horoscope response is not valid JSON for {date} {language}: {str(e)}")
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        
+        contents = {}
+        for zodiac_sign in zodiac_signs:
+            content = self._validate_horoscope_content(data.get(zodiac_sign))
+            if content is not None:
+                contents[zodiac_sign] = content
+        return contents
+    
+    async def _generate_daily_horoscope_text(self, zodiac_sign: str, date: str, language: str) -> str:
+        """Tek burç için AI çağrısı - hatalar sarmalanmadan fırlatılır (tekrar deneme kararı için)"""
+        system_message, user_message = self._build_daily_horoscope_prompt(zodiac_sign, date, language)
+        response = await self.llm.generate(system_message, user_message)
+        return response.strip()
+    
+    async def generate_daily_horoscope(self, zodiac_sign: str, date: str, language: str = "tr",
+                                       runner: Optional[RateLimitedRunner] = None) -> str:
+        """Günlük burç yorumu oluştur"""
+        runner = runner or horoscope_runner
+        try:
+            return await runner.run(self._generate_daily_horoscope_text, zodiac_sign, date, language)
+            
+        except Exception as e:
+            logging.error(f"Daily horoscope generation error: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Günlük burç yorumu oluşturma hatası: {str(e)}")
+    
+    async def generate_daily_horoscopes(self, date: str, language: str = "tr",
+                                        zodiac_signs: Optional[List[str]] = None,
+                                        runner: Optional[RateLimitedRunner] = None) -> Dict[str, Optional[str]]:
+        """Verilen burçların yorumlarını hız sınırı altında eşzamanlı oluştur - başarısız olanlar None döner"""
+        runner = runner or horoscope_runner
+        zodiac_signs = list(zodiac_signs) if zodiac_signs is not None else list(ZODIAC_SIGNS.keys())
+        started_at = time.perf_counter()
+        contents = {}
+        
+        # Önce tek JSON çağrısıyla hepsini iste
+        if HOROSCOPE_BATCH_ENABLED and len(zodiac_signs) > 1:
+            try:
+                contents.update(await runner.run(
+                    self._generate_daily_horoscope_batch, date, language, zodiac_signs
+                ))
+            except Exception as e:
+                logging.error(f"Batch horoscope generation failed for {date} in {language}: {str(e)}")
+        
+        # Toplu yanıtta eksik/geçersiz kalanlar için burç başına çağrı
+        fallback_signs = [sign for sign in zodiac_signs if sign not in contents]
+        if contents and fallback_signs:
+            logging.warning(f"Falling back to per-sign generation for {fallback_signs} in {language}")
+        
+        results = await asyncio.gather(*[
+            runner.run(self._generate_daily_horoscope_text, zodiac_sign, date, language)
+            for zodiac_sign in fallback_signs
+        ], return_exceptions=True)
+        
+        for zodiac_sign, result in zip(fallback_signs, results):
+            if isinstance(result, Exception):
+                logging.error(f"Error generating horoscope for {zodiac_sign} in {language}: {str(result)}")
+                contents[zodiac_sign] = None
+            else:
+                contents[zodiac_sign] = result
+        
+        generated = sum(1 for content in contents.values() if content is not None)
+        logging.info(
+            f"Generated {generated}/{len(zodiac_signs)} horoscopes for {date} in {language} "
+            f"in {time.perf_counter() - started_at:.1f}s"
+        )
+        return contents
+
+    async def generate_all_daily_horoscopes(self, date: str, language: str = "tr") -> List[dict]:
+        """Tüm burçlar için günlük yorumlar oluştur"""
+        contents = await self.generate_daily_horoscopes(date, language)
+        horoscopes = []
+        
+        for zodiac_key, zodiac_data in ZODIAC_SIGNS.items():
+            content = contents.get(zodiac_key)
+            if content is None:
+                # Hata durumunda varsayılan mesaj
+                content = f"Bugün {zodiac_data.get('name', zodiac_key)} burcu için özel bir gün. Enerjinizi doğru kanalize edin."
+            horoscopes.append({
+                "zodiac_sign": zodiac_key,
+                "date": date,
+                "content": content,
+                "language": language,
+                "zodiac_name": zodiac_data.get("name", zodiac_key)
+            })
+        
+        return horoscopes
 
 # Falname Analysis Service
 class FalnameAnalysisService:
     def __init__(self):
-        self.gemini_api_key = os.environ.get('GEMINI_API_KEY')
-        if not self.gemini_api_key:
-            raise ValueError("Gemini API key not found in environment variables")
+        self.llm = llm_gateway.model(GEMINI_MODEL)
     
-    async def generate_falname_reading(self, intention: str, session_id: str) -> dict:
-        """Falname okuma oluştur - Osmanlı tarzı mistik fal"""
-        try:
-            # LlmChat instance oluştur
-            chat = LlmChat(
-                api_key=self.gemini_api_key,
-                session_id=session_id,
-                system_message="""Sen klasik Osmanlı tarzında konuşan, kadim bilgelik sahibi bir Falname kahinisin. 
+    def _build_prompt(self, intention: str) -> tuple:
+        """Falname için sistem ve kullanıcı mesajını hazırla"""
+        # Sistem promptu
+        system_message = """Sen klasik Osmanlı tarzında konuşan, kadim bilgelik sahibi bir Falname kahinisin. 
 Kullanıcı niyetini tutmuş ve sendan mistik bir kehanet almak istiyor.
 
 FALNAME KURALLARI:
@@ -983,30 +1720,43 @@ YANITINI ŞÖYLE YAPISALLAŞTIR:
 [Manevi ve etik yönlendirme: sabır, tevekkül, tedbir, dua vs. - 1-2 cümle]
 
 TON: Osmanlı mistik kahini, bilge, merhametli, rehber niteliğinde"""
-            ).with_model("gemini", "gemini-2.0-flash")
-            
-            # Mesaj gönder
-            user_message = UserMessage(
-                text=f"Bir kişi şu niyetle Falname'ye başvuruyor: '{intention}'. Ona Osmanlı tarzı mistik bir fal sun. Ayet veya kehanet şiiri ile başla, yorumla, sonra tavsiye ver."
-            )
+        
+        # Kullanıcı mesajı
+        user_message = f"Bir kişi şu niyetle Falname'ye başvuruyor: '{intention}'. Ona Osmanlı tarzı mistik bir fal sun. Ayet veya kehanet şiiri ile başla, yorumla, sonra tavsiye ver."
+        
+        return system_message, user_message
+    
+    async def generate_falname_reading(self, intention: str, session_id: str) -> dict:
+        """Falname okuma oluştur - Osmanlı tarzı mistik fal"""
+        try:
+            system_message, user_message = self._build_prompt(intention)
             
             # AI'dan cevap al
-            response = await chat.send_message(user_message)
+            response = await self.llm.generate(system_message, user_message)
             
-            # Response'u parse et
-            parsed_response = self._parse_falname_response(response)
-            
-            return {
-                "verse_or_poem": parsed_response["verse_or_poem"],
-                "interpretation": parsed_response["interpretation"], 
-                "advice": parsed_response["advice"],
-                "full_response": response
-            }
+            return self.build_analysis(response)
             
         except Exception as e:
             logging.error(f"Falname analysis error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Falname analizi sırasında hata oluştu: {str(e)}")
     
+    def stream_falname_reading(self, intention: str) -> AsyncIterator[str]:
+        """Falname yorumunu parça parça (token akışı) üret"""
+        system_message, user_message = self._build_prompt(intention)
+        return self.llm.stream(system_message, user_message)
+    
+    def build_analysis(self, response: str) -> dict:
+        """AI cevabını bölümlerine ayır"""
+        # Response'u parse et
+        parsed_response = self._parse_falname_response(response)
+        
+        return {
+            "verse_or_poem": parsed_response["verse_or_poem"],
+            "interpretation": parsed_response["interpretation"], 
+            "advice": parsed_response["advice"],
+            "full_response": response
+        }
+    
     def _parse_falname_response(self, ai_response: str) -> dict:
         """AI cevabından bölümleri çıkar"""
         try:
@@ -1085,9 +1835,56 @@ palm_service = PalmAnalysisService()
 astrology_service = AstrologyAnalysisService()
 falname_service = FalnameAnalysisService()
 
+# Server-Sent Events yardımcıları
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Tek bir SSE mesajı oluştur"""
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {payload}\n\n"
+
+# Akışı süren okumaların üretim görevleri (görevlerin çöp toplayıcıya gitmemesi için referans tutulur)
+_stream_producers: set = set()
+
+def stream_reading_response(chunks: AsyncIterator[str], meta: dict, finalize, reading_type: str) -> StreamingResponse:
+    """AI yanıtını token token SSE olarak gönder, akış bitince okumayı kaydet
+    
+    Üretim ayrı bir görevde çalışır: istemci bağlantıyı yarıda keserse de yanıt tamamlanıp kaydedilir
+    (token'ların ücreti zaten ödenmiştir), okuma geçmişte ve akışta görünür.
+    """
+    async def produce(queue: asyncio.Queue):
+        parts = []
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                queue.put_nowait(("token", {"text": chunk}))
+            
+            # Tam metni kaydet ve son response'u gönder
+            response = await finalize("".join(parts))
+            queue.put_nowait(("done", response))
+        except Exception as e:
+            logging.error(f"{reading_type} stream error: {str(e)}")
+            queue.put_nowait(("error", {"detail": f"AI yanıtı akışı sırasında hata oluştu: {str(e)}"}))
+    
+    async def event_stream():
+        queue: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(produce(queue))
+        _stream_producers.add(producer)
+        producer.add_done_callback(_stream_producers.discard)
+        
+        yield sse_event(meta, "meta")
+        while True:
+            event, data = await queue.get()
+            yield sse_event(data, event)
+            if event != "token":
+                return
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # Authentication Endpoints
 @api_router.post("/auth/register", response_model=UserResponse)
-async def register_user(user_data: UserRegister, background_tasks: BackgroundTasks):
+async def register_user(user_data: UserRegister):
     """Yeni kullanıcı kaydı"""
     try:
         # Sözleşme onayı kontrolü
@@ -1100,7 +1897,7 @@ async def register_user(user_data: UserRegister, background_tasks: BackgroundTas
             raise HTTPException(status_code=400, detail="Bu email adresi zaten kayıtlı")
         
         # Parolayı hash'le
-        hashed_password = auth_service.hash_password(user_data.password)
+        hashed_password = await auth_service.hash_password(user_data.password)
         
         # Doğrulama token'ı oluştur
         verification_token = auth_service.generate_verification_token()
@@ -1111,18 +1908,15 @@ async def register_user(user_data: UserRegister, background_tasks: BackgroundTas
             hashed_password=hashed_password,
             verification_token=verification_token,
             terms_accepted=True,
-            terms_accepted_at=datetime.utcnow()
+            terms_accepted_at=datetime.utcnow(),
+            language=user_data.language
         )
         
         # Veritabanına kaydet
         await db.users.insert_one(user.dict())
         
-        # Doğrulama emaili gönder (background task)
-        background_tasks.add_task(
-            auth_service.email_service.send_verification_email,
-            user_data.email,
-            verification_token
-        )
+        # Doğrulama emailini outbox'a ekle (email worker gönderir)
+        await auth_service.email_service.send_verification_email(user.id, user_data.email, verification_token, user.language)
         
         return UserResponse(
             id=user.id,
@@ -1139,7 +1933,7 @@ async def register_user(user_data: UserRegister, background_tasks: BackgroundTas
         raise HTTPException(status_code=500, detail=f"Kayıt hatası: {str(e)}")
 
 @api_router.post("/auth/login", response_model=Token)
-async def login_user(user_data: UserLogin):
+async def login_user(user_data: UserLogin, background_tasks: BackgroundTasks):
     """Kullanıcı girişi"""
     try:
         # Kullanıcıyı bul
@@ -1148,16 +1942,24 @@ async def login_user(user_data: UserLogin):
             raise HTTPException(status_code=401, detail="Email veya parola hatalı")
         
         # Parolayı doğrula
-        if not auth_service.verify_password(user_data.password, user["hashed_password"]):
+        if not await auth_service.verify_password(user_data.password, user["hashed_password"]):
             raise HTTPException(status_code=401, detail="Email veya parola hatalı")
         
         # Email doğrulanmış mı kontrol et
         if not user["is_verified"]:
             raise HTTPException(status_code=401, detail="Lütfen önce email adresinizi doğrulayın")
         
+        # Maliyet faktörü değiştiyse hash'i arka planda yenile
+        background_tasks.add_task(
+            auth_service.rehash_password_if_needed,
+            user["id"],
+            user_data.password,
+            user["hashed_password"]
+        )
+        
         # JWT token oluştur
         access_token = auth_service.create_access_token(
-            data={"sub": user["id"], "email": user["email"]}
+            data={"sub": user["id"], "email": user["email"], "is_verified": user["is_verified"]}
         )
         
         return Token(
@@ -1198,6 +2000,7 @@ async def verify_email(verify_data: VerifyEmail):
                 }
             }
         )
+        user_cache.invalidate(user["id"])
         
         return {"message": "Email adresiniz başarıyla doğrulandı"}
         
@@ -1208,7 +2011,7 @@ async def verify_email(verify_data: VerifyEmail):
         raise HTTPException(status_code=500, detail=f"Email doğrulama hatası: {str(e)}")
 
 @api_router.get("/auth/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user_full)):
     """Mevcut kullanıcı bilgilerini al"""
     return UserResponse(
         id=current_user.id,
@@ -1220,7 +2023,7 @@ async def get_me(current_user: User = Depends(get_current_user)):
     )
 
 @api_router.put("/auth/profile", response_model=UserResponse)
-async def update_profile(profile_data: UserProfileUpdate, current_user: User = Depends(get_current_user)):
+async def update_profile(profile_data: UserProfileUpdate, current_user: User = Depends(get_current_user_full)):
     """Kullanıcı profilini güncelle (favori burç vb.)"""
     try:
         update_data = {}
@@ -1238,6 +2041,7 @@ async def update_profile(profile_data: UserProfileUpdate, current_user: User = D
                 {"id": current_user.id},
                 {"$set": update_data}
             )
+            user_cache.invalidate(current_user.id)
         
         # Güncellenmiş kullanıcıyı al
         updated_user = await db.users.find_one({"id": current_user.id})
@@ -1260,7 +2064,7 @@ async def update_profile(profile_data: UserProfileUpdate, current_user: User = D
         raise HTTPException(status_code=500, detail=f"Profil güncelleme hatası: {str(e)}")
 
 @api_router.post("/auth/resend-verification")
-async def resend_verification_email(user_data: UserLogin, background_tasks: BackgroundTasks):
+async def resend_verification_email(user_data: UserLogin):
     """Doğrulama emailini tekrar gönder"""
     try:
         # Kullanıcıyı bul
@@ -1269,7 +2073,7 @@ async def resend_verification_email(user_data: UserLogin, background_tasks: Back
             raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
         
         # Parolayı doğrula
-        if not auth_service.verify_password(user_data.password, user["hashed_password"]):
+        if not await auth_service.verify_password(user_data.password, user["hashed_password"]):
             raise HTTPException(status_code=401, detail="Parola hatalı")
         
         # Zaten doğrulanmış mı kontrol et
@@ -1289,12 +2093,11 @@ async def resend_verification_email(user_data: UserLogin, background_tasks: Back
                 }
             }
         )
+        user_cache.invalidate(user["id"])
         
-        # Doğrulama emaili gönder (background task)
-        background_tasks.add_task(
-            auth_service.email_service.send_verification_email,
-            user["email"],
-            new_verification_token
+        # Doğrulama emailini outbox'a ekle (email worker gönderir)
+        await auth_service.email_service.send_verification_email(
+            user["id"], user["email"], new_verification_token, user.get("language", "tr")
         )
         
         return {"message": "Doğrulama emaili tekrar gönderildi"}
@@ -1322,7 +2125,185 @@ async def get_status_checks():
     status_checks = await db.status_checks.find().to_list(1000)
     return [StatusCheck(**status_check) for status_check in status_checks]
 
+# Reading Image Helpers
+def decode_image_base64(image_base64: str) -> bytes:
+    """Base64 resmi çöz (data URL ön eki varsa atılır)"""
+    if image_base64.startswith("data:") and "," in image_base64:
+        image_base64 = image_base64.split(",", 1)[1]
+    try:
+        return base64.b64decode(image_base64, validate=True)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Geçersiz resim verisi")
+
+async def store_image_base64(image_base64: str) -> BlobRef:
+    """Base64 resmi blob store'a yaz ve referansını döndür"""
+    return await blob_store.put(decode_image_base64(image_base64))
+
+async def read_image_upload(file: UploadFile) -> tuple:
+    """Multipart resmi oku: boyut sınırını okumadan önce uygula, sha256'yı tek kopya üzerinden hesapla"""
+    if file.content_type and not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="Sadece resim dosyaları yüklenebilir")
+    
+    # Starlette gövdeyi zaten SpooledTemporaryFile'a yazdı; boyut oradan okunur.
+    # Content-Length göndermeyen (chunked) istemciler middleware'e takılmaz, burada sınırlanır
+    spooled = file.file
+    spooled.seek(0, os.SEEK_END)
+    size = spooled.tell()
+    spooled.seek(0)
+    if size > MAX_IMAGE_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Resim dosyası çok büyük")
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Boş resim dosyası")
+    
+    # Ham baytlar bellekte tek kopya olarak tutulur (parça listesi + join yok);
+    # base64'e sadece Gemini isteği oluşturulurken çevrilir
+    image_bytes = await file.read()
+    return image_bytes, hashlib.sha256(image_bytes).hexdigest()
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Resim yüklemelerinde Content-Length sınırı aşıyorsa gövde okunmadan (spool edilmeden) 413 dön"""
+    if request.method == "POST" and request.url.path.endswith("/upload"):
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_IMAGE_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD_BYTES:
+            return JSONResponse(status_code=413, content={"detail": "Resim dosyası çok büyük"})
+    return await call_next(request)
+
+# Reading History Pagination
+# Response modellerinin ihtiyaç duyduğu alanlar - resim referansları ve user_id gibi alanlar çekilmez
+READING_PROJECTIONS = {
+    "coffee_readings": ["id", "session_id", "symbols_found", "interpretation", "timestamp", "confidence_score"],
+    "tarot_readings": ["id", "session_id", "spread_type", "interpretation", "timestamp",
+                       "cards_drawn.card.id", "cards_drawn.position", "cards_drawn.reversed"],
+    "palm_readings": ["id", "session_id", "hand_type", "lines_found", "interpretation", "timestamp", "confidence_score"],
+    "astrology_readings": ["id", "session_id", "birth_date", "birth_time", "birth_place", "zodiac_sign",
+                           "planets", "birth_chart", "interpretation", "timestamp"],
+    "falname_readings": ["id", "session_id", "intention", "verse_or_poem", "interpretation", "advice",
+                         "full_response", "timestamp"],
+    "reading_feed": ["type", "reading_id", "session_id", "timestamp", "summary"],
+}
+
+TAROT_CARDS_BY_ID = {card["id"]: card for card in TAROT_DECK}
+
+def encode_cursor(timestamp: datetime, reading_id: str) -> str:
+    """(timestamp, id) çiftini opak bir imlece çevir"""
+    raw = json.dumps({"t": timestamp.isoformat(), "id": reading_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), str(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Geçersiz sayfa imleci")
+
+async def fetch_reading_page(collection_name: str, query: dict, before: Optional[str], limit: int, response: Response,
+                             id_field: str = "id") -> List[dict]:
+    """Keyset sayfalama: (timestamp, id) azalan sırada, `before` imlecinden sonraki `limit` okuma.
+
+    Sonraki sayfanın imleci X-Next-Cursor header'ında döner (body liste olarak kalır).
+    """
+    if before:
+        timestamp, reading_id = decode_cursor(before)
+        query = {**query, "$or": [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, id_field: {"$lt": reading_id}}
+        ]}
+    
+    projection = {"_id": 0, **{field: 1 for field in READING_PROJECTIONS[collection_name]}}
+    readings = await db[collection_name].find(query, projection).sort(
+        [("timestamp", -1), (id_field, -1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    if len(readings) > limit:
+        readings = readings[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(readings[-1]["timestamp"], readings[-1][id_field])
+    return readings
+
+def hydrate_tarot_cards(cards_drawn: List[dict]) -> List[dict]:
+    """Sadece id'si çekilen kartları bellekteki desteden tamamla"""
+    return [
+        {**card_data, "card": TAROT_CARDS_BY_ID.get(card_data["card"]["id"], card_data["card"])}
+        for card_data in cards_drawn
+    ]
+
+# Reading Feed
+async def append_reading_feed(user_id: str, reading_type: str, reading_id: str, session_id: str,
+                              timestamp: datetime, text: str):
+    """Kullanıcının okuma akışına kompakt kayıt ekle - hata okumayı bozmaz"""
+    try:
+        await db.reading_feed.insert_one({
+            "user_id": user_id,
+            "type": reading_type,
+            "reading_id": reading_id,
+            "session_id": session_id,
+            "timestamp": timestamp,
+            "summary": feed_summary(text, FEED_SUMMARY_CHARS)
+        })
+    except Exception as e:
+        logging.error(f"Reading feed append error ({reading_type} {reading_id}): {str(e)}")
+
+@api_router.get("/me/readings", response_model=List[ReadingFeedItem])
+async def get_my_readings(
+    response: Response,
+    type: Optional[List[str]] = Query(None),
+    before: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
+    """Kullanıcının tüm fal türlerindeki okumalarını tek zaman çizelgesinde getir"""
+    try:
+        query = {"user_id": current_user.id}
+        if type:
+            invalid_types = [reading_type for reading_type in type if reading_type not in READING_TYPES]
+            if invalid_types:
+                raise HTTPException(status_code=400, detail=f"Geçersiz okuma türü: {', '.join(invalid_types)}")
+            query["type"] = type[0] if len(type) == 1 else {"$in": type}
+        
+        items = await fetch_reading_page("reading_feed", query, before, limit, response, id_field="reading_id")
+        return [ReadingFeedItem(**item) for item in items]
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Get reading feed error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Okuma geçmişi getirme hatası: {str(e)}")
+
 # Coffee Reading Endpoints
+async def save_coffee_reading(session_id: str, image: BlobRef, analysis: dict, user_id: str,
+                              reading_id: Optional[str] = None) -> CoffeeReadingResponse:
+    """Kahve falı okumasını kaydet ve response oluştur"""
+    # Reading objesi oluştur (kullanıcı ID'si ile birlikte)
+    coffee_reading = CoffeeReading(
+        id=reading_id or str(uuid.uuid4()),
+        session_id=session_id,
+        image_hash=image.hash,
+        image_size=image.size,
+        symbols_found=analysis["symbols_found"],
+        interpretation=analysis["interpretation"],
+        confidence_score=analysis["confidence_score"]
+    )
+    
+    # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
+    reading_dict = coffee_reading.dict()
+    reading_dict["user_id"] = user_id
+    await db.coffee_readings.insert_one(reading_dict)
+    await append_reading_feed(user_id, "coffee", coffee_reading.id, coffee_reading.session_id, coffee_reading.timestamp, coffee_reading.interpretation)
+    
+    # Resim parmak izini tekrar tespiti için kaydet
+    await image_dedup.add(user_id, "coffee", analysis.get("image_fingerprint"), coffee_reading.id)
+    
+    # Response oluştur
+    return CoffeeReadingResponse(
+        id=coffee_reading.id,
+        session_id=coffee_reading.session_id,
+        symbols_found=coffee_reading.symbols_found,
+        interpretation=coffee_reading.interpretation,
+        timestamp=coffee_reading.timestamp,
+        confidence_score=coffee_reading.confidence_score
+    )
+
 @api_router.post("/coffee-reading", response_model=CoffeeReadingResponse)
 async def create_coffee_reading(reading_data: CoffeeReadingCreate, current_user: User = Depends(get_current_user)):
     """Kahve falı okuma oluştur - Sadece kayıtlı kullanıcılar"""
@@ -1330,47 +2311,85 @@ async def create_coffee_reading(reading_data: CoffeeReadingCreate, current_user:
         # Session ID oluştur eğer yoksa (kullanıcı ID'si ile bağlantılı)
         session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
         
+        # Resmi bir kez çöz; geçersizse ücretli AI çağrısından önce 400 dön
+        image_bytes = decode_image_base64(reading_data.image_base64)
+        
         # AI analizi yap
         analysis = await coffee_service.analyze_coffee_grounds(
-            reading_data.image_base64, 
-            session_id
+            image_bytes, 
+            session_id,
+            current_user.id
         )
         
-        # Reading objesi oluştur (kullanıcı ID'si ile birlikte)
-        coffee_reading = CoffeeReading(
-            session_id=session_id,
-            image_base64=reading_data.image_base64,
-            symbols_found=analysis["symbols_found"],
-            interpretation=analysis["interpretation"],
-            confidence_score=analysis["confidence_score"]
-        )
+        # Resmi blob store'a kaydet, dokümanda sadece referans tutulur
+        image = await blob_store.put(image_bytes)
+        return await save_coffee_reading(session_id, image, analysis, current_user.id)
         
-        # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
-        reading_dict = coffee_reading.dict()
-        reading_dict["user_id"] = current_user.id
-        await db.coffee_readings.insert_one(reading_dict)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Coffee reading creation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Kahve falı okuma hatası: {str(e)}")
+
+@api_router.post("/coffee-reading/upload", response_model=CoffeeReadingResponse)
+async def create_coffee_reading_upload(
+    image: UploadFile = File(...),
+    session_id: Optional[str] = Form(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Kahve falı okuma oluştur (multipart resim yükleme) - Sadece kayıtlı kullanıcılar"""
+    try:
+        session_id = session_id or f"{current_user.id}_{uuid.uuid4()}"
         
-        # Response oluştur
-        return CoffeeReadingResponse(
-            id=coffee_reading.id,
-            session_id=coffee_reading.session_id,
-            symbols_found=coffee_reading.symbols_found,
-            interpretation=coffee_reading.interpretation,
-            timestamp=coffee_reading.timestamp,
-            confidence_score=coffee_reading.confidence_score
-        )
+        image_bytes, image_hash = await read_image_upload(image)
         
+        # AI analizi yap
+        analysis = await coffee_service.analyze_coffee_grounds(image_bytes, session_id, current_user.id)
+        
+        # Hash zaten hesaplandı, blob store tekrar hesaplamaz
+        image_ref = await blob_store.put(image_bytes, digest=image_hash)
+        return await save_coffee_reading(session_id, image_ref, analysis, current_user.id)
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Coffee reading creation error: {str(e)}")
+        logging.error(f"Coffee reading upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Kahve falı okuma hatası: {str(e)}")
+    finally:
+        await image.close()
+
+@api_router.post("/coffee-reading/stream")
+async def create_coffee_reading_stream(reading_data: CoffeeReadingCreate, current_user: User = Depends(get_current_user)):
+    """Kahve falı okumasını SSE ile akış halinde oluştur - Sadece kayıtlı kullanıcılar"""
+    session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
+    # Akış başlamadan çöz: geçersiz resim SSE yerine 400 olarak döner
+    image_bytes = decode_image_base64(reading_data.image_base64)
+    
+    async def finalize(response: str) -> CoffeeReadingResponse:
+        analysis = coffee_service.build_analysis(response)
+        image = await blob_store.put(image_bytes)
+        return await save_coffee_reading(session_id, image, analysis, current_user.id)
+    
+    return stream_reading_response(
+        coffee_service.stream_coffee_grounds(image_bytes),
+        {"session_id": session_id},
+        finalize,
+        "Coffee reading"
+    )
 
 @api_router.get("/coffee-reading/{session_id}", response_model=List[CoffeeReadingResponse])
-async def get_coffee_readings(session_id: str, current_user: User = Depends(get_current_user)):
+async def get_coffee_readings(
+    session_id: str,
+    response: Response,
+    before: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
     """Belirli bir session'a ait kahve falı okumalarını getir - Sadece kullanıcının kendi okumalarını"""
     try:
-        readings = await db.coffee_readings.find(
-            {"session_id": session_id, "user_id": current_user.id}
-        ).sort("timestamp", -1).to_list(100)
+        readings = await fetch_reading_page(
+            "coffee_readings", {"session_id": session_id, "user_id": current_user.id}, before, limit, response
+        )
         
         return [
             CoffeeReadingResponse(
@@ -1383,6 +2402,8 @@ async def get_coffee_readings(session_id: str, current_user: User = Depends(get_
             ) for reading in readings
         ]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Get coffee readings error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Kahve falı geçmişi getirme hatası: {str(e)}")
@@ -1416,6 +2437,54 @@ async def get_coffee_reading(session_id: str, reading_id: str, current_user: Use
         raise HTTPException(status_code=500, detail=f"Kahve falı getirme hatası: {str(e)}")
 
 # Tarot Reading Endpoints
+def draw_tarot_cards(spread_type: str) -> List[dict]:
+    """Yayılım tipine göre rastgele kart çek"""
+    if spread_type == "three_card":
+        num_cards = 3
+    else:
+        num_cards = 3  # Default
+    
+    # Random kart seçimi
+    selected_cards = random.sample(TAROT_DECK, num_cards)
+    
+    # Her kart için ters/düz durumu belirle
+    cards_drawn = []
+    for card in selected_cards:
+        card_data = {
+            "card": card,
+            "position": f"position_{len(cards_drawn) + 1}",
+            "reversed": random.choice([True, False])
+        }
+        cards_drawn.append(card_data)
+    
+    return cards_drawn
+
+async def save_tarot_reading(session_id: str, spread_type: str, cards_drawn: List[dict], interpretation: str, user_id: str) -> TarotReadingResponse:
+    """Tarot okumasını kaydet ve response oluştur"""
+    # Reading objesi oluştur
+    tarot_reading = TarotReading(
+        session_id=session_id,
+        spread_type=spread_type,
+        cards_drawn=cards_drawn,
+        interpretation=interpretation
+    )
+    
+    # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
+    reading_dict = tarot_reading.dict()
+    reading_dict["user_id"] = user_id
+    await db.tarot_readings.insert_one(reading_dict)
+    await append_reading_feed(user_id, "tarot", tarot_reading.id, tarot_reading.session_id, tarot_reading.timestamp, tarot_reading.interpretation)
+    
+    # Response oluştur
+    return TarotReadingResponse(
+        id=tarot_reading.id,
+        session_id=tarot_reading.session_id,
+        spread_type=tarot_reading.spread_type,
+        cards_drawn=tarot_reading.cards_drawn,
+        interpretation=tarot_reading.interpretation,
+        timestamp=tarot_reading.timestamp
+    )
+
 @api_router.get("/tarot-cards", response_model=List[TarotCard])
 async def get_tarot_cards():
     """Tüm tarot kartlarını getir"""
@@ -1433,75 +2502,62 @@ async def create_tarot_reading(reading_data: TarotReadingCreate, current_user: U
         session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
         
         # Kartları karıştır ve seç
-        if reading_data.spread_type == "three_card":
-            num_cards = 3
-        else:
-            num_cards = 3  # Default
-        
-        # Random kart seçimi
-        selected_cards = random.sample(TAROT_DECK, num_cards)
-        
-        # Her kart için ters/düz durumu belirle
-        cards_drawn = []
-        for card in selected_cards:
-            card_data = {
-                "card": card,
-                "position": f"position_{len(cards_drawn) + 1}",
-                "reversed": random.choice([True, False])
-            }
-            cards_drawn.append(card_data)
+        cards_drawn = draw_tarot_cards(reading_data.spread_type)
         
         # AI yorumlama
         interpretation = await tarot_service.interpret_tarot_spread(
             cards_drawn, reading_data.spread_type, session_id
         )
         
-        # Reading objesi oluştur
-        tarot_reading = TarotReading(
-            session_id=session_id,
-            spread_type=reading_data.spread_type,
-            cards_drawn=cards_drawn,
-            interpretation=interpretation
-        )
-        
-        # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
-        reading_dict = tarot_reading.dict()
-        reading_dict["user_id"] = current_user.id
-        await db.tarot_readings.insert_one(reading_dict)
-        
-        # Response oluştur
-        return TarotReadingResponse(
-            id=tarot_reading.id,
-            session_id=tarot_reading.session_id,
-            spread_type=tarot_reading.spread_type,
-            cards_drawn=tarot_reading.cards_drawn,
-            interpretation=tarot_reading.interpretation,
-            timestamp=tarot_reading.timestamp
-        )
+        return await save_tarot_reading(session_id, reading_data.spread_type, cards_drawn, interpretation, current_user.id)
         
     except Exception as e:
         logging.error(f"Tarot reading creation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Tarot okuma hatası: {str(e)}")
 
+@api_router.post("/tarot-reading/stream")
+async def create_tarot_reading_stream(reading_data: TarotReadingCreate, current_user: User = Depends(get_current_user)):
+    """Tarot okumasını SSE ile akış halinde oluştur - Sadece kayıtlı kullanıcılar"""
+    session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
+    cards_drawn = draw_tarot_cards(reading_data.spread_type)
+    
+    async def finalize(interpretation: str) -> TarotReadingResponse:
+        return await save_tarot_reading(session_id, reading_data.spread_type, cards_drawn, interpretation, current_user.id)
+    
+    return stream_reading_response(
+        tarot_service.stream_tarot_spread(cards_drawn, reading_data.spread_type),
+        {"session_id": session_id, "spread_type": reading_data.spread_type, "cards_drawn": cards_drawn},
+        finalize,
+        "Tarot reading"
+    )
+
 @api_router.get("/tarot-reading/{session_id}", response_model=List[TarotReadingResponse])
-async def get_tarot_readings(session_id: str, current_user: User = Depends(get_current_user)):
+async def get_tarot_readings(
+    session_id: str,
+    response: Response,
+    before: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
     """Belirli bir session'a ait tarot okumalarını getir - Sadece kullanıcının kendi okumalarını"""
     try:
-        readings = await db.tarot_readings.find(
-            {"session_id": session_id, "user_id": current_user.id}
-        ).sort("timestamp", -1).to_list(100)
+        readings = await fetch_reading_page(
+            "tarot_readings", {"session_id": session_id, "user_id": current_user.id}, before, limit, response
+        )
         
         return [
             TarotReadingResponse(
                 id=reading["id"],
                 session_id=reading["session_id"],
                 spread_type=reading["spread_type"],
-                cards_drawn=reading["cards_drawn"],
+                cards_drawn=hydrate_tarot_cards(reading["cards_drawn"]),
                 interpretation=reading["interpretation"],
                 timestamp=reading["timestamp"]
             ) for reading in readings
         ]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Get tarot readings error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Tarot geçmişi getirme hatası: {str(e)}")
@@ -1534,6 +2590,41 @@ async def get_tarot_reading(session_id: str, reading_id: str, current_user: User
         logging.error(f"Get tarot reading error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Tarot okuma getirme hatası: {str(e)}")
 # Palm Reading Endpoints
+async def save_palm_reading(session_id: str, image: BlobRef, hand_type: str, analysis: dict, user_id: str,
+                            reading_id: Optional[str] = None) -> PalmReadingResponse:
+    """El falı okumasını kaydet ve response oluştur"""
+    # Reading objesi oluştur
+    palm_reading = PalmReading(
+        id=reading_id or str(uuid.uuid4()),
+        session_id=session_id,
+        image_hash=image.hash,
+        image_size=image.size,
+        hand_type=hand_type,
+        lines_found=analysis["lines_found"],
+        interpretation=analysis["interpretation"],
+        confidence_score=analysis["confidence_score"]
+    )
+    
+    # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
+    reading_dict = palm_reading.dict()
+    reading_dict["user_id"] = user_id
+    await db.palm_readings.insert_one(reading_dict)
+    await append_reading_feed(user_id, "palm", palm_reading.id, palm_reading.session_id, palm_reading.timestamp, palm_reading.interpretation)
+    
+    # Resim parmak izini tekrar tespiti için kaydet
+    await image_dedup.add(user_id, f"palm_{hand_type}", analysis.get("image_fingerprint"), palm_reading.id)
+    
+    # Response oluştur
+    return PalmReadingResponse(
+        id=palm_reading.id,
+        session_id=palm_reading.session_id,
+        hand_type=palm_reading.hand_type,
+        lines_found=palm_reading.lines_found,
+        interpretation=palm_reading.interpretation,
+        timestamp=palm_reading.timestamp,
+        confidence_score=palm_reading.confidence_score
+    )
+
 @api_router.post("/palm-reading", response_model=PalmReadingResponse)
 async def create_palm_reading(reading_data: PalmReadingCreate, current_user: User = Depends(get_current_user)):
     """Yeni el falı okuma oluştur - Sadece kayıtlı kullanıcılar"""
@@ -1541,50 +2632,87 @@ async def create_palm_reading(reading_data: PalmReadingCreate, current_user: Use
         # Session ID oluştur eğer yoksa (kullanıcı ID'si ile bağlantılı)
         session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
         
+        # Resmi bir kez çöz; geçersizse ücretli AI çağrısından önce 400 dön
+        image_bytes = decode_image_base64(reading_data.image_base64)
+        
         # AI analizi yap
         analysis = await palm_service.analyze_palm_lines(
-            reading_data.image_base64, 
+            image_bytes, 
             reading_data.hand_type,
-            session_id
+            session_id,
+            current_user.id
         )
         
-        # Reading objesi oluştur
-        palm_reading = PalmReading(
-            session_id=session_id,
-            image_base64=reading_data.image_base64,
-            hand_type=reading_data.hand_type,
-            lines_found=analysis["lines_found"],
-            interpretation=analysis["interpretation"],
-            confidence_score=analysis["confidence_score"]
-        )
+        # Resmi blob store'a kaydet, dokümanda sadece referans tutulur
+        image = await blob_store.put(image_bytes)
+        return await save_palm_reading(session_id, image, reading_data.hand_type, analysis, current_user.id)
         
-        # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
-        reading_dict = palm_reading.dict()
-        reading_dict["user_id"] = current_user.id
-        await db.palm_readings.insert_one(reading_dict)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Palm reading creation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"El falı okuma hatası: {str(e)}")
+
+@api_router.post("/palm-reading/upload", response_model=PalmReadingResponse)
+async def create_palm_reading_upload(
+    image: UploadFile = File(...),
+    hand_type: str = Form("right"),
+    session_id: Optional[str] = Form(None),
+    current_user: User = Depends(get_current_user)
+):
+    """El falı okuma oluştur (multipart resim yükleme) - Sadece kayıtlı kullanıcılar"""
+    try:
+        session_id = session_id or f"{current_user.id}_{uuid.uuid4()}"
         
-        # Response oluştur
-        return PalmReadingResponse(
-            id=palm_reading.id,
-            session_id=palm_reading.session_id,
-            hand_type=palm_reading.hand_type,
-            lines_found=palm_reading.lines_found,
-            interpretation=palm_reading.interpretation,
-            timestamp=palm_reading.timestamp,
-            confidence_score=palm_reading.confidence_score
-        )
+        image_bytes, image_hash = await read_image_upload(image)
+        
+        # AI analizi yap
+        analysis = await palm_service.analyze_palm_lines(image_bytes, hand_type, session_id, current_user.id)
         
+        # Hash zaten hesaplandı, blob store tekrar hesaplamaz
+        image_ref = await blob_store.put(image_bytes, digest=image_hash)
+        return await save_palm_reading(session_id, image_ref, hand_type, analysis, current_user.id)
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Palm reading creation error: {str(e)}")
+        logging.error(f"Palm reading upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"El falı okuma hatası: {str(e)}")
+    finally:
+        await image.close()
+
+@api_router.post("/palm-reading/stream")
+async def create_palm_reading_stream(reading_data: PalmReadingCreate, current_user: User = Depends(get_current_user)):
+    """El falı okumasını SSE ile akış halinde oluştur - Sadece kayıtlı kullanıcılar"""
+    session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
+    # Akış başlamadan çöz: geçersiz resim SSE yerine 400 olarak döner
+    image_bytes = decode_image_base64(reading_data.image_base64)
+    
+    async def finalize(response: str) -> PalmReadingResponse:
+        analysis = palm_service.build_analysis(response)
+        image = await blob_store.put(image_bytes)
+        return await save_palm_reading(session_id, image, reading_data.hand_type, analysis, current_user.id)
+    
+    return stream_reading_response(
+        palm_service.stream_palm_lines(image_bytes, reading_data.hand_type),
+        {"session_id": session_id, "hand_type": reading_data.hand_type},
+        finalize,
+        "Palm reading"
+    )
 
 @api_router.get("/palm-reading/{session_id}", response_model=List[PalmReadingResponse])
-async def get_palm_readings(session_id: str, current_user: User = Depends(get_current_user)):
+async def get_palm_readings(
+    session_id: str,
+    response: Response,
+    before: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
     """Belirli bir session'a ait el falı okumalarını getir - Sadece kullanıcının kendi okumalarını"""
     try:
-        readings = await db.palm_readings.find(
-            {"session_id": session_id, "user_id": current_user.id}
-        ).sort("timestamp", -1).to_list(100)
+        readings = await fetch_reading_page(
+            "palm_readings", {"session_id": session_id, "user_id": current_user.id}, before, limit, response
+        )
         
         return [
             PalmReadingResponse(
@@ -1598,11 +2726,97 @@ async def get_palm_readings(session_id: str, current_user: User = Depends(get_cu
             ) for reading in readings
         ]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Get palm readings error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"El falı geçmişi getirme hatası: {str(e)}")
 
 # Astrology Reading Endpoints
+@api_router.get("/places/search", response_model=List[PlaceResponse])
+async def search_places(q: str = Query(..., min_length=2), limit: int = Query(10, ge=1, le=50)):
+    """Doğum yeri otomatik tamamlama - çevrimdışı gazetteer üzerinde önek araması"""
+    if gazetteer is None:
+        return []
+    return [PlaceResponse(**place._asdict()) for place in gazetteer.search(q, limit)]
+
+def prepare_birth_info(reading_data: AstrologyReadingCreate) -> dict:
+    """Burç, doğum haritası ve gezegen bilgilerini hesapla"""
+    # Doğum haritası hesapla
+    birth_chart = astrology_service.calculate_birth_chart(
+        reading_data.birth_date,
+        reading_data.birth_time,
+        reading_data.birth_place,
+        reading_data.latitude,
+        reading_data.longitude,
+        reading_data.utc_offset
+    )
+    
+    # Burç: Güneş'in hesaplanan konumu (burç geçiş günlerinde tarih tablosundan doğru)
+    zodiac_sign = birth_chart.get("planets", {}).get("sun", {}).get("sign") or \
+        astrology_service.calculate_zodiac_sign(reading_data.birth_date)
+    
+    # Gezegen bilgileri (doğum haritasından)
+    planets = birth_chart.get("planets", {
+        "sun": ZODIAC_SIGNS.get(zodiac_sign, {}).get("name", "Bilinmiyor"),
+        "moon": "Yaklaşık hesaplama gerekli",
+        "rising": "Doğum saati ile hesaplanır"
+    })
+    
+    # Birth info hazırla
+    birth_info = {
+        "birth_date": reading_data.birth_date,
+        "birth_time": reading_data.birth_time,
+        "birth_place": reading_data.birth_place,
+        "latitude": reading_data.latitude,
+        "longitude": reading_data.longitude,
+        "utc_offset": reading_data.utc_offset,
+        "zodiac_sign": zodiac_sign,
+        "birth_chart": birth_chart,
+        "planets": planets
+    }
+    
+    return birth_info
+
+async def save_astrology_reading(session_id: str, birth_info: dict, interpretation: str, user_id: str,
+                                reading_id: Optional[str] = None) -> AstrologyReadingResponse:
+    """Astroloji okumasını kaydet ve response oluştur"""
+    # Reading objesi oluştur
+    astrology_reading = AstrologyReading(
+        id=reading_id or str(uuid.uuid4()),
+        session_id=session_id,
+        birth_date=birth_info["birth_date"],
+        birth_time=birth_info["birth_time"],
+        birth_place=birth_info["birth_place"],
+        latitude=birth_info.get("latitude"),
+        longitude=birth_info.get("longitude"),
+        utc_offset=birth_info.get("utc_offset"),
+        zodiac_sign=birth_info["zodiac_sign"],
+        planets=birth_info["planets"],
+        birth_chart=birth_info["birth_chart"],
+        interpretation=interpretation
+    )
+    
+    # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
+    reading_dict = astrology_reading.dict()
+    reading_dict["user_id"] = user_id
+    await db.astrology_readings.insert_one(reading_dict)
+    await append_reading_feed(user_id, "astrology", astrology_reading.id, astrology_reading.session_id, astrology_reading.timestamp, astrology_reading.interpretation)
+    
+    # Response oluştur
+    return AstrologyReadingResponse(
+        id=astrology_reading.id,
+        session_id=astrology_reading.session_id,
+        birth_date=astrology_reading.birth_date,
+        birth_time=astrology_reading.birth_time,
+        birth_place=astrology_reading.birth_place,
+        zodiac_sign=astrology_reading.zodiac_sign,
+        planets=astrology_reading.planets,
+        birth_chart=astrology_reading.birth_chart,
+        interpretation=astrology_reading.interpretation,
+        timestamp=astrology_reading.timestamp
+    )
+
 @api_router.post("/astrology-reading", response_model=AstrologyReadingResponse)
 async def create_astrology_reading(reading_data: AstrologyReadingCreate, current_user: User = Depends(get_current_user)):
     """Yeni astroloji okuma oluştur - Sadece kayıtlı kullanıcılar"""
@@ -1610,77 +2824,52 @@ async def create_astrology_reading(reading_data: AstrologyReadingCreate, current
         # Session ID oluştur eğer yoksa (kullanıcı ID'si ile bağlantılı)
         session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
         
-        # Burç hesapla
-        zodiac_sign = astrology_service.calculate_zodiac_sign(reading_data.birth_date)
-        
-        # Doğum haritası hesapla
-        birth_chart = astrology_service.calculate_birth_chart(
-            reading_data.birth_date,
-            reading_data.birth_time,
-            reading_data.birth_place
-        )
-        
-        # Gezegen bilgileri (doğum haritasından)
-        planets = birth_chart.get("planets", {
-            "sun": ZODIAC_SIGNS.get(zodiac_sign, {}).get("name", "Bilinmiyor"),
-            "moon": "Yaklaşık hesaplama gerekli",
-            "rising": "Doğum saati ile hesaplanır"
-        })
-        
-        # Birth info hazırla
-        birth_info = {
-            "birth_date": reading_data.birth_date,
-            "birth_time": reading_data.birth_time,
-            "birth_place": reading_data.birth_place,
-            "zodiac_sign": zodiac_sign,
-            "birth_chart": birth_chart
-        }
+        # Burç ve doğum haritası hesapla
+        birth_info = prepare_birth_info(reading_data)
         
         # AI yorumlama
         interpretation = await astrology_service.generate_astrology_reading(birth_info, session_id)
         
-        # Reading objesi oluştur
-        astrology_reading = AstrologyReading(
-            session_id=session_id,
-            birth_date=reading_data.birth_date,
-            birth_time=reading_data.birth_time,
-            birth_place=reading_data.birth_place,
-            zodiac_sign=zodiac_sign,
-            planets=planets,
-            birth_chart=birth_chart,
-            interpretation=interpretation
-        )
-        
-        # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
-        reading_dict = astrology_reading.dict()
-        reading_dict["user_id"] = current_user.id
-        await db.astrology_readings.insert_one(reading_dict)
-        
-        # Response oluştur
-        return AstrologyReadingResponse(
-            id=astrology_reading.id,
-            session_id=astrology_reading.session_id,
-            birth_date=astrology_reading.birth_date,
-            birth_time=astrology_reading.birth_time,
-            birth_place=astrology_reading.birth_place,
-            zodiac_sign=astrology_reading.zodiac_sign,
-            planets=astrology_reading.planets,
-            birth_chart=astrology_reading.birth_chart,
-            interpretation=astrology_reading.interpretation,
-            timestamp=astrology_reading.timestamp
-        )
+        return await save_astrology_reading(session_id, birth_info, interpretation, current_user.id)
         
     except Exception as e:
         logging.error(f"Astrology reading creation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Astroloji okuma hatası: {str(e)}")
 
+@api_router.post("/astrology-reading/stream")
+async def create_astrology_reading_stream(reading_data: AstrologyReadingCreate, current_user: User = Depends(get_current_user)):
+    """Astroloji okumasını SSE ile akış halinde oluştur - Sadece kayıtlı kullanıcılar"""
+    session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
+    birth_info = prepare_birth_info(reading_data)
+    
+    async def finalize(interpretation: str) -> AstrologyReadingResponse:
+        return await save_astrology_reading(session_id, birth_info, interpretation, current_user.id)
+    
+    return stream_reading_response(
+        astrology_service.stream_astrology_reading(birth_info),
+        {
+            "session_id": session_id,
+            "zodiac_sign": birth_info["zodiac_sign"],
+            "planets": birth_info["planets"],
+            "birth_chart": birth_info["birth_chart"]
+        },
+        finalize,
+        "Astrology reading"
+    )
+
 @api_router.get("/astrology-reading/{session_id}", response_model=List[AstrologyReadingResponse])
-async def get_astrology_readings(session_id: str, current_user: User = Depends(get_current_user)):
+async def get_astrology_readings(
+    session_id: str,
+    response: Response,
+    before: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
     """Belirli bir session'a ait astroloji okumalarını getir - Sadece kullanıcının kendi okumalarını"""
     try:
-        readings = await db.astrology_readings.find(
-            {"session_id": session_id, "user_id": current_user.id}
-        ).sort("timestamp", -1).to_list(100)
+        readings = await fetch_reading_page(
+            "astrology_readings", {"session_id": session_id, "user_id": current_user.id}, before, limit, response
+        )
         
         return [
             AstrologyReadingResponse(
@@ -1697,6 +2886,8 @@ async def get_astrology_readings(session_id: str, current_user: User = Depends(g
             ) for reading in readings
         ]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Get astrology readings error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Astroloji geçmişi getirme hatası: {str(e)}")
@@ -1710,45 +2901,412 @@ async def get_zodiac_signs():
         logging.error(f"Get zodiac signs error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Burç bilgileri getirme hatası: {str(e)}")
 
+# Reading Job Queue
+# Okuma id'si iş id'sidir: lease süresi dolup iş yeniden denenirse (veya iki worker aynı anda işlerse)
+# ücretli AI çağrısı tekrarlanmaz, ikinci okuma kaydedilmez
+async def find_job_reading(collection: str, response_model, job: dict) -> Optional[dict]:
+    """İşin daha önce kaydettiği okumayı response olarak döndür, yoksa None"""
+    reading = await db[collection].find_one({"id": job["id"], "user_id": job["user_id"]}, {"_id": 0})
+    return jsonable_encoder(response_model(**reading)) if reading else None
+
+async def run_coffee_job(job: dict) -> dict:
+    existing = await find_job_reading("coffee_readings", CoffeeReadingResponse, job)
+    if existing:
+        return existing
+    payload = job["payload"]
+    image = BlobRef(hash=payload["image_hash"], size=payload["image_size"])
+    image_bytes = await blob_store.get(image.hash)
+    analysis = await coffee_service.analyze_coffee_grounds(image_bytes, payload["session_id"], job["user_id"])
+    try:
+        response = await save_coffee_reading(payload["session_id"], image, analysis, job["user_id"], reading_id=job["id"])
+    except DuplicateKeyError:
+        # Aynı işin eşzamanlı diğer denemesi önce kaydetti
+        return await find_job_reading("coffee_readings", CoffeeReadingResponse, job)
+    return jsonable_encoder(response)
+
+async def run_palm_job(job: dict) -> dict:
+    existing = await find_job_reading("palm_readings", PalmReadingResponse, job)
+    if existing:
+        return existing
+    payload = job["payload"]
+    image = BlobRef(hash=payload["image_hash"], size=payload["image_size"])
+    image_bytes = await blob_store.get(image.hash)
+    analysis = await palm_service.analyze_palm_lines(image_bytes, payload["hand_type"], payload["session_id"], job["user_id"])
+    try:
+        response = await save_palm_reading(
+            payload["session_id"], image, payload["hand_type"], analysis, job["user_id"], reading_id=job["id"]
+        )
+    except DuplicateKeyError:
+        return await find_job_reading("palm_readings", PalmReadingResponse, job)
+    return jsonable_encoder(response)
+
+async def run_astrology_job(job: dict) -> dict:
+    existing = await find_job_reading("astrology_readings", AstrologyReadingResponse, job)
+    if existing:
+        return existing
+    payload = job["payload"]
+    birth_info = prepare_birth_info(AstrologyReadingCreate(**payload))
+    interpretation = await astrology_service.generate_astrology_reading(birth_info, payload["session_id"])
+    try:
+        response = await save_astrology_reading(
+            payload["session_id"], birth_info, interpretation, job["user_id"], reading_id=job["id"]
+        )
+    except DuplicateKeyError:
+        return await find_job_reading("astrology_readings", AstrologyReadingResponse, job)
+    return jsonable_encoder(response)
+
+async def notify_job_webhook(job: dict):
+    """İş bittiğinde callback_url'e sonucu POST et"""
+    if not job.get("callback_url"):
+        return
+    body = jsonable_encoder({
+        key: job.get(key) for key in ("id", "type", "status", "attempts", "result", "error", "finished_at")
+    })
+    async with httpx.AsyncClient(timeout=10.0) as webhook_client:
+        response = await webhook_client.post(job["callback_url"], json=body)
+    if response.status_code >= 400:
+        logging.warning(f"Job webhook for {job['id']} returned {response.status_code}")
+
+reading_jobs = JobQueue(
+    db.reading_jobs,
+    concurrency=JOB_CONCURRENCY,
+    visibility_timeout=JOB_VISIBILITY_TIMEOUT_SECONDS,
+    max_attempts=JOB_MAX_ATTEMPTS,
+    retention_hours=JOB_RETENTION_HOURS,
+    on_complete=notify_job_webhook
+)
+reading_jobs.register("coffee", run_coffee_job)
+reading_jobs.register("palm", run_palm_job)
+reading_jobs.register("astrology", run_astrology_job)
+
+def validate_callback_url(callback_url: Optional[str]) -> Optional[str]:
+    """Webhook adresi sadece izinli hostlara ve https ile olabilir"""
+    if not callback_url:
+        return None
+    if not JOB_WEBHOOK_ALLOWED_HOSTS:
+        raise HTTPException(status_code=400, detail="Webhook bildirimleri etkin değil")
+    parsed = urlparse(callback_url)
+    if parsed.scheme != "https" or (parsed.hostname or "").lower() not in JOB_WEBHOOK_ALLOWED_HOSTS:
+        raise HTTPException(status_code=400, detail="Geçersiz callback_url")
+    return callback_url
+
+async def enqueue_reading_job(job_type: str, user_id: str, payload: dict, callback_url: Optional[str]) -> ReadingJobAccepted:
+    if not JOB_QUEUE_ENABLED:
+        raise HTTPException(status_code=503, detail="Arka plan okuma kuyruğu kapalı")
+    job = await reading_jobs.enqueue(job_type, user_id, payload, validate_callback_url(callback_url))
+    return ReadingJobAccepted(
+        job_id=job["id"],
+        status=job["status"],
+        status_url=f"/api/jobs/{job['id']}",
+        events_url=f"/api/jobs/{job['id']}/events"
+    )
+
+@api_router.post("/coffee-reading/jobs", response_model=ReadingJobAccepted, status_code=202)
+async def create_coffee_reading_job(reading_data: CoffeeReadingCreate, callback_url: Optional[str] = None,
+                                    current_user: User = Depends(get_current_user)):
+    """Kahve falını arka planda oluştur - sonuç /jobs/{id} ile sorgulanır"""
+    session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
+    # Resim kuyruğa girmeden blob store'a yazılır; işte sadece referansı taşınır
+    image = await store_image_base64(reading_data.image_base64)
+    return await enqueue_reading_job("coffee", current_user.id, {
+        "session_id": session_id, "image_hash": image.hash, "image_size": image.size
+    }, callback_url)
+
+@api_router.post("/palm-reading/jobs", response_model=ReadingJobAccepted, status_code=202)
+async def create_palm_reading_job(reading_data: PalmReadingCreate, callback_url: Optional[str] = None,
+                                  current_user: User = Depends(get_current_user)):
+    """El falını arka planda oluştur - sonuç /jobs/{id} ile sorgulanır"""
+    session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
+    image = await store_image_base64(reading_data.image_base64)
+    return await enqueue_reading_job("palm", current_user.id, {
+        "session_id": session_id, "image_hash": image.hash, "image_size": image.size,
+        "hand_type": reading_data.hand_type
+    }, callback_url)
+
+@api_router.post("/astrology-reading/jobs", response_model=ReadingJobAccepted, status_code=202)
+async def create_astrology_reading_job(reading_data: AstrologyReadingCreate, callback_url: Optional[str] = None,
+                                       current_user: User = Depends(get_current_user)):
+    """Astroloji okumasını arka planda oluştur - sonuç /jobs/{id} ile sorgulanır"""
+    payload = reading_data.dict()
+    payload["session_id"] = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
+    return await enqueue_reading_job("astrology", current_user.id, payload, callback_url)
+
+async def get_user_job(job_id: str, user_id: str) -> dict:
+    job = await reading_jobs.get(job_id)
+    if not job or job["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job
+
+@api_router.get("/jobs/{job_id}", response_model=ReadingJobResponse)
+async def get_reading_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Arka plan okuma işinin durumunu getir"""
+    return ReadingJobResponse(**await get_user_job(job_id, current_user.id))
+
+@api_router.get("/jobs/{job_id}/events")
+async def stream_reading_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """İş durumunu SSE ile izle - durum değiştikçe `status`, bitince `done` veya `error` olayı gönderilir"""
+    job = await get_user_job(job_id, current_user.id)
+    
+    async def event_stream():
+        current = job
+        last_status = None
+        deadline = time.monotonic() + JOB_VISIBILITY_TIMEOUT_SECONDS * (JOB_MAX_ATTEMPTS + 1)
+        while True:
+            if current["status"] != last_status:
+                last_status = current["status"]
+                yield sse_event({"status": last_status, "attempts": current["attempts"]}, "status")
+            if current["status"] in TERMINAL_STATUSES:
+                if current["status"] == "succeeded":
+                    yield sse_event(current["result"], "done")
+                else:
+                    yield sse_event({"detail": current.get("error")}, "error")
+                return
+            if time.monotonic() > deadline:
+                yield sse_event({"detail": "İş zaman aşımına uğradı"}, "error")
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+            current = await reading_jobs.get(job_id) or current
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 # Daily Horoscope Endpoints
+# Aynı (burç, tarih, dil) için eşzamanlı cache-miss'ler tek üretimi bekler
+horoscope_flight = DistributedSingleFlight(
+    MongoLease(db.generation_leases, ttl_seconds=HOROSCOPE_LEASE_SECONDS) if HOROSCOPE_DISTRIBUTED_SINGLE_FLIGHT else None,
+    wait_timeout=HOROSCOPE_WAIT_TIMEOUT_SECONDS
+)
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+class HoroscopeCache:
+    """Günün burç yorumları için bellek içi önbellek - response'lar hazır JSON baytları olarak tutulur.
+
+    (tarih, dil) içeriği üretildikten sonra değişmez; geçmiş günler gün dönümünde atılır.
+    """
+    def __init__(self, max_age_seconds: int = HOROSCOPE_CACHE_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._signs: Dict[tuple, Dict[str, CachedBody]] = {}
+        self._lists: Dict[tuple, CachedBody] = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+    
+    @staticmethod
+    def _encode(payload) -> CachedBody:
+        body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return CachedBody(body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"')
+    
+    @staticmethod
+    def _to_response(horoscope: dict) -> dict:
+        return DailyHoroscopeResponse(
+            id=horoscope["id"],
+            zodiac_sign=horoscope["zodiac_sign"],
+            date=horoscope["date"],
+            content=horoscope["content"],
+            language=horoscope["language"],
+            timestamp=horoscope["timestamp"]
+        ).dict()
+    
+    def _evict_stale(self):
+        # Gün dönümü: bugünden eski tarihleri at (yarının önceden üretilmiş içeriği kalır)
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        for store in (self._signs, self._lists):
+            for key in [key for key in store if key[0] < today]:
+                del store[key]
+    
+    @staticmethod
+    def _is_published(target_date: str) -> bool:
+        # Önceden üretilmiş günler gün dönümüne kadar servis edilmez
+        return target_date <= datetime.utcnow().strftime("%Y-%m-%d")
+    
+    def get_list(self, target_date: str, language: str) -> Optional[CachedBody]:
+        self._evict_stale()
+        if not self._is_published(target_date):
+            return None
+        cached = self._lists.get((target_date, language))
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+    
+    def get_sign(self, target_date: str, language: str, zodiac_sign: str) -> Optional[CachedBody]:
+        self._evict_stale()
+        if not self._is_published(target_date):
+            return None
+        cached = self._signs.get((target_date, language), {}).get(zodiac_sign)
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+    
+    def put(self, target_date: str, language: str, horoscopes: List[dict]) -> Optional[CachedBody]:
+        """Yorumları önbelleğe al - 12 burcun tamamı varsa liste response'unu da hazırlayıp döndür"""
+        if target_date < datetime.utcnow().strftime("%Y-%m-%d"):
+            return None
+        signs = self._signs.setdefault((target_date, language), {})
+        by_sign = {}
+        for horoscope in horoscopes:
+            response = self._to_response(horoscope)
+            by_sign[response["zodiac_sign"]] = response
+            signs[response["zodiac_sign"]] = self._encode(response)
+        if len(by_sign) < len(ZODIAC_SIGNS):
+            return None
+        cached = self._encode([by_sign[sign] for sign in ZODIAC_SIGNS.keys() if sign in by_sign])
+        self._lists[(target_date, language)] = cached
+        return cached
+    
+    def put_sign(self, target_date: str, language: str, horoscope: dict) -> Optional[CachedBody]:
+        """Tek burcu önbelleğe al ve hazır baytlarını döndür"""
+        self.put(target_date, language, [horoscope])
+        return self._signs.get((target_date, language), {}).get(horoscope["zodiac_sign"])
+    
+    def invalidate(self, target_date: str, language: str):
+        self._signs.pop((target_date, language), None)
+        self._lists.pop((target_date, language), None)
+    
+    async def warm(self, target_date: str, languages: List[str]):
+        """Scheduler sonrası günün (veya önceden üretilen ertesi günün) yorumlarını Mongo'dan yükle"""
+        for language in languages:
+            horoscopes = await db.daily_horoscopes.find(
+                {"date": target_date, "language": language}, {"_id": 0}
+            ).to_list(len(ZODIAC_SIGNS))
+            self.put(target_date, language, horoscopes)
+        logging.info(f"Horoscope cache warmed for {target_date}: {languages}")
+    
+    def response(self, request: Request, cached: CachedBody) -> Response:
+        """ETag eşleşirse 304, değilse hazır baytları döndür"""
+        # Gün bitince içerik değişir, max-age gün sonunu geçmesin
+        now = datetime.utcnow()
+        seconds_left = int((datetime(now.year, now.month, now.day) + timedelta(days=1) - now).total_seconds())
+        headers = {
+            "ETag": cached.etag,
+            "Cache-Control": f"public, max-age={max(0, min(self.max_age_seconds, seconds_left))}"
+        }
+        if request.headers.get("if-none-match") == cached.etag:
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+    
+    def stats(self) -> dict:
+        return {
+            "dates": sorted({key[0] for key in self._signs}),
+            "lists": len(self._lists),
+            "signs": sum(len(signs) for signs in self._signs.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified
+        }
+
+horoscope_cache = HoroscopeCache()
+
+async def save_daily_horoscopes(horoscopes: List[DailyHoroscope]) -> dict:
+    """Yorumları tek bulk_write ile kaydet - (burç, tarih, dil) için var olan doküman değiştirilmez"""
+    if not horoscopes:
+        return {"inserted": 0, "matched": 0}
+    
+    operations = [
+        UpdateOne(
+            {"zodiac_sign": horoscope.zodiac_sign, "date": horoscope.date, "language": horoscope.language},
+            {"$setOnInsert": horoscope.dict()},
+            upsert=True
+        )
+        for horoscope in horoscopes
+    ]
+    # ordered=False: biri çakışsa da diğerleri yazılır
+    result = await db.daily_horoscopes.bulk_write(operations, ordered=False)
+    return {"inserted": result.upserted_count, "matched": result.matched_count}
+
+async def find_daily_horoscopes(target_date: str, language: str) -> List[dict]:
+    return await db.daily_horoscopes.find({
+        "date": target_date,
+        "language": language
+    }).to_list(len(ZODIAC_SIGNS))
+
+async def find_daily_horoscope(zodiac_sign: str, target_date: str, language: str) -> Optional[dict]:
+    return await db.daily_horoscopes.find_one({
+        "zodiac_sign": zodiac_sign,
+        "date": target_date,
+        "language": language
+    })
+
+async def get_or_create_daily_horoscope(zodiac_sign: str, target_date: str, language: str) -> dict:
+    """Yorumu veritabanından al, yoksa tek bir üretim çalıştırıp kaydet"""
+    async def produce() -> dict:
+        content = await astrology_service.generate_daily_horoscope(
+            zodiac_sign, target_date, language, runner=horoscope_interactive_runner
+        )
+        # Scheduler önce kaydettiyse upsert onunkini korur
+        await save_daily_horoscopes([DailyHoroscope(
+            zodiac_sign=zodiac_sign,
+            date=target_date,
+            content=content,
+            language=language
+        )])
+        return await find_daily_horoscope(zodiac_sign, target_date, language)
+    
+    key = f"daily_horoscope:{zodiac_sign}:{target_date}:{language}"
+    try:
+        return await horoscope_flight.do(
+            key,
+            lambda: find_daily_horoscope(zodiac_sign, target_date, language),
+            produce
+        )
+    except SingleFlightTimeout:
+        raise HTTPException(status_code=503, detail="Burç yorumu hazırlanıyor, lütfen biraz sonra tekrar deneyin")
+
+async def get_or_create_daily_horoscopes(target_date: str, language: str) -> List[dict]:
+    """Günün tüm burçlarını al; eksikler tek (toplu) üretim ve tek bulk_write ile tamamlanır"""
+    async def lookup() -> Optional[List[dict]]:
+        horoscopes = await find_daily_horoscopes(target_date, language)
+        return horoscopes if len(horoscopes) >= len(ZODIAC_SIGNS) else None
+    
+    async def produce() -> List[dict]:
+        horoscopes = await find_daily_horoscopes(target_date, language)
+        existing_signs = {h["zodiac_sign"] for h in horoscopes}
+        missing_signs = [sign for sign in ZODIAC_SIGNS.keys() if sign not in existing_signs]
+        if not missing_signs:
+            return horoscopes
+        
+        contents = await astrology_service.generate_daily_horoscopes(
+            target_date, language, missing_signs, runner=horoscope_interactive_runner
+        )
+        await save_daily_horoscopes([
+            DailyHoroscope(zodiac_sign=zodiac_sign, date=target_date, content=content, language=language)
+            for zodiac_sign, content in contents.items() if content is not None
+        ])
+        return await find_daily_horoscopes(target_date, language)
+    
+    try:
+        return await horoscope_flight.do(f"daily_horoscopes:{target_date}:{language}", lookup, produce)
+    except SingleFlightTimeout:
+        raise HTTPException(status_code=503, detail="Günlük yorumlar hazırlanıyor, lütfen biraz sonra tekrar deneyin")
+
 @api_router.get("/daily-horoscope/today", response_model=List[DailyHoroscopeResponse])
-async def get_today_horoscopes(language: str = "tr"):
+async def get_today_horoscopes(request: Request, language: str = "tr"):
     """Bugünün tüm burç yorumlarını getir"""
     try:
         today = datetime.utcnow().strftime("%Y-%m-%d")
         
+        # Sıcak yol: Mongo ve Pydantic'e dokunmadan hazır JSON
+        cached = horoscope_cache.get_list(today, language)
+        if cached:
+            return horoscope_cache.response(request, cached)
+        
         # Bugünün yorumlarını veritabanından al
-        horoscopes = await db.daily_horoscopes.find({
-            "date": today,
-            "language": language
-        }).to_list(12)
+        horoscopes = await find_daily_horoscopes(today, language)
         
-        # Eğer bugünün yorumları yoksa oluştur
-        if len(horoscopes) < 12:
-            # Eksik olan burçların yorumlarını oluştur
-            existing_signs = [h["zodiac_sign"] for h in horoscopes]
-            missing_signs = [sign for sign in ZODIAC_SIGNS.keys() if sign not in existing_signs]
-            
-            if missing_signs:
-                for zodiac_sign in missing_signs:
-                    try:
-                        content = await astrology_service.generate_daily_horoscope(zodiac_sign, today, language)
-                        
-                        # Veritabanına kaydet
-                        horoscope = DailyHoroscope(
-                            zodiac_sign=zodiac_sign,
-                            date=today,
-                            content=content,
-                            language=language
-                        )
-                        await db.daily_horoscopes.insert_one(horoscope.dict())
-                        horoscopes.append(horoscope.dict())
-                        
-                        # Rate limiting
-                        await asyncio.sleep(0.5)
-                        
-                    except Exception as e:
-                        logging.error(f"Error generating horoscope for {zodiac_sign}: {str(e)}")
+        # Eğer bugünün yorumları eksikse oluştur (eşzamanlı istekler tek üretimi paylaşır)
+        if len(horoscopes) < len(ZODIAC_SIGNS):
+            horoscopes = await get_or_create_daily_horoscopes(today, language)
+        
+        # Tamamlanan gün önbelleğe alınır, sonraki istekler hazır baytları kullanır
+        cached = horoscope_cache.put(today, language, horoscopes)
+        if cached:
+            return horoscope_cache.response(request, cached)
         
         # Response oluştur
         return [
@@ -1762,12 +3320,14 @@ async def get_today_horoscopes(language: str = "tr"):
             ) for h in horoscopes
         ]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Get today horoscopes error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Günlük yorumları getirme hatası: {str(e)}")
 
 @api_router.get("/daily-horoscope/{zodiac_sign}", response_model=DailyHoroscopeResponse)
-async def get_horoscope_by_sign(zodiac_sign: str, date: Optional[str] = None, language: str = "tr"):
+async def get_horoscope_by_sign(request: Request, zodiac_sign: str, date: Optional[str] = None, language: str = "tr"):
     """Belirli bir burç için günlük yorum getir"""
     try:
         # Burç kontrolü
@@ -1775,28 +3335,29 @@ async def get_horoscope_by_sign(zodiac_sign: str, date: Optional[str] = None, la
             raise HTTPException(status_code=404, detail="Geçersiz burç")
         
         # Tarih kontrolü (varsayılan bugün)
-        target_date = date or datetime.utcnow().strftime("%Y-%m-%d")
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        target_date = date or today
+        
+        # Önceden üretilen gelecek günlerin yorumları gün dönümünde yayınlanır
+        if target_date > today:
+            raise HTTPException(status_code=404, detail="Bu tarihin burç yorumu henüz yayınlanmadı")
+        
+        # Önbellekte varsa hazır JSON
+        cached = horoscope_cache.get_sign(target_date, language, zodiac_sign)
+        if cached:
+            return horoscope_cache.response(request, cached)
         
         # Veritabanından al
-        horoscope = await db.daily_horoscopes.find_one({
-            "zodiac_sign": zodiac_sign,
-            "date": target_date,
-            "language": language
-        })
+        horoscope = await find_daily_horoscope(zodiac_sign, target_date, language)
         
-        # Yoksa oluştur
+        # Yoksa oluştur (eşzamanlı istekler tek üretimi bekler)
         if not horoscope:
-            content = await astrology_service.generate_daily_horoscope(zodiac_sign, target_date, language)
-            
-            horoscope_obj = DailyHoroscope(
-                zodiac_sign=zodiac_sign,
-                date=target_date,
-                content=content,
-                language=language
-            )
-            
-            await db.daily_horoscopes.insert_one(horoscope_obj.dict())
-            horoscope = horoscope_obj.dict()
+            horoscope = await get_or_create_daily_horoscope(zodiac_sign, target_date, language)
+        
+        # Geçmiş tarihler önbelleğe alınmaz (put kendisi eler)
+        cached = horoscope_cache.put_sign(target_date, language, horoscope)
+        if cached:
+            return horoscope_cache.response(request, cached)
         
         return DailyHoroscopeResponse(
             id=horoscope["id"],
@@ -1822,9 +3383,12 @@ async def get_horoscope_history(zodiac_sign: str, language: str = "tr", limit: i
             raise HTTPException(status_code=404, detail="Geçersiz burç")
         
         # Geçmiş yorumları al (en yeni önce)
+        # Önceden üretilmiş yarının yorumu gün dönümüne kadar görünmez
+        today = datetime.utcnow().strftime("%Y-%m-%d")
         horoscopes = await db.daily_horoscopes.find({
             "zodiac_sign": zodiac_sign,
-            "language": language
+            "language": language,
+            "date": {"$lte": today}
         }).sort("timestamp", -1).limit(limit).to_list(limit)
         
         return [
@@ -1862,30 +3426,22 @@ async def generate_daily_horoscopes_admin(date: Optional[str] = None, language:
         # Tüm yorumları oluştur
         horoscopes = await astrology_service.generate_all_daily_horoscopes(target_date, language)
         
-        # Veritabanına kaydet
-        saved_count = 0
-        for horoscope_data in horoscopes:
-            # Mevcut olup olmadığını kontrol et
-            existing = await db.daily_horoscopes.find_one({
-                "zodiac_sign": horoscope_data["zodiac_sign"],
-                "date": horoscope_data["date"],
-                "language": horoscope_data["language"]
-            })
-            
-            if not existing:
-                horoscope = DailyHoroscope(
-                    zodiac_sign=horoscope_data["zodiac_sign"],
-                    date=horoscope_data["date"],
-                    content=horoscope_data["content"],
-                    language=horoscope_data["language"]
-                )
-                
-                await db.daily_horoscopes.insert_one(horoscope.dict())
-                saved_count += 1
+        # Veritabanına tek seferde kaydet (mevcut olanlar korunur)
+        # Gelecek tarihler ayrı bir bayrakla değil, tarihe göre gün dönümüne kadar gizlenir
+        result = await save_daily_horoscopes([
+            DailyHoroscope(
+                zodiac_sign=horoscope_data["zodiac_sign"],
+                date=horoscope_data["date"],
+                content=horoscope_data["content"],
+                language=horoscope_data["language"]
+            ) for horoscope_data in horoscopes
+        ])
+        saved_count = result["inserted"]
         
         return {
             "message": f"{target_date} için {saved_count} adet {language} dilinde yorum oluşturuldu",
             "generated": saved_count,
+            "existing": result["matched"],
             "date": target_date,
             "language": language
         }
@@ -1894,7 +3450,46 @@ async def generate_daily_horoscopes_admin(date: Optional[str] = None, language:
         logging.error(f"Generate daily horoscopes error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Günlük yorumları oluşturma hatası: {str(e)}")
 
+@api_router.get("/admin/indexes", dependencies=[Depends(require_admin)])
+async def get_index_report():
+    """Admin: Eksik, tanımsız ve kullanılmayan MongoDB indexlerini raporla"""
+    try:
+        return await index_report(db, MONGO_INDEXES)
+    except Exception as e:
+        logging.error(f"Index report error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Index raporu oluşturma hatası: {str(e)}")
+
 # Falname Reading Endpoints
+async def save_falname_reading(session_id: str, intention: str, analysis: dict, user_id: str) -> FalnameReadingResponse:
+    """Falname okumasını kaydet ve response oluştur"""
+    # Reading objesi oluştur
+    falname_reading = FalnameReading(
+        session_id=session_id,
+        intention=intention,
+        verse_or_poem=analysis["verse_or_poem"],
+        interpretation=analysis["interpretation"],
+        advice=analysis["advice"],
+        full_response=analysis["full_response"]
+    )
+    
+    # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
+    reading_dict = falname_reading.dict()
+    reading_dict["user_id"] = user_id
+    await db.falname_readings.insert_one(reading_dict)
+    await append_reading_feed(user_id, "falname", falname_reading.id, falname_reading.session_id, falname_reading.timestamp, falname_reading.interpretation)
+    
+    # Response oluştur
+    return FalnameReadingResponse(
+        id=falname_reading.id,
+        session_id=falname_reading.session_id,
+        intention=falname_reading.intention,
+        verse_or_poem=falname_reading.verse_or_poem,
+        interpretation=falname_reading.interpretation,
+        advice=falname_reading.advice,
+        full_response=falname_reading.full_response,
+        timestamp=falname_reading.timestamp
+    )
+
 @api_router.post("/falname-reading", response_model=FalnameReadingResponse)
 async def create_falname_reading(reading_data: FalnameReadingCreate, current_user: User = Depends(get_current_user)):
     """Yeni Falname okuma oluştur - Sadece kayıtlı kullanıcılar"""
@@ -1908,44 +3503,41 @@ async def create_falname_reading(reading_data: FalnameReadingCreate, current_use
             session_id
         )
         
-        # Reading objesi oluştur
-        falname_reading = FalnameReading(
-            session_id=session_id,
-            intention=reading_data.intention,
-            verse_or_poem=analysis["verse_or_poem"],
-            interpretation=analysis["interpretation"],
-            advice=analysis["advice"],
-            full_response=analysis["full_response"]
-        )
-        
-        # MongoDB'ye kaydet (kullanıcı ID'si de eklenir)
-        reading_dict = falname_reading.dict()
-        reading_dict["user_id"] = current_user.id
-        await db.falname_readings.insert_one(reading_dict)
-        
-        # Response oluştur
-        return FalnameReadingResponse(
-            id=falname_reading.id,
-            session_id=falname_reading.session_id,
-            intention=falname_reading.intention,
-            verse_or_poem=falname_reading.verse_or_poem,
-            interpretation=falname_reading.interpretation,
-            advice=falname_reading.advice,
-            full_response=falname_reading.full_response,
-            timestamp=falname_reading.timestamp
-        )
+        return await save_falname_reading(session_id, reading_data.intention, analysis, current_user.id)
         
     except Exception as e:
         logging.error(f"Falname reading creation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Falname okuma hatası: {str(e)}")
 
+@api_router.post("/falname-reading/stream")
+async def create_falname_reading_stream(reading_data: FalnameReadingCreate, current_user: User = Depends(get_current_user)):
+    """Falname okumasını SSE ile akış halinde oluştur - Sadece kayıtlı kullanıcılar"""
+    session_id = reading_data.session_id or f"{current_user.id}_{uuid.uuid4()}"
+    
+    async def finalize(response: str) -> FalnameReadingResponse:
+        analysis = falname_service.build_analysis(response)
+        return await save_falname_reading(session_id, reading_data.intention, analysis, current_user.id)
+    
+    return stream_reading_response(
+        falname_service.stream_falname_reading(reading_data.intention),
+        {"session_id": session_id, "intention": reading_data.intention},
+        finalize,
+        "Falname reading"
+    )
+
 @api_router.get("/falname-reading/{session_id}", response_model=List[FalnameReadingResponse])
-async def get_falname_readings(session_id: str, current_user: User = Depends(get_current_user)):
+async def get_falname_readings(
+    session_id: str,
+    response: Response,
+    before: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
     """Belirli bir session'a ait Falname okumalarını getir - Sadece kullanıcının kendi okumalarını"""
     try:
-        readings = await db.falname_readings.find(
-            {"session_id": session_id, "user_id": current_user.id}
-        ).sort("timestamp", -1).to_list(100)
+        readings = await fetch_reading_page(
+            "falname_readings", {"session_id": session_id, "user_id": current_user.id}, before, limit, response
+        )
         
         return [
             FalnameReadingResponse(
@@ -1960,6 +3552,8 @@ async def get_falname_readings(session_id: str, current_user: User = Depends(get
             ) for reading in readings
         ]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Get falname readings error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Falname geçmişi getirme hatası: {str(e)}")
@@ -1997,6 +3591,7 @@ async def get_falname_reading(session_id: str, reading_id: str, current_user: Us
 # Health check endpoint
 @api_router.get("/health")
 async def health_check():
+    """Liveness - bileşen istatistikleri /api/admin/stats altındadır"""
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow(),
@@ -2014,100 +3609,128 @@ async def health_check():
         }
     }
 
+@api_router.get("/admin/stats", dependencies=[Depends(require_admin)])
+async def get_service_stats():
+    """Admin: Havuz, kuyruk, önbellek ve veri indekslerinin çalışma istatistikleri"""
+    return {
+        "timestamp": datetime.utcnow(),
+        "services": {
+            "password_hasher": auth_service.password_hasher.stats(),
+            "user_cache": user_cache.stats(),
+            "llm_gateway": llm_gateway.stats(),
+            "tarot_cache": tarot_service.cache.stats(),
+            "image_pipeline": image_pipeline.stats(),
+            "image_dedup": image_dedup.stats(),
+            "horoscope_runner": horoscope_runner.stats(),
+            "horoscope_interactive_runner": horoscope_interactive_runner.stats(),
+            "horoscope_single_flight": horoscope_flight.stats(),
+            "horoscope_cache": horoscope_cache.stats(),
+            "scheduler": job_scheduler.stats(),
+            "reading_jobs": reading_jobs.stats(),
+            "email_outbox": email_outbox.stats(),
+            "email_templates": email_templates.stats(),
+            "gazetteer": gazetteer.stats() if gazetteer is not None else None,
+            "ephemeris_table": ephemeris_table.stats() if ephemeris_table is not None else None,
+        }
+    }
+
 # Daily Horoscope Scheduler Functions
 class DailyHoroscopeScheduler:
     def __init__(self):
         self.astrology_service = AstrologyAnalysisService()
     
-    async def generate_daily_horoscopes_task(self, languages: List[str] = ["tr", "en", "de", "fr", "es"]):
-        """Günlük burç yorumlarını oluşturan scheduled task"""
+    async def generate_language(self, target_date: str, language: str) -> dict:
+        """Tek dil için eksik burç yorumlarını oluştur ve kaydet"""
+        started_at = time.perf_counter()
+        
+        # Eksik yorumları bul
+        existing_horoscopes = await db.daily_horoscopes.find(
+            {"date": target_date, "language": language},
+            {"_id": 0, "zodiac_sign": 1}
+        ).to_list(12)
+        
+        existing_signs = [h["zodiac_sign"] for h in existing_horoscopes]
+        missing_signs = [sign for sign in ZODIAC_SIGNS.keys() if sign not in existing_signs]
+        
+        if not missing_signs:
+            logging.info(f"Daily horoscopes for {target_date} in {language} already exist")
+            return {"language": language, "generated": 0, "failed": 0, "seconds": 0.0}
+        
+        contents = await self.astrology_service.generate_daily_horoscopes(target_date, language, missing_signs)
+        
+        # Bu arada bir isteğin oluşturduğu yorumlar upsert ile korunur
+        result = await save_daily_horoscopes([
+            DailyHoroscope(zodiac_sign=zodiac_sign, date=target_date, content=content, language=language)
+            for zodiac_sign, content in contents.items() if content is not None
+        ])
+        generated_count = result["inserted"]
+        
+        elapsed = time.perf_counter() - started_at
+        logging.info(
+            f"Generated {generated_count} horoscopes for {target_date} in {language} in {elapsed:.1f}s "
+            f"({result['matched']} already existed)"
+        )
+        return {
+            "language": language,
+            "generated": generated_count,
+            "failed": len(missing_signs) - sum(1 for content in contents.values() if content is not None),
+            "seconds": round(elapsed, 2)
+        }
+    
+    async def generate_for_date(self, target_date: str, languages: List[str]):
+        """Verilen tarih için tüm dillerde eksik yorumları oluştur ve önbelleği ısıt"""
+        started_at = time.perf_counter()
+        logging.info(f"Starting daily horoscope generation for {target_date}")
+        
+        # Diller eşzamanlı işlenir; toplam hız horoscope_runner ile sınırlı
+        results = await asyncio.gather(*[
+            self.generate_language(target_date, language) for language in languages
+        ], return_exceptions=True)
+        
+        for language, result in zip(languages, results):
+            if isinstance(result, Exception):
+                logging.error(f"Error generating horoscopes for language {language}: {str(result)}")
+        
+        logging.info(
+            f"Daily horoscope generation completed for {target_date} in {time.perf_counter() - started_at:.1f}s: "
+            f"{[r for r in results if not isinstance(r, Exception)]}"
+        )
+        
+        # Yorumları sıcak önbelleğe yükle (yarının içeriği gün dönümünde hazır olur)
+        await horoscope_cache.warm(target_date, languages)
+    
+    async def generate_daily_horoscopes_task(self, languages: List[str] = HOROSCOPE_LANGUAGES):
+        """Günlük burç yorumlarını oluşturan scheduled task - önceden üretim kaçırıldıysa eksikleri tamamlar"""
         try:
             today = datetime.utcnow().strftime("%Y-%m-%d")
-            logging.info(f"Starting daily horoscope generation for {today}")
-            
-            for language in languages:
-                try:
-                    # Mevcut yorumları kontrol et
-                    existing_count = await db.daily_horoscopes.count_documents({
-                        "date": today,
-                        "language": language
-                    })
-                    
-                    if existing_count >= 12:
-                        logging.info(f"Daily horoscopes for {today} in {language} already exist")
-                        continue
-                    
-                    # Eksik yorumları oluştur
-                    existing_horoscopes = await db.daily_horoscopes.find({
-                        "date": today,
-                        "language": language
-                    }).to_list(12)
-                    
-                    existing_signs = [h["zodiac_sign"] for h in existing_horoscopes]
-                    missing_signs = [sign for sign in ZODIAC_SIGNS.keys() if sign not in existing_signs]
-                    
-                    generated_count = 0
-                    for zodiac_sign in missing_signs:
-                        try:
-                            content = await self.astrology_service.generate_daily_horoscope(
-                                zodiac_sign, today, language
-                            )
-                            
-                            horoscope = DailyHoroscope(
-                                zodiac_sign=zodiac_sign,
-                                date=today,
-                                content=content,
-                                language=language
-                            )
-                            
-                            await db.daily_horoscopes.insert_one(horoscope.dict())
-                            generated_count += 1
-                            
-                            # Rate limiting
-                            await asyncio.sleep(1)
-                            
-                        except Exception as e:
-                            logging.error(f"Error generating horoscope for {zodiac_sign} in {language}: {str(e)}")
-                    
-                    logging.info(f"Generated {generated_count} horoscopes for {today} in {language}")
-                    
-                except Exception as e:
-                    logging.error(f"Error generating horoscopes for language {language}: {str(e)}")
-            
-            logging.info(f"Daily horoscope generation completed for {today}")
-            
+            await self.generate_for_date(today, languages)
         except Exception as e:
             logging.error(f"Daily horoscope generation error: {str(e)}")
     
-    def run_scheduled_task(self):
-        """Scheduled task'ı çalıştır (sync wrapper)"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    async def generate_tomorrow_task(self, languages: List[str] = HOROSCOPE_LANGUAGES):
+        """Ertesi günün yorumlarını önceden üret - gece yarısı istekleri üretim beklemesin"""
         try:
-            loop.run_until_complete(self.generate_daily_horoscopes_task())
-        finally:
-            loop.close()
+            tomorrow = (datetime.utcnow() + timedelta(days=1)).strftime("%Y-%m-%d")
+            await self.generate_for_date(tomorrow, languages)
+        except Exception as e:
+            logging.error(f"Lookahead horoscope generation error: {str(e)}")
     
     def start_scheduler(self):
-        """Scheduler'ı başlat"""
-        # Her gün saat 06:00'da çalış
-        schedule.every().day.at("06:00").do(self.run_scheduled_task)
-        
-        # İlk çalıştırmayı hemen yap (test için)
-        # self.run_scheduled_task()
-        
-        def run_pending():
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Her dakika kontrol et
+        """Scheduler'ı başlat (uygulamanın event loop'unda)"""
+        job_scheduler.add_job("daily_horoscopes", HOROSCOPE_CRON, self.generate_daily_horoscopes_task)
+        if HOROSCOPE_LOOKAHEAD_CRON:
+            job_scheduler.add_job("daily_horoscopes_lookahead", HOROSCOPE_LOOKAHEAD_CRON, self.generate_tomorrow_task)
+        job_scheduler.start()
         
-        # Background thread'de çalıştır
-        scheduler_thread = threading.Thread(target=run_pending, daemon=True)
-        scheduler_thread.start()
-        
-        logging.info("Daily horoscope scheduler started - runs every day at 06:00")
+        logging.info(f"Daily horoscope scheduler started - cron '{HOROSCOPE_CRON}' (UTC)")
 
 # Scheduler instance oluştur
+# Birden fazla worker'da işler sadece lease'i tutan liderde ve her zamanlama için bir kez çalışır
+job_scheduler = JobScheduler(
+    db.scheduler_jobs,
+    MongoLease(db.scheduler_leases, ttl_seconds=SCHEDULER_LEASE_SECONDS),
+    tick_seconds=SCHEDULER_TICK_SECONDS
+)
 horoscope_scheduler = DailyHoroscopeScheduler()
 
 # Include the router in the main app
@@ -2119,6 +3742,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Configure logging
@@ -2131,9 +3755,33 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     """Uygulama başladığında çalışacak fonksiyonlar"""
+    # Sorguların ihtiyaç duyduğu indexleri oluştur (idempotent)
+    try:
+        await ensure_indexes(db, MONGO_INDEXES)
+    except Exception as e:
+        logging.error(f"Index creation error: {str(e)}")
+    
+    # Email outbox worker'larını başlat
+    email_outbox.start()
+    
+    # Arka plan okuma worker'larını başlat
+    if JOB_QUEUE_ENABLED:
+        reading_jobs.start()
+    
     # Scheduler'ı başlat
-    horoscope_scheduler.start_scheduler()
+    if SCHEDULER_ENABLED:
+        horoscope_scheduler.start_scheduler()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Akışı yarıda kalmış okumalar kaydedilsin diye önce üretim görevlerini bekle
+    if _stream_producers:
+        await asyncio.wait(list(_stream_producers), timeout=30)
+    await job_scheduler.stop()
+    await reading_jobs.stop()
+    await email_outbox.stop()
+    await email_transport.aclose()
     client.close()
+    auth_service.password_hasher.shutdown()
+    await llm_gateway.aclose()
+    image_pipeline.shutdown()
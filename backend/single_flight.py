@@ -0,0 +1,140 @@
+"""Aynı anahtar için eşzamanlı pahalı işlemleri tek çağrıda birleştirme (single-flight)"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+
+class SingleFlight:
+    """Süreç içi birleştirme: aynı anahtar için ilk çağıran işi yapar, diğerleri sonucunu bekler"""
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.followers += 1
+            # shield: bekleyen bir istek iptal edilirse ortak iş iptal olmasın
+            return await asyncio.shield(future)
+
+        self.leaders += 1
+        future = asyncio.ensure_future(func())
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+
+class MongoLease:
+    """Süreçler arası kısa süreli kilit: {_id: anahtar, owner, expires_at} dokümanı"""
+    def __init__(self, collection, ttl_seconds: float = 60):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self.owner = str(uuid.uuid4())
+
+    async def acquire(self, key: str) -> bool:
+        now = datetime.utcnow()
+        try:
+            # Doküman yoksa, süresi dolmuşsa ya da zaten bizimse (yenileme) bizim olur;
+            # başkasınınsa upsert DuplicateKeyError verir
+            await self.collection.update_one(
+                {"_id": key, "$or": [{"expires_at": {"$lt": now}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=self.ttl_seconds)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def release(self, key: str):
+        await self.collection.delete_one({"_id": key, "owner": self.owner})
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Başka worker'ın üretimi beklenirken süre doldu"""
+
+
+class DistributedSingleFlight:
+    """Önce süreç içinde, sonra Mongo lease ile worker'lar arasında birleştirir.
+
+    Lease'i alan worker üretir ve kaydeder; diğerleri `lookup` sonuç döndürene kadar bekler.
+    Üretim sürerken lease düzenli yenilenir; lease sahibi ölürse süresi dolar ve bekleyenlerden biri işi devralır.
+    """
+    def __init__(self, lease: Optional[MongoLease], poll_interval: float = 0.5, wait_timeout: float = 90):
+        self.local = SingleFlight()
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self.lease_waits = 0
+
+    async def do(self, key: str, lookup: Callable[[], Awaitable[Any]], produce: Callable[[], Awaitable[Any]]) -> Any:
+        """`lookup` kayıtlı sonucu (yoksa None) döndürür, `produce` üretip kaydeder"""
+        return await self.local.do(key, lambda: self._do(key, lookup, produce))
+
+    async def _do(self, key: str, lookup, produce) -> Any:
+        if self.lease is None:
+            return await produce()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        waited = False
+        while True:
+            try:
+                acquired = await self.lease.acquire(key)
+            except Exception as e:
+                # Lease koleksiyonu erişilemezse birleştirmeden devam et
+                logging.error(f"Lease acquire error for {key}: {str(e)}")
+                return await produce()
+
+            if acquired:
+                heartbeat = asyncio.create_task(self._heartbeat(key))
+                try:
+                    # Başka worker az önce bitirmiş olabilir
+                    result = await lookup()
+                    return result if result is not None else await produce()
+                finally:
+                    heartbeat.cancel()
+                    await asyncio.wait([heartbeat])
+                    try:
+                        await self.lease.release(key)
+                    except Exception as e:
+                        logging.error(f"Lease release error for {key}: {str(e)}")
+
+            if not waited:
+                waited = True
+                self.lease_waits += 1
+            await asyncio.sleep(self.poll_interval)
+            result = await lookup()
+            if result is not None:
+                return result
+            if loop.time() > deadline:
+                raise SingleFlightTimeout(f"Timed out waiting for {key}")
+
+    async def _heartbeat(self, key: str):
+        # Üretim lease süresini aşabilir (ör. 12 burç, hız sınırı altında); lease dolup başka worker aynı işi başlatmasın
+        while True:
+            await asyncio.sleep(self.lease.ttl_seconds / 3)
+            try:
+                if not await self.lease.acquire(key):
+                    logging.warning(f"Lease for {key} was taken over by another worker")
+                    return
+            except Exception as e:
+                logging.warning(f"Lease renewal failed for {key}: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "distributed": self.lease is not None,
+            "lease_waits": self.lease_waits,
+        }
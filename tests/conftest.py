@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Backend modülleri paket değil, backend/ dizininden doğrudan import edilir (server.py ile aynı)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,86 @@
+"""email_templates: derleme, HTML kaçışı ve dil geri düşüşü"""
+import json
+from pathlib import Path
+
+import pytest
+
+from email_templates import TEMPLATE_VARIABLES, EmailTemplateRegistry
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "backend" / "templates" / "email"
+
+
+def write_templates(directory: Path, languages: dict, verification_layout: str):
+    (directory / "verification.html").write_text(verification_layout, encoding="utf-8")
+    (directory / "horoscope_ready.html").write_text("<p>{{heading}} {{action_url}}</p>", encoding="utf-8")
+    for language, heading in languages.items():
+        strings = {
+            "verification": {"subject": f"[{language}] verify", "heading": heading},
+            "horoscope_ready": {"subject": f"[{language}] ready", "heading": heading},
+        }
+        (directory / f"{language}.json").write_text(json.dumps(strings), encoding="utf-8")
+
+
+@pytest.fixture
+def registry(tmp_path):
+    write_templates(
+        tmp_path,
+        {"tr": "Doğrula <hemen>", "en": "Verify & go"},
+        '<html lang="{{lang}}"><h1>{{heading}}</h1><a href="{{verification_url}}">{{verification_url}}</a></html>',
+    )
+    return EmailTemplateRegistry(tmp_path, ["en", "de"], default_language="tr")
+
+
+def test_compiles_static_strings_into_segments(registry):
+    template = registry.get("verification", "en")
+    # Sabit metin derlemede yerleşir; sadece değişkenler ayrı segmenttir
+    assert template.segments[1::2] == ["verification_url", "verification_url"]
+    assert template.segments[0] == '<html lang="en"><h1>Verify &amp; go</h1><a href="'
+    assert template.subject == "[en] verify"
+
+
+def test_render_escapes_variables(registry):
+    message = registry.render("verification", "en", "user@example.com",
+                              {"verification_url": 'https://x.test/v?a=1&b="2"'})
+    assert message["to"] == "user@example.com"
+    assert 'href="https://x.test/v?a=1&amp;b=&quot;2&quot;"' in message["html"]
+    assert '"2"' not in message["html"]
+
+
+def test_static_strings_are_escaped(registry):
+    html = registry.render("verification", "tr", "a@b.c", {"verification_url": "u"})["html"]
+    assert "Doğrula &lt;hemen&gt;" in html
+
+
+def test_unknown_language_falls_back_to_default(registry):
+    # "de" istendi ama metni yok; "fr" hiç yüklenmedi
+    for language in ("de", "fr"):
+        message = registry.render("verification", language, "a@b.c", {"verification_url": "u"})
+        assert message["subject"] == "[tr] verify"
+        assert 'lang="tr"' in message["html"]
+
+
+def test_render_batch_counts_every_recipient(registry):
+    messages = registry.render_batch("horoscope_ready", "en", [
+        ("a@b.c", {"action_url": "https://x.test/1"}),
+        ("d@e.f", {"action_url": "https://x.test/2"}),
+    ])
+    assert [message["to"] for message in messages] == ["a@b.c", "d@e.f"]
+    assert "https://x.test/2" in messages[1]["html"]
+    assert registry.stats()["rendered"] == 2
+
+
+def test_missing_translation_fails_at_startup(tmp_path):
+    write_templates(tmp_path, {"tr": "x"}, "<p>{{heading}} {{missing_key}} {{verification_url}}</p>")
+    with pytest.raises(ValueError, match="missing_key"):
+        EmailTemplateRegistry(tmp_path, ["tr"])
+
+
+def test_shipped_templates_compile_for_all_languages():
+    languages = ["tr", "en", "de", "fr", "es"]
+    registry = EmailTemplateRegistry(TEMPLATE_DIR, languages)
+    assert registry.stats()["languages"] == sorted(languages)
+    for name, variables in TEMPLATE_VARIABLES.items():
+        for language in languages:
+            html = registry.render(name, language, "a@b.c", {key: "https://example.test/x" for key in variables})["html"]
+            assert "{{" not in html
+            assert f'lang="{language}"' in html
@@ -0,0 +1,145 @@
+"""ephemeris: Jülyen günü, gezegen/Ay konumları ve ev başlangıçları"""
+import numpy as np
+import pytest
+
+from ephemeris import (BODIES, EphemerisTable, assign_houses, body_longitudes, build_table, chart_to_dict,
+                       compute_charts, delta_t_days, julian_day, save_table)
+
+ARCSEC = 1.0 / 3600.0
+
+
+TABLE_START = julian_day(1999, 12, 1)
+TABLE_END = julian_day(2000, 3, 1)
+
+
+@pytest.fixture(scope="module")
+def table():
+    return EphemerisTable(build_table(TABLE_START, TABLE_END), TABLE_START)
+
+
+def angular_difference(a, b):
+    return np.abs(np.remainder(np.asarray(a) - np.asarray(b) + 180.0, 360.0) - 180.0)
+
+
+def longitudes_at_dynamical_time(jd_td: float) -> np.ndarray:
+    """Meeus örnekleri TD ile verilir; motor UT bekler"""
+    jd_td = np.atleast_1d(float(jd_td))
+    return body_longitudes(jd_td - delta_t_days(jd_td))[0]
+
+
+def test_julian_day_meeus_examples():
+    # Meeus örnek 7.a ve J2000 başlangıcı
+    assert julian_day(1957, 10, 4.81) == pytest.approx(2436116.31)
+    assert julian_day(2000, 1, 1, 12) == pytest.approx(2451545.0)
+    # Ocak/Şubat bir önceki yılın 13./14. ayı sayılır
+    assert julian_day(2024, 3, 1) - julian_day(2024, 2, 28) == pytest.approx(2.0)
+
+
+def test_julian_day_is_vectorised():
+    days = julian_day([2000, 2024], [1, 6], [1, 15], [12, 6])
+    assert days.shape == (2,)
+    assert days[0] == pytest.approx(2451545.0)
+
+
+def test_moon_longitude_meeus_example_47a():
+    # 1992 Nisan 12, 0h TD: λ = 133.162655°
+    moon = longitudes_at_dynamical_time(2448724.5)[BODIES.index("moon")]
+    assert angular_difference(moon, 133.162655) < 15 * ARCSEC
+
+
+def test_sun_longitude_meeus_example_25a():
+    # 1992 Ekim 13, 0h TD: görünen λ = 199.90988°
+    sun = longitudes_at_dynamical_time(julian_day(1992, 10, 13))[BODIES.index("sun")]
+    assert angular_difference(sun, 199.90988) < 30 * ARCSEC
+
+
+def test_sun_sign_ingress_dates():
+    # Güneş Koç'a 20 Mart 2024 03:06 UT'de girer
+    before, after = body_longitudes(julian_day([2024, 2024], [3, 3], [20, 20], [2.5, 3.7]))[:, BODIES.index("sun")]
+    assert before > 359.9 and after < 0.1
+
+
+def test_retrograde_flags():
+    # Merkür 1-25 Nisan 2024 arası geri hareketteydi; Güneş, Ay ve düğüm hiç retro işaretlenmez
+    charts = compute_charts(julian_day([2024, 2024], [4, 5], [10, 10]), [41.0, 41.0], [29.0, 29.0])
+    mercury = BODIES.index("mercury")
+    assert charts.retrograde[0, mercury] and not charts.retrograde[1, mercury]
+    for body in ("sun", "moon", "north_node"):
+        assert not charts.retrograde[:, BODIES.index(body)].any()
+
+
+def test_placidus_cusps_are_ordered_and_opposite():
+    charts = compute_charts([julian_day(1990, 7, 1, 9.5)], [41.0082], [28.9784], "placidus")
+    cusps = charts.cusps[0]
+    assert charts.house_system[0] == "placidus"
+    assert cusps[0] == pytest.approx(charts.ascendant[0])
+    assert cusps[9] == pytest.approx(charts.midheaven[0])
+    # Karşı evler 180° uzaktır ve başlangıçlar zodyak sırasında ilerler
+    assert angular_difference(cusps[6:], cusps[:6] + 180.0).max() < 1e-6
+    widths = np.remainder(np.roll(cusps, -1) - cusps, 360.0)
+    assert widths.sum() == pytest.approx(360.0)
+    assert (widths > 0).all()
+
+
+def test_whole_sign_and_polar_fallback():
+    jd = [julian_day(2000, 1, 1, 12)]
+    whole = compute_charts(jd, [41.0], [29.0], "whole_sign")
+    assert np.all(np.remainder(whole.cusps[0], 30.0) == 0)
+    assert whole.cusps[0][0] == 30 * (whole.ascendant[0] // 30)
+    # Kutup bölgesinde Placidus tanımsızdır, whole_sign'a düşülür
+    polar = compute_charts(jd, [75.0], [29.0], "placidus")
+    assert polar.house_system[0] == "whole_sign"
+
+
+def test_assign_houses():
+    cusps = np.array([[float(30 * index) for index in range(12)]])
+    houses = assign_houses(np.array([[0.0, 29.99, 30.0, 359.0, 185.0]]), cusps)
+    assert houses.tolist() == [[1, 1, 2, 12, 7]]
+
+
+def test_chart_to_dict_shape():
+    chart = chart_to_dict(compute_charts([julian_day(1990, 7, 1, 9.5)], [41.0], [29.0]), 0)
+    assert set(chart["planets"]) == set(BODIES)
+    assert len(chart["houses"]) == 12
+    sun = chart["planets"]["sun"]
+    assert sun["sign"] == "cancer"
+    assert 0 <= sun["degree"] < 30 and 1 <= sun["house"] <= 12
+
+
+def test_table_positions_match_series(table):
+    # Gün içi rastgele anlar; 360 -> 0 geçişleri (Ay ayda bir kez) dahil
+    jd = np.random.default_rng(7).uniform(TABLE_START, TABLE_END - 1, 500)
+    longitudes, speeds = table.positions(jd)
+    expected = body_longitudes(jd)
+    assert angular_difference(longitudes, expected).max() < 2 * ARCSEC
+    earlier, later = body_longitudes(jd - 1.0 / 48.0), body_longitudes(jd + 1.0 / 48.0)
+    expected_speeds = (np.remainder(later - earlier + 180.0, 360.0) - 180.0) * 24.0
+    assert np.abs(speeds - expected_speeds).max() < 0.005
+
+
+def test_table_covers_and_counts_fallbacks(table):
+    assert table.covers(np.array([TABLE_START, TABLE_END - 0.5]))
+    assert not table.covers(np.array([TABLE_START - 1.0]))
+    fallbacks = table.stats()["fallbacks"]
+    compute_charts([TABLE_END + 10.0], [41.0], [29.0], table=table)
+    assert table.stats()["fallbacks"] == fallbacks + 1
+
+
+def test_charts_from_table_match_series(table):
+    jd = np.linspace(TABLE_START + 0.3, TABLE_END - 1.7, 40)
+    latitude, longitude = np.full(40, 41.0), np.full(40, 29.0)
+    from_table = compute_charts(jd, latitude, longitude, table=table)
+    from_series = compute_charts(jd, latitude, longitude)
+    assert angular_difference(from_table.longitudes, from_series.longitudes).max() < 2 * ARCSEC
+    # Seri yolu retroyu yarım günlük farkla bulur; durağan noktaya çok yakın anlar dışında aynı olmalı
+    _, speeds = table.positions(jd)
+    moving = np.abs(speeds) > 0.1
+    np.testing.assert_array_equal(from_table.retrograde[moving], from_series.retrograde[moving])
+
+
+def test_saved_table_is_memory_mapped(tmp_path, table):
+    save_table(table.data, TABLE_START, 1.0, tmp_path)
+    mapped = EphemerisTable.open(tmp_path)
+    assert isinstance(mapped.data, np.memmap)
+    jd = np.array([TABLE_START + 12.25])
+    np.testing.assert_allclose(mapped.positions(jd)[0], table.positions(jd)[0])
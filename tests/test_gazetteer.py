@@ -0,0 +1,124 @@
+"""gazetteer: ad normalizasyonu, seed dosyası üzerinde yer çözümleme ve tarihsel UTC farkı"""
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from gazetteer import (BirthLocationResolver, Gazetteer, build_index, normalize_name, open_gazetteer, read_geonames,
+                       save_index, utc_offset_hours)
+
+SEED_PATH = Path(__file__).resolve().parent.parent / "backend" / "data" / "seed_places.tsv"
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return Gazetteer.from_geonames_file(SEED_PATH)
+
+
+def place_row(name, population=1000, timezone="Europe/Istanbul", country="TR", admin1="34"):
+    return {"name": name, "names": [name], "latitude": 41.0, "longitude": 29.0, "country": country,
+            "admin1": admin1, "population": population, "timezone": timezone}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("İstanbul", "istanbul"),
+    ("  Şanlıurfa ", "sanliurfa"),
+    ("München", "munchen"),
+    ("Frankfurt am Main", "frankfurt am main"),
+    ("Saint-Étienne", "saint etienne"),
+    ("Straße 1", "strasse 1"),
+])
+def test_normalize_name(text, expected):
+    assert normalize_name(text) == expected
+
+
+@pytest.mark.parametrize("query, name, country", [
+    ("İstanbul", "İstanbul", "TR"),
+    ("ISTANBUL", "İstanbul", "TR"),
+    ("Diyarbakir", "Diyarbakır", "TR"),
+    ("Munich", "München", "DE"),          # alternatif ad
+    ("Frankfurt", "Frankfurt am Main", "DE"),  # önek
+    ("Gaziantp", "Gaziantep", "TR"),      # yazım hatası: trigram benzerliği
+    ("Paris", "Paris", "FR"),             # aynı ad: kalabalık yer önce
+    ("Paris, US", "Paris", "US"),         # ülke niteliği
+    ("Kadikoy, Istanbul", "Kadıköy", "TR"),
+])
+def test_lookup_seed_places(gazetteer, query, name, country):
+    place = gazetteer.lookup(query)
+    assert place is not None
+    assert (place.name, place.country) == (name, country)
+    assert place.timezone
+
+
+def test_lookup_miss_is_counted(gazetteer):
+    misses = gazetteer.stats()["misses"]
+    assert gazetteer.lookup("Xqzv") is None
+    assert gazetteer.lookup(" , ") is None
+    assert gazetteer.stats()["misses"] == misses + 2
+
+
+def test_search_prefix_orders_by_population(gazetteer):
+    results = gazetteer.search("an")
+    names = [place.name for place in results]
+    assert {"Ankara", "Antalya"} <= set(names)
+    populations = [place.population for place in results]
+    assert populations == sorted(populations, reverse=True)
+    assert gazetteer.search("a") == []
+
+
+def test_fuzzy_score_uses_distinct_trigrams():
+    # "Aaaaaaaa" yalnızca 3 farklı trigram içerir; ham uzunlukla bölünseydi benzerlik 0.5'in altında kalırdı
+    index = build_index([place_row("Aaaaaaaa"), place_row("Bodrum")])
+    place = Gazetteer(index).lookup("Aaaaaaab")
+    assert place is not None and place.name == "Aaaaaaaa"
+
+
+def test_saved_index_round_trip(tmp_path):
+    with open(SEED_PATH, encoding="utf-8") as source:
+        save_index(build_index(read_geonames(source)), tmp_path)
+    mapped = open_gazetteer(tmp_path)
+    assert mapped.lookup("Ankara").name == "Ankara"
+    assert len(mapped) == len(Gazetteer.from_geonames_file(SEED_PATH))
+
+
+def test_incomplete_index_falls_back_to_seed(tmp_path):
+    with open(SEED_PATH, encoding="utf-8") as source:
+        save_index(build_index(read_geonames(source)[:3]), tmp_path)
+    (tmp_path / "key_trigrams.npy").unlink()
+    assert len(open_gazetteer(tmp_path, SEED_PATH)) > 3
+
+
+def test_utc_offset_follows_tzdata_history():
+    # Türkiye 2016'ya kadar kışın UTC+2, yazın UTC+3; sonra yıl boyu UTC+3
+    assert utc_offset_hours("Europe/Istanbul", datetime(2010, 1, 15, 12)) == 2.0
+    assert utc_offset_hours("Europe/Istanbul", datetime(2010, 7, 15, 12)) == 3.0
+    assert utc_offset_hours("Europe/Istanbul", datetime(2020, 1, 15, 12)) == 3.0
+    # Saat geri alınırken iki kez yaşanan an yaz saati sayılır
+    assert utc_offset_hours("Europe/London", datetime(2021, 10, 31, 1, 30)) == 1.0
+    assert utc_offset_hours("Nowhere/Unknown", datetime(2020, 1, 1)) is None
+
+
+def test_resolver_prefers_given_values_then_gazetteer_then_default(gazetteer):
+    resolver = BirthLocationResolver(gazetteer, 1.0, 2.0, 5.0)
+    moment = datetime(2010, 1, 15, 12)
+
+    given = resolver.resolve("Ankara", moment, 10.0, 20.0, 1.5)
+    assert given == {"latitude": 10.0, "longitude": 20.0, "utc_offset": 1.5}
+
+    # Sadece saat farkı verildiyse koordinatlar gazetteer'dan gelir
+    partial = resolver.resolve("Ankara", moment, utc_offset=4.0)
+    assert partial["place"] == "Ankara" and partial["utc_offset"] == 4.0
+
+    resolved = resolver.resolve("Ankara", moment)
+    assert (resolved["timezone"], resolved["utc_offset"]) == ("Europe/Istanbul", 2.0)
+
+    fallback = resolver.resolve("Xqzv", moment)
+    assert fallback == {"latitude": 1.0, "longitude": 2.0, "utc_offset": 5.0}
+
+
+def test_resolver_from_env(monkeypatch):
+    monkeypatch.setenv("DEFAULT_BIRTH_LATITUDE", "52.52")
+    monkeypatch.delenv("DEFAULT_BIRTH_LONGITUDE", raising=False)
+    monkeypatch.delenv("DEFAULT_BIRTH_UTC_OFFSET", raising=False)
+    resolver = BirthLocationResolver.from_env(None)
+    assert resolver.resolve("Berlin", datetime(2000, 1, 1)) == {"latitude": 52.52, "longitude": 28.9784, "utc_offset": 3.0}
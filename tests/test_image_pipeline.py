@@ -0,0 +1,65 @@
+"""image_pipeline: normalize_image, dHash ve Hamming mesafesi"""
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from image_pipeline import dhash, hamming_distance, normalize_image
+
+# server.IMAGE_DEDUP_MAX_DISTANCE varsayılanı
+DEDUP_MAX_DISTANCE = 10
+
+
+def make_image(seed: int, size=(640, 480)) -> Image.Image:
+    img = Image.new("RGB", size, (240, 230, 210))
+    draw = ImageDraw.Draw(img)
+    for index in range(12):
+        x = (seed * 97 + index * 53) % size[0]
+        y = (seed * 61 + index * 37) % size[1]
+        radius = 20 + (seed * 13 + index * 7) % 60
+        draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=(60 + index * 10, 40, 20))
+    return img
+
+
+def encode(img: Image.Image, fmt: str = "JPEG", **kwargs) -> bytes:
+    out = BytesIO()
+    img.save(out, format=fmt, **kwargs)
+    return out.getvalue()
+
+
+def test_hamming_distance():
+    assert hamming_distance(0, 0) == 0
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hamming_distance(0, 2 ** 64 - 1) == 64
+
+
+def test_dhash_is_64_bits():
+    assert 0 <= dhash(make_image(1)) < 2 ** 64
+
+
+def test_reencoded_image_is_within_threshold():
+    original = make_image(3)
+    # Aynı fincan: farklı boyut, sıkıştırma ve hafif bulanıklık
+    variant = original.resize((320, 240)).filter(ImageFilter.GaussianBlur(1))
+    variant = Image.open(BytesIO(encode(variant, quality=40)))
+    assert hamming_distance(dhash(original), dhash(variant)) <= DEDUP_MAX_DISTANCE
+
+
+def test_different_images_exceed_threshold():
+    assert hamming_distance(dhash(make_image(3)), dhash(make_image(11))) > DEDUP_MAX_DISTANCE
+
+
+def test_normalize_image_downscales_and_keeps_fingerprint():
+    original = make_image(5, size=(3000, 2000))
+    data, fingerprint = normalize_image(encode(original, "PNG"), max_edge=1024, quality=85)
+    with Image.open(BytesIO(data)) as img:
+        assert img.format == "JPEG"
+        assert max(img.size) == 1024
+    assert hamming_distance(fingerprint, dhash(original)) <= DEDUP_MAX_DISTANCE
+
+
+def test_normalize_image_flattens_transparency():
+    img = Image.new("RGBA", (100, 100), (0, 0, 0, 0))
+    data, _ = normalize_image(encode(img, "PNG"), max_edge=64, quality=85)
+    with Image.open(BytesIO(data)) as result:
+        assert result.mode == "RGB"
+        assert result.getpixel((10, 10))[0] > 240
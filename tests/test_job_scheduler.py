@@ -0,0 +1,69 @@
+"""job_scheduler: CronExpression ayrıştırma ve sonraki çalışma zamanı"""
+from datetime import datetime
+
+import pytest
+
+from job_scheduler import CronExpression
+
+
+@pytest.mark.parametrize("field, low, high, expected", [
+    ("*", 0, 5, {0, 1, 2, 3, 4, 5}),
+    ("3", 0, 59, {3}),
+    ("1-4", 0, 59, {1, 2, 3, 4}),
+    ("*/15", 0, 59, {0, 15, 30, 45}),
+    ("0-30/10", 0, 59, {0, 10, 20, 30}),
+    ("1,15,30", 1, 31, {1, 15, 30}),
+    ("5/20", 0, 59, {5, 25, 45}),
+])
+def test_parse_field(field, low, high, expected):
+    assert CronExpression._parse_field(field, low, high) == expected
+
+
+def test_weekday_seven_is_sunday():
+    assert CronExpression("0 0 * * 7").weekdays == {0}
+    assert CronExpression("0 0 * * 5-7").weekdays == {0, 5, 6}
+
+
+@pytest.mark.parametrize("expression", [
+    "0 6 * *",          # 4 alan
+    "60 * * * *",       # dakika aralık dışı
+    "0 24 * * *",       # saat aralık dışı
+    "0 0 0 * *",        # gün 1'den başlar
+    "*/0 * * * *",      # adım 0
+    "5-1 * * * *",      # ters aralık
+    "a * * * *",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("0 6 * * *", datetime(2024, 3, 10, 5, 59, 30), datetime(2024, 3, 10, 6, 0)),
+    # Tam eşleşen andan sonra bir sonraki güne geçer
+    ("0 6 * * *", datetime(2024, 3, 10, 6, 0), datetime(2024, 3, 11, 6, 0)),
+    ("*/15 * * * *", datetime(2024, 3, 10, 6, 7), datetime(2024, 3, 10, 6, 15)),
+    # Ay/yıl sınırı
+    ("30 23 * * *", datetime(2024, 12, 31, 23, 45), datetime(2025, 1, 1, 23, 30)),
+    # 29 Şubat sadece artık yılda
+    ("0 0 29 2 *", datetime(2025, 1, 1), datetime(2028, 2, 29, 0, 0)),
+    # Pazartesi 09:00 (10 Mart 2024 Pazar)
+    ("0 9 * * 1", datetime(2024, 3, 10, 12, 0), datetime(2024, 3, 11, 9, 0)),
+    # Gün ve haftanın günü birlikte kısıtlıysa biri yeterli (ayın 15'i veya Cuma)
+    ("0 0 15 * 5", datetime(2024, 3, 10), datetime(2024, 3, 15, 0, 0)),
+    ("0 0 20 * 5", datetime(2024, 3, 10), datetime(2024, 3, 15, 0, 0)),
+])
+def test_next_after(expression, after, expected):
+    assert CronExpression(expression).next_after(after) == expected
+
+
+def test_never_matching_expression():
+    with pytest.raises(ValueError):
+        CronExpression("0 0 31 2 *").next_after(datetime(2024, 1, 1))
+
+
+def test_last_at_or_before_finds_latest_missed_run():
+    cron = CronExpression("0 6 * * *")
+    since = datetime(2024, 3, 10, 6, 0)
+    assert cron.last_at_or_before(datetime(2024, 3, 13, 7, 0), since) == datetime(2024, 3, 13, 6, 0)
+    assert cron.last_at_or_before(datetime(2024, 3, 11, 5, 59), since) is None
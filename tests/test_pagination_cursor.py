@@ -0,0 +1,45 @@
+"""server: keyset sayfalama imleci (encode_cursor / decode_cursor)"""
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from server import decode_cursor, encode_cursor
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def test_round_trip_keeps_microseconds_and_id():
+    timestamp = datetime(2024, 3, 10, 6, 0, 1, 123456)
+    cursor = encode_cursor(timestamp, "c0ffee-42")
+    assert decode_cursor(cursor) == (timestamp, "c0ffee-42")
+
+
+def test_cursor_is_url_safe_and_unpadded():
+    cursor = encode_cursor(datetime(2024, 1, 1), "?" * 40 + "~~~")
+    assert "=" not in cursor
+    assert "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    raw_cursor(["list", "instead", "of", "object"]),
+    raw_cursor({"t": "2024-01-01T00:00:00"}),
+    raw_cursor({"id": "abc"}),
+    raw_cursor({"t": "yesterday", "id": "abc"}),
+    base64.urlsafe_b64encode(b"\xff\xfe garbage").decode("ascii"),
+])
+def test_tampered_cursor_is_rejected_with_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_truncated_cursor_is_rejected():
+    cursor = encode_cursor(datetime(2024, 3, 10, 6, 0), "reading-id")
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor[:-6])
@@ -0,0 +1,91 @@
+"""rate_limit: TokenBucket, full-jitter backoff ve RateLimitedRunner tekrar denemeleri"""
+import asyncio
+import time
+
+import pytest
+
+from rate_limit import RateLimitedRunner, TokenBucket
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    async def scenario():
+        bucket = TokenBucket(rate=20, burst=3)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        burst_elapsed = time.monotonic() - started
+        for _ in range(2):
+            await bucket.acquire()
+        return burst_elapsed, time.monotonic() - started
+
+    burst_elapsed, total_elapsed = asyncio.run(scenario())
+    assert burst_elapsed < 0.02
+    # 2 ek token saniyede 20 hızla ~0.1 s
+    assert 0.08 <= total_elapsed < 0.5
+
+
+def test_token_bucket_default_burst():
+    assert TokenBucket(0.5).burst == 1
+    assert TokenBucket(4).burst == 4
+
+
+def test_backoff_is_full_jitter_within_cap():
+    runner = RateLimitedRunner(rate=100, max_in_flight=1, base_delay=1.0, max_delay=8.0)
+    for attempt in range(6):
+        cap = min(8.0, 2 ** attempt)
+        delays = [runner.backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= cap for delay in delays)
+        # Sabit değil, aralığa yayılmış olmalı
+        assert max(delays) - min(delays) > cap / 4
+
+
+def test_runner_retries_retryable_errors():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("temporary")
+        return "ok"
+
+    runner = RateLimitedRunner(rate=1000, max_in_flight=2, max_retries=3, base_delay=0.001, max_delay=0.001)
+    assert asyncio.run(runner.run(flaky)) == "ok"
+    assert len(calls) == 3
+    assert runner.stats()["retried"] == 2
+    assert runner.stats()["completed"] == 1
+
+
+def test_runner_does_not_retry_permanent_errors():
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise ValueError("permanent")
+
+    runner = RateLimitedRunner(rate=1000, max_in_flight=1, base_delay=0.001,
+                               is_retryable=lambda e: not isinstance(e, ValueError))
+    with pytest.raises(ValueError):
+        asyncio.run(runner.run(broken))
+    assert len(calls) == 1
+    assert runner.stats()["failed"] == 1
+
+
+def test_runner_limits_in_flight():
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        peak = max(peak, runner.in_flight)
+        await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(*[runner.run(work) for _ in range(8)])
+
+    runner = RateLimitedRunner(rate=1000, max_in_flight=2)
+    asyncio.run(scenario())
+    assert peak <= 2
@@ -0,0 +1,143 @@
+"""single_flight: süreç içi SingleFlight birleştirmesi"""
+import asyncio
+
+import pytest
+
+from single_flight import DistributedSingleFlight, SingleFlight, SingleFlightTimeout
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*[flight.do("aries:2024-01-01", produce) for _ in range(10)])
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result == {"value": 42} for result in results)
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 9}
+
+
+def test_different_keys_run_separately():
+    calls = []
+
+    async def produce(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def scenario():
+        flight = SingleFlight()
+        return await asyncio.gather(flight.do("a", lambda: produce("a")), flight.do("b", lambda: produce("b")))
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_error_is_shared_and_key_released():
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("LLM down")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*[flight.do("k", failing) for _ in range(3)], return_exceptions=True)
+        # Hata sonrası anahtar serbest kalır, sonraki çağrı yeniden dener
+        retry = await asyncio.gather(flight.do("k", failing), return_exceptions=True)
+        return results, retry
+
+    results, retry = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert isinstance(retry[0], RuntimeError)
+    assert len(calls) == 2
+
+
+def test_cancelled_follower_does_not_cancel_shared_work():
+    async def produce():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        flight = SingleFlight()
+        leader = asyncio.ensure_future(flight.do("k", produce))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", produce))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(scenario()) == "done"
+
+
+class FakeLease:
+    """MongoLease taklidi: tek sahip, süre dolumu elle"""
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.holder = None
+        self.renewals = 0
+
+    def handle(self, owner):
+        lease = self
+
+        class Handle:
+            ttl_seconds = lease.ttl_seconds
+
+            async def acquire(self, key):
+                if lease.holder in (None, owner):
+                    if lease.holder == owner:
+                        lease.renewals += 1
+                    lease.holder = owner
+                    return True
+                return False
+
+            async def release(self, key):
+                if lease.holder == owner:
+                    lease.holder = None
+
+        return Handle()
+
+
+def test_lease_is_renewed_while_producing():
+    lease = FakeLease(ttl_seconds=0.03)
+
+    async def produce():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def lookup():
+        return None
+
+    async def scenario():
+        flight = DistributedSingleFlight(lease.handle("a"), poll_interval=0.01)
+        return await flight.do("k", lookup, produce)
+
+    assert asyncio.run(scenario()) == "done"
+    assert lease.renewals >= 2
+    assert lease.holder is None
+
+
+def test_waiter_times_out_with_single_flight_timeout():
+    lease = FakeLease(ttl_seconds=10)
+    lease.holder = "other-worker"
+
+    async def lookup():
+        return None
+
+    async def scenario():
+        flight = DistributedSingleFlight(lease.handle("a"), poll_interval=0.01, wait_timeout=0.05)
+        await flight.do("k", lookup, lookup)
+
+    with pytest.raises(SingleFlightTimeout):
+        asyncio.run(scenario())